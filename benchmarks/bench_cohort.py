@@ -0,0 +1,62 @@
+"""Time cohort analytics over generated student files at several worker counts
+
+Writes ``--students`` seeded data files (a shared syllabus with per-student
+progress) under a temporary directory, then runs analyze_cohort with each
+worker count and reports throughput, speedup over one worker and peak RSS.
+
+Usage: python benchmarks/bench_cohort.py [--students 3000] [--workers 1 2 4]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cohort import analyze_cohort  # noqa: E402
+from datagen import synthetic_subjects  # noqa: E402
+
+
+def write_students(directory: str, students: int, subjects: int, topics: int):
+    for i in range(students):
+        student_dir = os.path.join(directory, f"student-{i:05d}")
+        os.makedirs(student_dir)
+        with open(os.path.join(student_dir, "study_data.json"), "w", encoding="utf-8") as f:
+            json.dump(synthetic_subjects(subjects, topics, seed=i), f)
+
+
+def peak_rss_mib(who) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss * scale / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--subjects", type=int, default=6, help="subjects per student")
+    parser.add_argument("--topics", type=int, default=300, help="topics per student")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_students(tmp, args.students, args.subjects, args.topics)
+        print(f"{args.students:,} students x {args.topics} topics on {os.cpu_count()} cores")
+        baseline = None
+        for workers in args.workers:
+            report = analyze_cohort(tmp, workers, chunk_size=args.chunk_size, progress_every=0)
+            assert report["students"] == args.students and not report["failed_count"]
+            seconds = report["seconds"]
+            baseline = baseline or seconds
+            print(f"workers={workers:<3} {seconds:8.2f} s {args.students / seconds:10,.0f} files/s "
+                  f"speedup {baseline / seconds:5.2f}x")
+        print(f"peak RSS: parent {peak_rss_mib(resource.RUSAGE_SELF):.0f} MiB, "
+              f"largest worker {peak_rss_mib(resource.RUSAGE_CHILDREN):.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
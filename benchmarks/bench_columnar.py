@@ -0,0 +1,54 @@
+"""Compare the NumPy columnar statistics with the per-topic dict code path
+
+Usage: python benchmarks/bench_columnar.py [--topics 500000] [--subjects 500]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import ColumnarTopics, dict_summary  # noqa: E402
+from datagen import synthetic_subjects  # noqa: E402
+from stats import StatsEngine  # noqa: E402
+
+
+def timed(fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=500_000)
+    parser.add_argument("--subjects", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    subjects = synthetic_subjects(args.subjects, args.topics)
+    now = datetime.datetime.now()
+
+    build, columns = timed(lambda: ColumnarTopics(subjects))
+    dict_time, expected = timed(lambda: dict_summary(subjects, now), args.repeat)
+    columnar_time, actual = timed(lambda: columns.summary(now), args.repeat)
+
+    stats = StatsEngine()
+    stats.rebuild(subjects)
+    stats_summary = stats.summary(subjects, now)
+
+    assert actual == expected, "columnar statistics differ from the dict code path"
+    for key in ("topics", "completed", "in_progress", "sessions", "average_confidence"):
+        assert stats_summary[key] == expected[key], key
+
+    print(f"topics: {expected['topics']:,} in {expected['subjects']:,} subjects (results identical)")
+    print(f"dict summary:     {dict_time * 1000:9.1f} ms")
+    print(f"columnar summary: {columnar_time * 1000:9.1f} ms  ({dict_time / columnar_time:.1f}x)")
+    print(f"columnar build:   {build * 1000:9.1f} ms (once per load)")
+
+
+if __name__ == "__main__":
+    main()
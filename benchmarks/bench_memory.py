@@ -0,0 +1,50 @@
+"""Measure the memory footprint of dict topics versus the __slots__ models
+
+Usage: python benchmarks/bench_memory.py [--topics 300000] [--subjects 300]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import synthetic_subjects  # noqa: E402
+from models import from_json_schema, to_json_schema  # noqa: E402
+
+
+def traced(fn):
+    """Return fn()'s result and the bytes it still holds once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=300_000)
+    parser.add_argument("--subjects", type=int, default=300)
+    args = parser.parse_args()
+
+    # Round-trip through JSON so the dicts look exactly like json.load output
+    payload = json.dumps(synthetic_subjects(args.subjects, args.topics))
+    subjects, dict_bytes = traced(lambda: json.loads(payload))
+    compact, compact_bytes = traced(lambda: from_json_schema(json.loads(payload)))
+
+    assert to_json_schema(compact) == subjects, "conversion is not lossless"
+
+    topics = sum(len(s["topics"]) for s in subjects.values())
+    print(f"topics: {topics:,} (round trip lossless)")
+    print(f"dict topics:    {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / topics:6.0f} B/topic)")
+    print(f"slots topics:   {compact_bytes / 2**20:8.1f} MiB  ({compact_bytes / topics:6.0f} B/topic)")
+    print(f"saved:          {(1 - compact_bytes / dict_bytes) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Record thousands of simulated revision and quiz sessions, replay them and check every result
+
+Sessions go through the headless StudyAssistant operations the menu uses,
+recorded with a TraceRecorder on one copy of a generated dataset, then
+replayed as fast as possible on a fresh copy. Every replayed result must
+match the recording, and the statistics kept up to date along the way
+must match a rebuild, so the run doubles as a regression test; it exits
+non-zero otherwise. --save keeps the trace (and the data it starts from,
+as <trace>.data.json) so a later commit can replay it with --trace.
+
+Usage: python benchmarks/bench_replay.py [--topics 100000] [--sessions 5000] [--backend journal]
+                                         [--save trace.jsonl | --trace trace.jsonl] [--output replay.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import synthetic_subjects  # noqa: E402
+from replay import TraceRecorder, replay_trace  # noqa: E402
+from storage import BACKENDS  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+def revision_session(assistant: StudyAssistant, subject: str, rng: random.Random):
+    """Work through part of a subject's due queue, as the revision menu does"""
+    for topic in assistant.revision_queue(subject)[:rng.randint(3, 15)]:
+        action = rng.random()
+        if action < 0.3:
+            assistant.review_topic(subject, topic, "complete", duration=rng.uniform(30, 600))
+        elif action < 0.8:
+            assistant.review_topic(subject, topic, "confidence", confidence=rng.randint(1, 10),
+                                   duration=rng.uniform(30, 600))
+        elif action < 0.9:
+            assistant.review_topic(subject, topic, "notes", notes=f"remember {rng.randint(1, 999)}")
+        else:
+            continue
+        assistant.log_study_session(subject)
+    assistant.save_data()
+
+
+def quiz_session(assistant: StudyAssistant, subject: str, rng: random.Random):
+    """Answer a quiz on one subject (or all of them), as the quiz menu does"""
+    questions = assistant.quiz_questions(subject)
+    ratings = []
+    for question_subject, topic in questions:
+        if rng.random() < 0.95:
+            ratings.append(rng.randint(1, 10))
+            assistant.record_quiz_rating(question_subject, topic, ratings[-1], rng.uniform(5, 120))
+    assistant.quiz_score(ratings, len(questions))
+    assistant.save_data()
+
+
+def record(data_file: str, trace_path: str, args) -> float:
+    rng = random.Random(args.seed)
+    assistant = StudyAssistant(data_file, args.backend)
+    recorder = TraceRecorder(assistant, trace_path, seed=args.seed,
+                             meta={"subjects": args.subjects, "topics": args.topics, "backend": args.backend})
+    names = list(assistant.subjects)
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        if rng.random() < 0.6:
+            recorder.begin("revision")
+            revision_session(assistant, rng.choice(names), rng)
+        else:
+            recorder.begin("quiz")
+            quiz_session(assistant, rng.choice(names) if rng.random() < 0.8 else None, rng)
+    seconds = time.perf_counter() - start
+    assistant.close()
+    recorder.close()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=100_000)
+    parser.add_argument("--subjects", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="journal")
+    parser.add_argument("--save", metavar="PATH", help="keep the recorded trace and its starting data")
+    parser.add_argument("--trace", metavar="PATH", help="replay this saved trace instead of recording one")
+    parser.add_argument("--output", metavar="PATH", help="write the replay report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.json")
+        trace_path = args.trace or os.path.join(tmp, "trace.jsonl")
+        if args.trace:
+            shutil.copyfile(args.trace + ".data.json", source)
+        else:
+            with open(source, "w", encoding="utf-8") as f:
+                json.dump(synthetic_subjects(args.subjects, args.topics, seed=args.seed), f)
+            os.makedirs(os.path.join(tmp, "recorded"))
+            recorded = os.path.join(tmp, "recorded", "study_data.json")
+            shutil.copyfile(source, recorded)
+            seconds = record(recorded, trace_path, args)
+            print(f"recorded {args.sessions:,} sessions in {seconds:.2f}s "
+                  f"({os.path.getsize(trace_path) / 2**20:.1f} MiB trace)")
+            if args.save:
+                shutil.copyfile(trace_path, args.save)
+                shutil.copyfile(source, args.save + ".data.json")
+
+        os.makedirs(os.path.join(tmp, "replayed"))
+        replayed = os.path.join(tmp, "replayed", "study_data.json")
+        shutil.copyfile(source, replayed)
+        assistant = StudyAssistant(replayed, args.backend)
+        report = replay_trace(assistant, trace_path)
+        # The aggregates were updated change by change; they must match a rebuild
+        problems = assistant.stats.verify(assistant.subjects)
+        assistant.close()
+
+    print(f"replayed {report['sessions']:,} sessions ({report['calls']:,} operations) in "
+          f"{report['seconds']:.2f}s: {report['sessions_per_sec']:,.0f} sessions/sec, "
+          f"{report['calls_per_sec']:,.0f} operations/sec")
+    for kind, figures in report["kinds"].items():
+        print(f"  {kind:>8}: {figures['sessions']:,} sessions, p50 {figures['p50_ms']:.2f} ms, "
+              f"p95 {figures['p95_ms']:.2f} ms, max {figures['max_ms']:.2f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    for example in report["examples"]:
+        print(f"  mismatch in session {example['session']}: {example['call']} {example['args']} "
+              f"returned {example['actual']}, recorded {example['expected']}")
+    for problem in problems:
+        print(f"  statistics mismatch: {problem}")
+    if report["mismatches"]:
+        sys.exit(f"{report['mismatches']:,} replayed results differ from the recording")
+    if problems:
+        sys.exit(f"{len(problems):,} statistics aggregates differ from a rebuild after the replay")
+    print("every replayed result matches the recording, and the statistics match a rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the spaced-repetition due queue against a full scan
+
+Usage: python benchmarks/bench_scheduler.py [--topics 1000000] [--subjects 1000]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import synthetic_subjects  # noqa: E402
+from scheduler import RevisionScheduler, due_ordinal  # noqa: E402
+
+
+def timed(fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def full_scan(subjects, k: int, today: int):
+    due = [(due_ordinal(topic), topic["confidence"], s, t)
+           for s, subject in subjects.items()
+           for t, topic in subject["topics"].items()]
+    return sorted(d for d in due if d[0] <= today)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=1_000_000)
+    parser.add_argument("--subjects", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=20, help="due topics to fetch per query")
+    parser.add_argument("--reviews", type=int, default=10_000)
+    args = parser.parse_args()
+
+    subjects = synthetic_subjects(args.subjects, args.topics)
+    today = datetime.date.today().toordinal()
+    scheduler = RevisionScheduler()
+
+    build, _ = timed(lambda: scheduler.rebuild(subjects))
+    heap_query, _ = timed(lambda: scheduler.next_due(args.k, today=today), repeat=100)
+    subject_query, _ = timed(lambda: scheduler.next_due(args.k, "subject-0", today), repeat=100)
+    scan_query, _ = timed(lambda: full_scan(subjects, args.k, today))
+
+    rng = random.Random(7)
+    keys = list(scheduler.entries)
+    reviews = [rng.choice(keys) for _ in range(args.reviews)]
+
+    def review_all():
+        for subject_name, topic_name in reviews:
+            topic = subjects[subject_name]["topics"][topic_name]
+            topic["confidence"] = rng.randint(1, 10)
+            topic["last_reviewed"] = datetime.date.today().isoformat()
+            scheduler.schedule(subject_name, topic_name, topic)
+
+    review, _ = timed(review_all)
+
+    print(f"topics: {len(scheduler.entries):,}")
+    print(f"build heaps:              {build:8.3f} s")
+    print(f"next {args.k} due (global heap): {heap_query * 1e6:8.1f} us")
+    print(f"next {args.k} due (subject heap): {subject_query * 1e6:7.1f} us")
+    print(f"next {args.k} due (full scan):   {scan_query * 1e6:8.1f} us")
+    print(f"review update:            {review / args.reviews * 1e6:8.1f} us/review")
+
+
+if __name__ == "__main__":
+    main()
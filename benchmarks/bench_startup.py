@@ -0,0 +1,67 @@
+"""Time StudyAssistant startup with and without the binary snapshot cache, and sharded
+
+Usage: python benchmarks/bench_startup.py [--topics 300000] [--subjects 300]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import cache_path  # noqa: E402
+from datagen import synthetic_subjects  # noqa: E402
+from storage import JournalStorage, migrate_storage  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+def timed(fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=300_000)
+    parser.add_argument("--subjects", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "study_data.json")
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump(synthetic_subjects(args.subjects, args.topics), f, indent=2)
+
+        no_cache, expected = timed(lambda: JournalStorage(data_file, use_cache=False).load(), args.repeat)
+        cold, _ = timed(lambda: JournalStorage(data_file).load())
+        warm, actual = timed(lambda: JournalStorage(data_file).load(), args.repeat)
+        assert actual == expected, "cached snapshot differs from the JSON file"
+
+        startup_json, _ = timed(lambda: StudyAssistant(data_file, use_cache=False))
+        startup_cache, _ = timed(lambda: StudyAssistant(data_file))
+
+        migrate_storage(data_file, "journal", "sharded")
+        StudyAssistant(data_file, "sharded").close()  # writes the search sidecar
+        startup_sharded, assistant = timed(lambda: StudyAssistant(data_file, "sharded"))
+        shards_read = assistant.store.shards_loaded
+        first_subject = next(iter(assistant.subjects))
+        first_revision, _ = timed(lambda: assistant.revision_queue(first_subject))
+
+        print(f"JSON file: {os.path.getsize(data_file) / 2**20:.1f} MiB, "
+              f"cache: {os.path.getsize(cache_path(data_file)) / 2**20:.1f} MiB")
+        print(f"load, --no-cache:      {no_cache * 1000:8.1f} ms")
+        print(f"load, cache rebuild:   {cold * 1000:8.1f} ms")
+        print(f"load, cache hit:       {warm * 1000:8.1f} ms  ({no_cache / warm:.1f}x faster)")
+        print(f"full startup, no cache:{startup_json * 1000:8.1f} ms")
+        print(f"full startup, cache:   {startup_cache * 1000:8.1f} ms")
+        print(f"full startup, sharded: {startup_sharded * 1000:8.1f} ms  "
+              f"({shards_read} shards read)")
+        print(f"sharded, first revision of one subject: {first_revision * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
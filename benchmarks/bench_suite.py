@@ -0,0 +1,167 @@
+"""Time the non-interactive core of every menu operation and emit JSON results
+
+Generates a seeded dataset, then drives StudyAssistant's core methods directly
+(no input() prompts): loading, saving, progress, statistics, schedule,
+revision queue, quiz selection and search. Pass --compare with an earlier
+results file to flag regressions between commits.
+
+Usage: python benchmarks/bench_suite.py [--topics 100000] [--output results.json]
+                                        [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import synthetic_subjects  # noqa: E402
+from storage import BACKENDS, open_storage  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+def timed(fn, repeat: int = 1, number: int = 1):
+    """Median, min and max per-call wall time over ``repeat`` rounds of ``number`` calls"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {"median": statistics.median(samples), "min": min(samples), "max": max(samples),
+            "repeat": repeat, "number": number}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_backend(backend: str, data_file: str, args) -> dict:
+    rng = random.Random(args.seed)
+    results = {}
+    results["load_data"] = timed(lambda: open_storage(data_file, backend).load(), args.repeat)
+    results["startup"] = timed(lambda: StudyAssistant(data_file, backend).close(), args.repeat)
+
+    assistant = StudyAssistant(data_file, backend)
+    names = list(assistant.subjects)
+    topics = {name: list(assistant.subjects[name]["topics"]) for name in names}
+
+    def random_topic():
+        subject = rng.choice(names)
+        return subject, rng.choice(topics[subject])
+
+    def save_one():
+        subject, topic = random_topic()
+        assistant.record_quiz_rating(subject, topic, rng.randint(1, 10))
+        assistant.save_data()
+
+    def save_batch():
+        for _ in range(1000):
+            subject, topic = random_topic()
+            assistant.record_quiz_rating(subject, topic, rng.randint(1, 10))
+        assistant.save_data()
+
+    # Build every subject's quiz pool up front so quiz_topics times draws only
+    for name in names:
+        assistant.quiz_topics(name, 1)
+
+    results["save_data_1_change"] = timed(save_one, args.repeat, 20)
+    results["save_data_1000_changes"] = timed(save_batch, args.repeat)
+    results["progress_report"] = timed(assistant.progress_report, args.repeat, 20)
+    results["statistics_report"] = timed(assistant.statistics_report, args.repeat, 20)
+    results["schedule_report"] = timed(assistant.schedule_report, args.repeat, 5)
+    results["revision_queue"] = timed(lambda: assistant.revision_queue(rng.choice(names), 20),
+                                      args.repeat, 100)
+    results["quiz_topics"] = timed(lambda: assistant.quiz_topics(rng.choice(names), 10), args.repeat, 100)
+    results["search_topics"] = timed(lambda: assistant.search_topics(f"topic {rng.randrange(1000)}"),
+                                     args.repeat, 100)
+    results["close"] = timed(assistant.close)
+
+    # The same single-answer save with write-behind: only the dirty marking is timed
+    assistant = StudyAssistant(data_file, backend, write_behind=True)
+    results["save_data_1_change_write_behind"] = timed(save_one, args.repeat, 20)
+    results["close_write_behind"] = timed(assistant.close)
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print median ratios against a baseline; returns the number of regressions"""
+    regressions = 0
+    print(f"\n{'benchmark':<40}{'baseline':>12}{'current':>12}{'ratio':>8}", file=sys.stderr)
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        flag = "  ⚠️" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{name:<40}{old['median'] * 1000:>10.2f}ms{result['median'] * 1000:>10.2f}ms"
+              f"{ratio:>7.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=100_000)
+    parser.add_argument("--subjects", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per benchmark")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=["journal"])
+    parser.add_argument("--status-weights", type=float, nargs=3, metavar=("NOT_STARTED", "IN_PROGRESS", "COMPLETED"))
+    parser.add_argument("--confidence-mean", type=float)
+    parser.add_argument("--notes-ratio", type=float, default=0.2)
+    parser.add_argument("--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    subjects = synthetic_subjects(args.subjects, args.topics, args.seed, args.status_weights,
+                                  args.confidence_mean, notes_ratio=args.notes_ratio)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": {},
+    }
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_file = os.path.join(tmp, "study_data.json")
+            with open(data_file, "w", encoding="utf-8") as f:
+                json.dump(subjects, f, indent=2)
+            for name, result in run_backend(backend, data_file, args).items():
+                report["results"][f"{backend}/{name}"] = result
+                print(f"{backend + '/' + name:<40}{result['median'] * 1000:>10.2f} ms", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} benchmark(s) slower than {args.threshold}x the baseline", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
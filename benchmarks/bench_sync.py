@@ -0,0 +1,106 @@
+"""Time syncing two diverged copies of a large syllabus and measure what is exchanged
+
+Usage: python benchmarks/bench_sync.py [--topics 100000] [--subjects 200] [--edits 1000]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import synthetic_subjects  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+from sync import replica_path  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def diverge(assistant: StudyAssistant, edits: int, rng: random.Random):
+    """Review, rate and annotate random topics the way a study session would"""
+    names = list(assistant.subjects)
+    for i in range(edits):
+        subject = rng.choice(names)
+        topics = list(assistant.subjects[subject]["topics"])
+        if not topics:
+            continue
+        topic = rng.choice(topics)
+        choice = rng.random()
+        if choice < 0.5:
+            assistant.update_topic(subject, topic, confidence=rng.randint(1, 10))
+        elif choice < 0.8:
+            assistant.update_topic(subject, topic, notes=f"note {i}")
+        elif choice < 0.95:
+            assistant.log_study_session(subject)
+        else:
+            assistant.remove_topic(subject, topic)
+    assistant.save_data()
+
+
+def snapshot(data_file: str):
+    assistant = StudyAssistant(data_file)
+    try:
+        return {name: dict(subject, topics={topic: dict(fields) for topic, fields in subject["topics"].items()})
+                for name, subject in assistant.subjects.items()}
+    finally:
+        assistant.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=100_000)
+    parser.add_argument("--subjects", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=1000, help="edits made on each copy between syncs")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        laptop, phone = os.path.join(tmp, "laptop"), os.path.join(tmp, "phone")
+        os.makedirs(laptop)
+        data_file = os.path.join(laptop, "study_data.json")
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump(synthetic_subjects(args.subjects, args.topics), f)
+        shutil.copytree(laptop, phone)
+        size = os.path.getsize(data_file)
+
+        assistant = StudyAssistant(data_file)
+        first, report = timed(lambda: assistant.sync_with(phone))
+        assistant.close()
+        print(f"JSON file: {size / 2**20:.1f} MiB, sync state: "
+              f"{os.path.getsize(replica_path(data_file)) / 2**20:.1f} MiB")
+        print(f"first sync (both copies start tracking): {first:8.2f} s, "
+              f"{report['sent_bytes'] + report['received_bytes']} bytes exchanged")
+
+        for side in (laptop, phone):
+            assistant = StudyAssistant(os.path.join(side, "study_data.json"))
+            diverge(assistant, args.edits, rng)
+            assistant.close()
+
+        assistant = StudyAssistant(data_file)
+        seconds, report = timed(lambda: assistant.sync_with(phone))
+        assistant.close()
+        exchanged = report["sent_bytes"] + report["received_bytes"]
+        print(f"sync after {args.edits} edits per copy:     {seconds:8.2f} s, {exchanged} bytes exchanged "
+              f"({exchanged / size:.2%} of the file), {report['local_changes']} + "
+              f"{report['remote_changes']} records applied")
+
+        assistant = StudyAssistant(data_file)
+        idle, report = timed(lambda: assistant.sync_with(phone))
+        assistant.close()
+        print(f"sync with nothing new:                  {idle:8.2f} s, "
+              f"{report['sent_bytes'] + report['received_bytes']} bytes exchanged")
+
+        assert snapshot(data_file) == snapshot(os.path.join(phone, "study_data.json")), "copies did not converge"
+        print("both copies hold the same data")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Seeded generator for synthetic study_data.json-shaped datasets
+
+Usage: python benchmarks/datagen.py --subjects 100 --topics 100000 --out study_data.json
+"""
+import argparse
+import datetime
+import json
+import random
+from typing import Dict, Sequence, Any
+
+STATUSES = ("not_started", "in_progress", "completed")
+
+
+def synthetic_subjects(n_subjects: int, n_topics: int, seed: int = 42,
+                       status_weights: Sequence[float] = None, confidence_mean: float = None,
+                       exam_days: Sequence[int] = (-10, 180), notes_ratio: float = 0.0) -> Dict[str, Any]:
+    """``n_topics`` topics spread evenly over ``n_subjects`` subjects
+
+    By default statuses and confidences are uniform. ``status_weights`` gives
+    relative weights for not_started / in_progress / completed, and
+    ``confidence_mean`` draws confidences from a normal distribution (sd 2)
+    clamped to 0-10. Exam dates fall ``exam_days`` days from today, and
+    ``notes_ratio`` of the topics get a short note.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    subjects = {}
+    per_subject = max(1, n_topics // n_subjects)
+    for s in range(n_subjects):
+        topics = {}
+        for t in range(per_subject):
+            reviewed = rng.random() < 0.8
+            if status_weights is None:
+                status = rng.choice(STATUSES)
+            else:
+                status = rng.choices(STATUSES, status_weights)[0]
+            if confidence_mean is None:
+                confidence = rng.randint(0, 10)
+            else:
+                confidence = min(10, max(0, round(rng.gauss(confidence_mean, 2))))
+            topics[f"topic-{s}-{t}"] = {
+                "status": status,
+                "confidence": confidence,
+                "study_time": rng.randint(0, 300),
+                "last_reviewed": (today - datetime.timedelta(days=rng.randint(0, 120))).isoformat()
+                if reviewed else "",
+                "notes": "",
+                "difficulty": rng.choice(["easy", "medium", "hard"]),
+            }
+            if notes_ratio and rng.random() < notes_ratio:
+                topics[f"topic-{s}-{t}"]["notes"] = f"review chapter {rng.randint(1, 40)} exercises"
+        exam_date = ""
+        if rng.random() < 0.9:
+            exam_date = (today + datetime.timedelta(days=rng.randint(*exam_days))).isoformat()
+        subjects[f"subject-{s}"] = {
+            "topics": topics,
+            "exam_date": exam_date,
+            "priority": rng.choice(["high", "medium", "low"]),
+            "total_sessions": rng.randint(0, 50),
+            "last_studied": "",
+            "notes": "",
+        }
+    return subjects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subjects", type=int, default=100)
+    parser.add_argument("--topics", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--status-weights", type=float, nargs=3, metavar=("NOT_STARTED", "IN_PROGRESS", "COMPLETED"),
+                        help="relative weights of the three statuses (default: uniform)")
+    parser.add_argument("--confidence-mean", type=float, help="mean confidence (default: uniform 0-10)")
+    parser.add_argument("--exam-days", type=int, nargs=2, default=(-10, 180), metavar=("MIN", "MAX"),
+                        help="range of exam dates in days from today")
+    parser.add_argument("--notes-ratio", type=float, default=0.0, help="share of topics with notes")
+    parser.add_argument("--out", default="study_data.json")
+    args = parser.parse_args()
+
+    subjects = synthetic_subjects(args.subjects, args.topics, args.seed, args.status_weights,
+                                  args.confidence_mean, args.exam_days, args.notes_ratio)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(subjects, f, indent=2)
+    print(f"Wrote {sum(len(s['topics']) for s in subjects.values()):,} topics "
+          f"in {len(subjects):,} subjects to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
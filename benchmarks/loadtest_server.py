@@ -0,0 +1,190 @@
+"""Load-test the multi-user HTTP service with concurrent keep-alive clients
+
+Starts the service in a subprocess on a free local port (or targets --url),
+seeds every user with one subject and a syllabus, then drives a mixed read /
+write workload and reports throughput and latency percentiles.
+
+Usage: python benchmarks/loadtest_server.py [--users 200] [--clients 50] [--requests 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+                          .encode("latin-1") + data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length))
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def random_request(rng: random.Random, users: int, topics: int):
+    user = f"user{rng.randrange(users)}"
+    base = f"/users/{user}"
+    subject = f"{base}/subjects/Subject"
+    roll = rng.random()
+    if roll < 0.15:
+        return "GET", f"{base}/progress", None
+    if roll < 0.25:
+        return "GET", f"{base}/statistics", None
+    if roll < 0.35:
+        return "GET", f"{base}/schedule", None
+    if roll < 0.50:
+        return "GET", f"{subject}/revision?limit=10", None
+    if roll < 0.65:
+        return "GET", f"{subject}/quiz?count=5", None
+    if roll < 0.85:
+        return "POST", f"{subject}/reviews", {"topic": f"Topic {rng.randrange(topics)}",
+                                              "action": "confidence",
+                                              "confidence": rng.randint(1, 10)}
+    if roll < 0.95:
+        return "POST", f"{subject}/quiz", {"answers": [
+            {"topic": f"Topic {rng.randrange(topics)}", "rating": rng.randint(1, 10)}
+            for _ in range(3)]}
+    return "POST", f"{subject}/topics", {"topics": [f"Extra {rng.randrange(1000)}"]}
+
+
+async def seed(host: str, port: int, users: int, topics: int, clients: int):
+    async def seed_user(client: Client, user: int):
+        base = f"/users/user{user}"
+        await client.request("POST", f"{base}/subjects",
+                             {"name": "Subject", "exam_date": "2030-06-01", "priority": "high"})
+        await client.request("POST", f"{base}/subjects/Subject/topics",
+                             {"topics": [f"Topic {i}" for i in range(topics)]})
+
+    async def worker(offset: int):
+        client = Client(host, port)
+        for user in range(offset, users, clients):
+            await seed_user(client, user)
+        client.close()
+
+    await asyncio.gather(*(worker(i) for i in range(min(clients, users))))
+
+
+async def drive(host: str, port: int, args) -> dict:
+    rng = random.Random(args.seed)
+    plan = [random_request(rng, args.users, args.topics) for _ in range(args.requests)]
+    latencies, statuses = [], {}
+    queue = iter(plan)
+
+    async def worker():
+        client = Client(host, port)
+        for method, path, body in queue:
+            start = time.perf_counter()
+            status, _ = await client.request(method, path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+        client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {"requests": len(latencies), "seconds": elapsed, "requests_per_sec": len(latencies) / elapsed,
+            "p50_ms": percentile(0.50), "p99_ms": percentile(0.99), "max_ms": latencies[-1] * 1000,
+            "statuses": statuses}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("service did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="target a running service instead of starting one")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=50, help="topics seeded per user")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--max-users", type=int, default=128, help="--max-users of the started service")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        if args.url:
+            url = urllib.parse.urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            host, port = "127.0.0.1", free_port()
+            process = subprocess.Popen(
+                [sys.executable, os.path.join(ROOT, "study_assistant.py"), "--serve",
+                 "--port", str(port), "--data-dir", tmp, "--max-users", str(args.max_users)],
+                stdout=subprocess.DEVNULL)
+            wait_for_port(port)
+        try:
+            asyncio.run(seed(host, port, args.users, args.topics, args.clients))
+            result = asyncio.run(drive(host, port, args))
+        finally:
+            if process is not None:
+                process.send_signal(signal.SIGINT)
+                process.wait()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['requests']:,} requests from {args.clients} clients over {args.users} users "
+          f"in {result['seconds']:.2f}s")
+    print(f"  throughput  {result['requests_per_sec']:>10,.0f} req/s")
+    print(f"  p50 latency {result['p50_ms']:>10.2f} ms")
+    print(f"  p99 latency {result['p99_ms']:>10.2f} ms")
+    print(f"  max latency {result['max_ms']:>10.2f} ms")
+    print(f"  statuses    {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
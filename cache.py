@@ -0,0 +1,80 @@
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+import zlib
+from typing import Dict, Any
+
+MAGIC = b"SACACHE"
+FORMAT_VERSION = 1
+# magic, format version, python major/minor (marshal is version specific),
+# JSON size, JSON mtime_ns, JSON sha256, then the CRC32 of the marshal body
+_FINGERPRINT = struct.Struct("<7sBBBQq32s")
+_MTIME = slice(18, 26)
+_BODY_CRC = struct.Struct("<I")
+
+
+def cache_path(json_path: str) -> str:
+    return json_path + ".cache"
+
+
+def _fingerprint(payload: bytes, mtime_ns: int) -> bytes:
+    return _FINGERPRINT.pack(MAGIC, FORMAT_VERSION, *sys.version_info[:2], len(payload), mtime_ns,
+                        hashlib.sha256(payload).digest())
+
+
+def write_cache(json_path: str, payload: bytes, subjects: Dict[str, Any], body: bytes = None):
+    """Write the binary sidecar for a JSON file whose bytes are ``payload``
+
+    ``body`` is ``marshal.dumps(subjects)`` when the caller already has it.
+    """
+    path = cache_path(json_path)
+    tmp_path = path + ".tmp"
+    try:
+        if body is None:
+            body = marshal.dumps(subjects)
+        with open(tmp_path, "wb") as f:
+            f.write(_fingerprint(payload, os.stat(json_path).st_mtime_ns))
+            f.write(_BODY_CRC.pack(zlib.crc32(body)))
+            f.write(body)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError):
+        # The cache is only an accelerator; never fail a load or save over it
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_json(json_path: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Load a JSON data file, going through the binary sidecar when it is current
+
+    The sidecar is trusted only if its header matches the JSON file's size and
+    SHA-256 (and the Python version that wrote it); otherwise the JSON is
+    parsed and the sidecar rebuilt. A matching hash with a different mtime
+    (e.g. after a copy) is still accepted and re-stamped.
+    """
+    with open(json_path, "rb") as f:
+        payload = f.read()
+    if not use_cache:
+        return json.loads(payload.decode("utf-8"))
+
+    expected = bytearray(_fingerprint(payload, os.stat(json_path).st_mtime_ns))
+    try:
+        with open(cache_path(json_path), "rb") as f:
+            header = bytearray(f.read(_FINGERPRINT.size))
+            (body_crc,) = _BODY_CRC.unpack(f.read(_BODY_CRC.size))
+            body = f.read()
+        mtime_matches = header[_MTIME] == expected[_MTIME]
+        header[_MTIME] = expected[_MTIME]
+        if header == expected and zlib.crc32(body) == body_crc:
+            subjects = marshal.loads(body)
+            if not mtime_matches:
+                write_cache(json_path, payload, subjects)
+            return subjects
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        pass
+
+    subjects = json.loads(payload.decode("utf-8"))
+    write_cache(json_path, payload, subjects)
+    return subjects
@@ -0,0 +1,259 @@
+import datetime
+import glob
+import heapq
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Tuple, Any
+
+from planner import exam_schedule
+from stats import STATUSES, StatsEngine
+from storage import read_subjects
+
+WEAK_CONFIDENCE = 5  # below this a topic counts as weak (a lapse for the scheduler)
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class Cohort:
+    """Mergeable cohort-level totals over any number of students
+
+    Everything kept is bounded: completion rates go into a 1%-bucket
+    histogram, only the ``top`` most at-risk students are kept (in a heap),
+    and per-topic tallies are pruned to the ``max_topics`` topics shared by
+    the most students whenever they grow past twice that. Topic figures are
+    exact while the cohort has fewer distinct topics than that.
+    """
+
+    def __init__(self, at_risk_pace: float = 3.0, top: int = 20, max_topics: int = 50_000):
+        self.at_risk_pace = at_risk_pace
+        self.top = top
+        self.max_topics = max_topics
+        self.students = 0
+        self.empty = 0
+        self.topic_count = 0
+        self.sessions = 0
+        self.status_counts = dict.fromkeys(STATUSES, 0)
+        self.confidence_sum = 0
+        self.rated = 0
+        self.completion_histogram = [0] * 101
+        self.completion_sum = 0.0
+        self.at_risk_count = 0
+        self.at_risk: List[Tuple[float, str, str, int, int]] = []
+        # (subject, topic) -> [students, weak students, confidence sum]
+        self.topics: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(self, student: str, subjects: Dict[str, Any], now: datetime.datetime):
+        """Fold one student's statistics and exam schedule into the totals"""
+        # Everything that can trip over a malformed file runs before any total changes
+        stats = StatsEngine()
+        stats.rebuild(subjects)
+        total = stats.total
+        schedule = exam_schedule(subjects, lambda name: stats.subject(name).topics
+                                 - stats.subject(name).completed, now)
+        self.students += 1
+        self.sessions += total.sessions
+        if not total.topics:
+            self.empty += 1
+            return
+        self.topic_count += total.topics
+        for status, count in total.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+        self.confidence_sum += total.confidence_sum
+        self.rated += total.rated_topics
+        self.completion_histogram[min(int(total.completion_rate), 100)] += 1
+        self.completion_sum += total.completion_rate
+
+        paces = [entry for entry in schedule if entry["topics_per_day"] is not None]
+        worst = max(paces, key=lambda entry: entry["topics_per_day"], default=None)
+        if worst is not None and worst["topics_per_day"] >= self.at_risk_pace:
+            self.at_risk_count += 1
+            self._push_at_risk((worst["topics_per_day"], student, worst["subject"],
+                                worst["days_left"], worst["incomplete_topics"]))
+
+        for subject_name, subject in subjects.items():
+            for topic_name, topic in subject["topics"].items():
+                confidence = topic.get("confidence", 0)
+                confidence = confidence if isinstance(confidence, int) else 0
+                tally = self.topics.get((subject_name, topic_name))
+                if tally is None:
+                    tally = self.topics[(subject_name, topic_name)] = [0, 0, 0]
+                tally[0] += 1
+                tally[1] += confidence < WEAK_CONFIDENCE
+                tally[2] += confidence
+        if len(self.topics) > 2 * self.max_topics:
+            self._prune()
+
+    def _push_at_risk(self, entry):
+        if len(self.at_risk) < self.top:
+            heapq.heappush(self.at_risk, entry)
+        elif entry > self.at_risk[0]:
+            heapq.heapreplace(self.at_risk, entry)
+
+    def _prune(self):
+        keep = heapq.nlargest(self.max_topics, self.topics.items(), key=lambda item: item[1][0])
+        self.topics = dict(keep)
+
+    def merge(self, other: "Cohort"):
+        self.students += other.students
+        self.empty += other.empty
+        self.topic_count += other.topic_count
+        self.sessions += other.sessions
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+        self.confidence_sum += other.confidence_sum
+        self.rated += other.rated
+        for bucket, count in enumerate(other.completion_histogram):
+            self.completion_histogram[bucket] += count
+        self.completion_sum += other.completion_sum
+        self.at_risk_count += other.at_risk_count
+        for entry in other.at_risk:
+            self._push_at_risk(entry)
+        for key, (students, weak, confidence) in other.topics.items():
+            tally = self.topics.get(key)
+            if tally is None:
+                self.topics[key] = [students, weak, confidence]
+            else:
+                tally[0] += students
+                tally[1] += weak
+                tally[2] += confidence
+        if len(self.topics) > 2 * self.max_topics:
+            self._prune()
+
+    def _percentile(self, percent: int, students: int) -> int:
+        rank, seen = percent * students / 100, 0
+        for bucket, count in enumerate(self.completion_histogram):
+            seen += count
+            if seen >= rank and count:
+                return bucket
+        return 100
+
+    def weakest_topics(self, limit: int = 20, min_students: int = 3) -> List[Dict[str, Any]]:
+        """Topics most often weak across the students who have them"""
+        shared = [(key, tally) for key, tally in self.topics.items() if tally[0] >= min_students]
+        weakest = heapq.nsmallest(limit, shared, key=lambda item: (-item[1][1] / item[1][0],
+                                                                   item[1][2] / item[1][0], item[0]))
+        return [{"subject": subject, "topic": topic, "students": students,
+                 "weak_share": weak / students, "average_confidence": confidence / students}
+                for (subject, topic), (students, weak, confidence) in weakest]
+
+    def report(self, limit: int = 20, min_students: int = 3) -> Dict[str, Any]:
+        scored = self.students - self.empty
+        buckets = [0] * 10
+        for bucket, count in enumerate(self.completion_histogram):
+            buckets[min(bucket // 10, 9)] += count
+        return {
+            "students": self.students,
+            "students_without_topics": self.empty,
+            "topics": self.topic_count,
+            "status_counts": self.status_counts,
+            "sessions": self.sessions,
+            "average_confidence": self.confidence_sum / self.rated if self.rated else None,
+            "completion": {
+                "mean": self.completion_sum / scored if scored else None,
+                "percentiles": {f"p{p}": self._percentile(p, scored) for p in PERCENTILES} if scored else {},
+                "histogram": {f"{10 * i}-{10 * i + 9 if i < 9 else 100}%": count
+                              for i, count in enumerate(buckets)},
+            },
+            "at_risk": {
+                "topics_per_day_threshold": self.at_risk_pace,
+                "students": self.at_risk_count,
+                "worst": [{"student": student, "subject": subject, "days_left": left,
+                           "incomplete_topics": incomplete, "topics_per_day": pace}
+                          for pace, student, subject, left, incomplete in sorted(self.at_risk, reverse=True)],
+            },
+            "weakest_topics": self.weakest_topics(limit, min_students),
+        }
+
+
+def student_files(directory: str, pattern: str = "**/*.json") -> Iterator[str]:
+    """Student data files under directory, found lazily
+
+    The sharded backend's ``<name>.shards/`` directories (a manifest and one
+    file per subject) belong to the data file beside them and are skipped.
+    """
+    for path in glob.iglob(os.path.join(directory, pattern), recursive=True):
+        parents = os.path.relpath(os.path.dirname(path), directory).split(os.sep)
+        if not any(part.endswith(".shards") for part in parents):
+            yield path
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_files(directory: str, paths: List[str], now: datetime.datetime, backend: str = "journal",
+                  options: Dict[str, Any] = None) -> Tuple[Cohort, List[Tuple[str, str]]]:
+    """Worker task: one Cohort for a chunk of files, plus the files that failed"""
+    cohort = Cohort(**(options or {}))
+    failed = []
+    for path in paths:
+        student = os.path.relpath(path, directory)
+        try:
+            subjects = read_subjects(path, backend)
+            cohort.add(student, subjects, now)
+        except (OSError, AttributeError, KeyError, TypeError, ValueError) as e:
+            failed.append((student, f"{type(e).__name__}: {e}"))
+    return cohort, failed
+
+
+def analyze_cohort(directory: str, workers: int = None, pattern: str = "**/*.json", backend: str = "journal",
+                   chunk_size: int = 32, progress_every: float = 2.0, at_risk_pace: float = 3.0,
+                   top: int = 20, max_topics: int = 50_000, min_students: int = 3) -> Dict[str, Any]:
+    """Cohort report over every student data file under directory
+
+    Files are handed to a process pool ``chunk_size`` at a time and each task
+    returns a partial Cohort, so only small totals cross process boundaries.
+    At most two chunks per worker are in flight, which bounds memory however
+    many files there are. ``workers=1`` runs everything in this process.
+    Progress goes to stderr every ``progress_every`` seconds (0 disables it).
+    Student files are only read (see ``storage.read_subjects``): ``backend``
+    says where to look first, and nothing is imported, migrated or compacted.
+    """
+    workers = workers or os.cpu_count() or 1
+    options = {"at_risk_pace": at_risk_pace, "top": top, "max_topics": max_topics}
+    now = datetime.datetime.now()
+    total = Cohort(**options)
+    failed: List[Tuple[str, str]] = []
+    start = last_report = time.perf_counter()
+
+    def collect(result):
+        nonlocal last_report
+        cohort, errors = result
+        total.merge(cohort)
+        failed.extend(errors)
+        clock = time.perf_counter()
+        if progress_every and clock - last_report >= progress_every:
+            last_report = clock
+            print(f"⏳ {total.students:,} students analysed "
+                  f"({total.students / (clock - start):,.0f} files/sec)", file=sys.stderr)
+
+    chunks = _chunks(student_files(directory, pattern), chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            collect(analyze_files(directory, chunk, now, backend, options))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            in_flight = set()
+            for chunk in chunks:
+                in_flight.add(pool.submit(analyze_files, directory, chunk, now, backend, options))
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+            for future in in_flight:
+                collect(future.result())
+
+    report = total.report(top, min_students)
+    report["failed"] = [{"file": student, "error": error} for student, error in failed[:top]]
+    report["failed_count"] = len(failed)
+    report["workers"] = workers
+    report["seconds"] = time.perf_counter() - start
+    return report
@@ -0,0 +1,197 @@
+import datetime
+from typing import Dict, Any
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only the columnar mode needs it
+    np = None
+
+from scheduler import date_ordinal, days_left
+from stats import summary_totals
+
+STATUS_CODES = {"not_started": 0, "in_progress": 1, "completed": 2}
+DIFFICULTY_CODES = {"easy": 0, "medium": 1, "hard": 2}
+
+
+def dict_summary(subjects: Dict[str, Any], now: datetime.datetime = None) -> Dict[str, Any]:
+    """Reference statistics computed by walking the per-topic dicts"""
+    now = now or datetime.datetime.now()
+    histogram = [0] * 11
+    all_rated = []
+    per_subject = {}
+    for name, subject in subjects.items():
+        topics = subject["topics"].values()
+        completed = sum(1 for t in topics if t["status"] == "completed")
+        in_progress = sum(1 for t in topics if t["status"] == "in_progress")
+        rated = [t["confidence"] for t in topics if t["confidence"] > 0]
+        all_rated.extend(rated)
+        for t in topics:
+            histogram[min(max(t["confidence"], 0), 10)] += 1
+        exam = date_ordinal(subject["exam_date"])
+        per_subject[name] = {
+            "topics": len(topics),
+            "completed": completed,
+            "in_progress": in_progress,
+            "completion_rate": (completed / len(topics)) * 100 if topics else 0.0,
+            "average_confidence": sum(rated) / len(rated) if rated else None,
+            "study_time": sum(t["study_time"] for t in topics),
+            "days_until_exam": days_left(exam, now) if exam else None,
+        }
+    return summary_totals(per_subject, histogram,
+                   sum(s["total_sessions"] for s in subjects.values()),
+                   len(all_rated), sum(all_rated))
+
+
+class ColumnarTopics:
+    """Topic fields stored as NumPy columns, grouped by subject
+
+    Topics of subject ``i`` occupy rows ``offsets[i]:offsets[i + 1]``. Statistics
+    are computed with vectorized bincounts instead of per-topic dict access.
+    Field updates are written into the columns in place. Deleted topics and
+    subjects leave tombstone rows (zeroed and excluded from the counts) until
+    more than half the rows are dead; that, and adding topics or subjects,
+    marks the columns stale and they are rebuilt on the next query.
+    """
+
+    def __init__(self, subjects: Dict[str, Any]):
+        if np is None:
+            raise RuntimeError("The columnar mode requires numpy (pip install numpy)")
+        self.subjects = subjects
+        self.topics_scanned = 0
+        self.rebuild()
+
+    def rebuild(self):
+        subjects = self.subjects
+        self.names = list(subjects)
+        lengths = np.fromiter((len(s["topics"]) for s in subjects.values()),
+                              dtype=np.int64, count=len(subjects))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.subject_ids = np.repeat(np.arange(len(subjects), dtype=np.int32), lengths)
+        count = int(self.offsets[-1])
+
+        def column(field, dtype, convert=None):
+            values = (t[field] for s in subjects.values() for t in s["topics"].values())
+            if convert is not None:
+                values = map(convert, values)
+            return np.fromiter(values, dtype=dtype, count=count)
+
+        self.status = column("status", np.int8, lambda v: STATUS_CODES.get(v, -1))
+        self.confidence = column("confidence", np.int8)
+        self.study_time = column("study_time", np.int64)
+        self.difficulty = column("difficulty", np.int8, lambda v: DIFFICULTY_CODES.get(v, -1))
+        self.last_reviewed = column("last_reviewed", np.int32, date_ordinal)
+        self.exam_dates = np.fromiter((date_ordinal(s["exam_date"]) for s in subjects.values()),
+                                      dtype=np.int64, count=len(subjects))
+        self.sessions = sum(s["total_sessions"] for s in subjects.values())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        # Row order per subject; positions are built per subject on first use
+        self.topic_names = [list(s["topics"]) for s in subjects.values()]
+        self.positions: Dict[int, Dict[str, int]] = {}
+        self.alive = np.ones(count, dtype=bool)
+        self.subject_alive = np.ones(len(subjects), dtype=bool)
+        self.removed = np.zeros(len(subjects), dtype=np.int64)
+        self.dead = 0
+        self.stale = False
+
+    def _positions(self, subject: int) -> Dict[str, int]:
+        positions = self.positions.get(subject)
+        if positions is None:
+            start = int(self.offsets[subject])
+            positions = self.positions[subject] = {
+                topic: start + i for i, topic in enumerate(self.topic_names[subject])}
+        return positions
+
+    def _position(self, subject_name: str, topic_name: str) -> int:
+        return self._positions(self.index[subject_name])[topic_name]
+
+    def _bury(self, subject: int, rows):
+        """Turn rows into tombstones that no count or sum sees"""
+        killed = int(self.alive[rows].sum())
+        self.alive[rows] = False
+        self.status[rows] = -1
+        self.confidence[rows] = 0
+        self.study_time[rows] = 0
+        self.last_reviewed[rows] = 0
+        self.removed[subject] += killed
+        self.dead += killed
+        if self.dead * 2 > len(self.alive):
+            self.stale = True
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        """Write field changes into the columns; structural changes mark them stale"""
+        if self.stale:
+            return
+        kind = op["op"]
+        if kind == "set_topic":
+            if old is None:
+                return
+            row = self._position(op["subject"], op["topic"])
+            fields = op["fields"]
+            if "status" in fields:
+                self.status[row] = STATUS_CODES.get(fields["status"], -1)
+            if "confidence" in fields:
+                self.confidence[row] = fields["confidence"]
+            if "study_time" in fields:
+                self.study_time[row] = fields["study_time"]
+            if "difficulty" in fields:
+                self.difficulty[row] = DIFFICULTY_CODES.get(fields["difficulty"], -1)
+            if "last_reviewed" in fields:
+                self.last_reviewed[row] = date_ordinal(fields["last_reviewed"])
+        elif kind == "set_subject":
+            if old is None:
+                return
+            fields = op["fields"]
+            if "exam_date" in fields:
+                self.exam_dates[self.index[op["subject"]]] = date_ordinal(fields["exam_date"])
+            if "total_sessions" in fields:
+                self.sessions += fields["total_sessions"] - old.get("total_sessions", 0)
+        elif kind == "del_topic":
+            if old is None:
+                return
+            subject = self.index[op["subject"]]
+            self._bury(subject, self._positions(subject).pop(op["topic"]))
+        elif kind == "del_subject":
+            if op["subject"] not in self.index:
+                return
+            subject = self.index.pop(op["subject"])
+            self.subject_alive[subject] = False
+            self.sessions -= old.get("total_sessions", 0)
+            self._bury(subject, slice(int(self.offsets[subject]), int(self.offsets[subject + 1])))
+        else:
+            self.stale = True
+
+    def summary(self, now: datetime.datetime = None) -> Dict[str, Any]:
+        """The statistics of ``dict_summary``, computed column-wise"""
+        if self.stale:
+            self.rebuild()
+        now = now or datetime.datetime.now()
+        n = len(self.names)
+        self.topics_scanned += len(self.status)
+        ids = self.subject_ids
+        topics = np.diff(self.offsets) - self.removed
+        completed = np.bincount(ids[self.status == 2], minlength=n)
+        in_progress = np.bincount(ids[self.status == 1], minlength=n)
+        rated_mask = self.confidence > 0
+        rated = np.bincount(ids[rated_mask], minlength=n)
+        confidence_sum = np.bincount(ids, weights=self.confidence, minlength=n)
+        study_time = np.bincount(ids, weights=self.study_time, minlength=n)
+        histogram = np.bincount(np.clip(self.confidence, 0, 10), minlength=11)
+        histogram[0] -= self.dead  # tombstones hold confidence 0
+        remaining = days_left(self.exam_dates, now)
+
+        per_subject = {}
+        for i, name in enumerate(self.names):
+            if not self.subject_alive[i]:
+                continue
+            total = int(topics[i])
+            per_subject[name] = {
+                "topics": total,
+                "completed": int(completed[i]),
+                "in_progress": int(in_progress[i]),
+                "completion_rate": (int(completed[i]) / total) * 100 if total else 0.0,
+                "average_confidence": int(confidence_sum[i]) / int(rated[i]) if rated[i] else None,
+                "study_time": int(study_time[i]),
+                "days_until_exam": int(remaining[i]) if self.exam_dates[i] else None,
+            }
+        return summary_totals(per_subject, [int(c) for c in histogram], self.sessions,
+                       int(rated_mask.sum()), int(confidence_sum.sum()))
@@ -0,0 +1,244 @@
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Set, Tuple, Any
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; signatures are computed in pure Python without it
+    np = None
+
+from search import tokenize
+
+SHINGLE_LENGTH = 3
+BANDS = 16
+BAND_ROWS = 4
+# 16 bands of 4 rows put the LSH threshold near (1/16) ** (1/4) = 0.5, so
+# names above this Jaccard similarity are almost always candidates
+THRESHOLD = 0.5
+_MASK = (1 << 64) - 1
+# Commas, semicolons, pipes, line breaks and spaced slashes separate topics;
+# "and" does not ("laws and motion" is one topic)
+_SEPARATOR = re.compile(r"\s*(?:[,;|\n]|\s/\s)\s*")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize(name: str) -> str:
+    """Case-folded words of a name, single-spaced, without punctuation"""
+    return " ".join(tokenize(name))
+
+
+def split_compound(name: str) -> List[str]:
+    """The separate topics in a comma- or semicolon-joined name (``[name]`` if it is just one)"""
+    parts, seen = [], set()
+    for part in _SEPARATOR.split(name):
+        part = part.strip(" .-")
+        key = normalize(part)
+        if key and key not in seen:
+            seen.add(key)
+            parts.append(part)
+    return parts or [name.strip()]
+
+
+def shingles(name: str) -> Set[int]:
+    """Hashed character 3-grams of the normalized name, so single typos change only a few"""
+    text = f" {normalize(name)} "
+    return {zlib.crc32(text[i:i + SHINGLE_LENGTH].encode("utf-8"))
+            for i in range(max(len(text) - SHINGLE_LENGTH + 1, 1))}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two names' shingles; 0 when they carry different numbers
+
+    "Chapter 1" and "Chapter 2" differ by one character but are not duplicates.
+    """
+    if _NUMBER.findall(a) != _NUMBER.findall(b):
+        return 0.0
+    return jaccard(shingles(a), shingles(b))
+
+
+def _features(name: str, cache: Dict[str, Tuple[List[str], Set[int]]]) -> Tuple[List[str], Set[int]]:
+    found = cache.get(name)
+    if found is None:
+        found = cache[name] = (_NUMBER.findall(name), shingles(name))
+    return found
+
+
+class MinHasher:
+    """MinHash signatures cut into LSH bands
+
+    Each of the ``bands * rows`` hash functions is a multiply-add-shift hash
+    of the 32-bit shingle hashes, seeded so signatures are the same in every
+    process. Two names share a band (become candidates) with probability
+    ``1 - (1 - J ** rows) ** bands`` for Jaccard similarity J. With numpy the
+    hashes are computed as one uint64 matrix (whose overflow wraps exactly
+    like the pure-Python mask), which is many times faster.
+    """
+
+    def __init__(self, bands: int = BANDS, rows: int = BAND_ROWS, seed: int = 1):
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = rows
+        self.params = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(bands * rows)]
+        if np is not None:
+            self.a = np.array([a for a, _ in self.params], dtype=np.uint64)[:, None]
+            self.b = np.array([b for _, b in self.params], dtype=np.uint64)[:, None]
+
+    def signature(self, hashes: Iterable[int]) -> List[int]:
+        if np is not None:
+            x = np.fromiter(hashes, dtype=np.uint64)
+            return ((self.a * x + self.b) >> np.uint64(32)).min(axis=1).tolist()
+        hashes = list(hashes)
+        return [min([((a * x + b) & _MASK) >> 32 for x in hashes]) for a, b in self.params]
+
+    def band_keys(self, hashes: Iterable[int]) -> List[Tuple[int, ...]]:
+        signature, rows = self.signature(hashes), self.rows
+        return [tuple(signature[i:i + rows]) for i in range(0, len(signature), rows)]
+
+
+class NearDuplicateIndex:
+    """LSH index over one subject's topic names
+
+    Adding, removing or looking up a name costs one signature plus the
+    candidates sharing one of its bands, so finding every near-duplicate in a
+    subject is roughly linear in its size instead of comparing all pairs.
+    Candidates are confirmed with their exact ``similarity``.
+    """
+
+    def __init__(self, hasher: MinHasher, threshold: float = THRESHOLD):
+        self.hasher = hasher
+        self.threshold = threshold
+        self.buckets: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(hasher.bands)]
+        self.names: Dict[str, List[Tuple[int, ...]]] = {}  # name -> its band keys, for removal
+        self.comparisons = 0
+
+    def add(self, name: str):
+        if name in self.names:
+            return
+        keys = self.names[name] = self.hasher.band_keys(shingles(name))
+        for bucket, key in zip(self.buckets, keys):
+            bucket.setdefault(key, []).append(name)
+
+    def remove(self, name: str):
+        keys = self.names.pop(name, None)
+        if keys is None:
+            return
+        for bucket, key in zip(self.buckets, keys):
+            members = bucket[key]
+            members.remove(name)
+            if not members:
+                del bucket[key]
+
+    def candidates(self, name: str) -> Set[str]:
+        keys = self.names.get(name) or self.hasher.band_keys(shingles(name))
+        found = set()
+        for bucket, key in zip(self.buckets, keys):
+            found.update(bucket.get(key, ()))
+        found.discard(name)
+        return found
+
+    def similar(self, name: str, threshold: float = None,
+                features: Dict[str, Tuple[List[str], Set[int]]] = None) -> List[Tuple[str, float]]:
+        """Indexed names at least ``threshold`` similar to ``name``, most similar first
+
+        ``features`` caches each name's numbers and shingles across calls.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        features = {} if features is None else features
+        candidates = self.candidates(name)
+        self.comparisons += len(candidates)
+        numbers, grams = _features(name, features)
+        scored = []
+        for other in candidates:
+            other_numbers, other_grams = _features(other, features)
+            score = jaccard(grams, other_grams) if numbers == other_numbers else 0.0
+            if score >= threshold:
+                scored.append((other, score))
+        return sorted(scored, key=lambda entry: (-entry[1], entry[0]))
+
+    def groups(self, threshold: float = None) -> List[List[str]]:
+        """Clusters of near-duplicate names (connected through confirmed pairs), largest first"""
+        parent: Dict[str, str] = {}
+        features: Dict[str, Tuple[List[str], Set[int]]] = {}
+
+        def find(name: str) -> str:
+            while parent[name] != name:
+                name = parent[name]
+            return name
+
+        for name in self.names:
+            for other, _ in self.similar(name, threshold, features):
+                if other > name:
+                    roots = sorted((find(parent.setdefault(name, name)), find(parent.setdefault(other, other))))
+                    parent[roots[1]] = roots[0]
+        clusters: Dict[str, List[str]] = {}
+        for name in parent:
+            clusters.setdefault(find(name), []).append(name)
+        return sorted((sorted(cluster) for cluster in clusters.values()), key=lambda cluster: (-len(cluster), cluster))
+
+
+class DuplicateFinder:
+    """Per-subject near-duplicate indexes, built on first use and kept current as a change listener"""
+
+    def __init__(self, threshold: float = THRESHOLD, bands: int = BANDS, rows: int = BAND_ROWS):
+        self.hasher = MinHasher(bands, rows)
+        self.threshold = threshold
+        self.indexes: Dict[str, NearDuplicateIndex] = {}
+        self.topics_scanned = 0
+
+    def index(self, subjects: Dict[str, Any], subject_name: str) -> NearDuplicateIndex:
+        index = self.indexes.get(subject_name)
+        if index is None:
+            index = self.indexes[subject_name] = NearDuplicateIndex(self.hasher, self.threshold)
+            topics = subjects[subject_name]["topics"] if subject_name in subjects else {}
+            for topic in topics:
+                index.add(topic)
+            self.topics_scanned += len(topics)
+        return index
+
+    def note(self, subjects: Dict[str, Any], subject_name: str, topic: str):
+        """Index a topic that is about to be added (for checks later in the same batch)"""
+        self.index(subjects, subject_name).add(topic)
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        kind = op["op"]
+        index = self.indexes.get(op["subject"])
+        if index is None:
+            return
+        # A brand-new subject keeps the index holding the topics noted for it
+        if kind == "del_subject" or (kind == "add_subject" and old is not None):
+            del self.indexes[op["subject"]]
+        elif kind == "add_topic":
+            index.add(op["topic"])
+        elif kind == "del_topic":
+            index.remove(op["topic"])
+
+    def similar(self, subjects: Dict[str, Any], subject_name: str, name: str,
+                threshold: float = None) -> List[Tuple[str, float]]:
+        return self.index(subjects, subject_name).similar(name, threshold)
+
+    def report(self, subjects: Dict[str, Any], subject_name: str, threshold: float = None) -> Dict[str, Any]:
+        """Compound topics, near-duplicate groups, and topics listed in the notes but missing
+
+        The subject notes only count as a topic list when they split into
+        several parts; a part is missing when neither a topic nor a part of a
+        compound topic resembles it.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        index = self.index(subjects, subject_name)
+        subject = subjects[subject_name]
+        compound = {}
+        for topic in subject["topics"]:
+            parts = split_compound(topic)
+            if len(parts) > 1:
+                compound[topic] = parts
+        compound_parts = [part for parts in compound.values() for part in parts]
+        listed = split_compound(subject.get("notes", ""))
+        from_notes = [part for part in listed if len(listed) > 1
+                      and part not in subject["topics"] and not index.similar(part, threshold)
+                      and all(similarity(part, other) < threshold for other in compound_parts)]
+        return {"compound": compound, "groups": index.groups(threshold), "from_notes": from_notes}
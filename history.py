@@ -0,0 +1,192 @@
+import bisect
+import datetime
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterator, List, Tuple, Any
+
+# timestamp (unix seconds), topic id, rating (0 = none), kind, duration (seconds)
+RECORD = struct.Struct("<IIbBH")
+REVIEW, CONFIDENCE, QUIZ, SESSION = range(4)
+KINDS = ("review", "confidence", "quiz", "session")
+MAX_DURATION = 0xFFFF
+
+
+def history_path(data_file: str) -> str:
+    return data_file + ".history"
+
+
+def _timestamp(day: datetime.date) -> int:
+    return int(datetime.datetime.combine(day, datetime.time()).timestamp())
+
+
+class _Records:
+    """Read-only sequence view of the timestamp-ordered records in a mapped file"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data) // RECORD.size
+
+    def __getitem__(self, index: int) -> int:
+        return RECORD.unpack_from(self.data, index * RECORD.size)[0]
+
+
+class StudyHistory:
+    """Append-only log of every review, quiz rating and study session
+
+    Each event is a 12-byte record (timestamp, topic id, rating, kind,
+    duration) appended in timestamp order, so years of daily study stay in
+    the low megabytes. Topic ids index a separate append-only list of
+    ``[subject, topic]`` names, one JSON line each; session events use an
+    empty topic name. Range queries memory-map the records and binary-search
+    the timestamps, so they read only the slice they cover.
+
+    Events are stamped with ``clock()`` (unix seconds) unless given a time.
+    New events are buffered and appended on ``flush`` (called on every save)
+    and fsynced on ``close``. A torn tail left by a crash is cut back to the
+    last whole record on open.
+    """
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.names_path = path + ".topics"
+        self.names: List[Tuple[str, str]] = []
+        self.ids: Dict[Tuple[str, str], int] = {}
+        self.new_names: List[Tuple[str, str]] = []
+        self.buffer = bytearray()
+        self.last_time = 0
+        self._open()
+
+    def _open(self):
+        if os.path.exists(self.names_path):
+            with open(self.names_path, "rb") as f:
+                data = f.read()
+            whole = data.rfind(b"\n") + 1
+            for line in data[:whole].splitlines():
+                self._add_name(*json.loads(line))
+            if whole != len(data):
+                os.truncate(self.names_path, whole)
+        if os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+            whole = size - size % RECORD.size
+            if whole != size:
+                os.truncate(self.path, whole)
+            if whole:
+                with open(self.path, "rb") as f:
+                    f.seek(whole - RECORD.size)
+                    self.last_time = RECORD.unpack(f.read(RECORD.size))[0]
+
+    def _add_name(self, subject: str, topic: str) -> int:
+        key = (subject, topic)
+        self.ids[key] = len(self.names)
+        self.names.append(key)
+        return self.ids[key]
+
+    def record(self, subject: str, topic: str, kind: int, rating: int = 0,
+               duration: float = 0, when: float = None):
+        """Buffer one event; ``topic`` is "" for a study session"""
+        topic_id = self.ids.get((subject, topic))
+        if topic_id is None:
+            topic_id = self._add_name(subject, topic)
+            self.new_names.append((subject, topic))
+        # Clamp to the previous record so the file stays sorted if the clock steps back
+        timestamp = max(int(self.clock() if when is None else when), self.last_time)
+        self.last_time = timestamp
+        duration = min(max(int(round(duration or 0)), 0), MAX_DURATION)
+        self.buffer += RECORD.pack(timestamp, topic_id, rating or 0, kind, duration)
+
+    def flush(self, sync: bool = False):
+        """Append buffered names, then buffered records (names first, so ids always resolve)"""
+        for path, payload in ((self.names_path, b"".join(
+                json.dumps(name, ensure_ascii=False).encode("utf-8") + b"\n" for name in self.new_names)),
+                              (self.path, bytes(self.buffer))):
+            if payload or (sync and os.path.exists(path)):
+                with open(path, "ab") as f:
+                    f.write(payload)
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+        self.new_names = []
+        self.buffer = bytearray()
+
+    def close(self):
+        self.flush(sync=True)
+
+    def events(self, start: datetime.date = None, end: datetime.date = None,
+               subject: str = None) -> Iterator[Dict[str, Any]]:
+        """Events from ``start`` up to (not including) ``end``, optionally for one subject"""
+        for timestamp, topic_id, rating, kind, duration in self._scan(start, end, subject):
+            name = self.names[topic_id]
+            yield {"time": timestamp, "subject": name[0], "topic": name[1], "kind": KINDS[kind],
+                   "rating": rating or None, "duration": duration}
+
+    def _scan(self, start: datetime.date, end: datetime.date, subject: str):
+        self.flush()
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return
+        wanted = None
+        if subject is not None:
+            wanted = {i for i, name in enumerate(self.names) if name[0] == subject}
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            records = _Records(data)
+            low = bisect.bisect_left(records, _timestamp(start)) if start else 0
+            high = bisect.bisect_left(records, _timestamp(end)) if end else len(records)
+            known = len(self.names)
+            for record in RECORD.iter_unpack(data[low * RECORD.size:high * RECORD.size]):
+                if record[1] < known and (wanted is None or record[1] in wanted):
+                    yield record
+
+    def buckets(self, start: datetime.date, end: datetime.date, bucket_days: int = 1,
+                subject: str = None) -> List[Dict[str, Any]]:
+        """Downsample a date range into ``bucket_days``-day buckets
+
+        Each bucket has the number of events, the ratings given (quiz ratings
+        and confidence updates), their average, the distinct topics touched
+        and the minutes spent. Empty buckets are included so series line up.
+        """
+        if bucket_days < 1:
+            raise ValueError("Bucket size must be at least 1 day")
+        count = -(-(end - start).days // bucket_days)
+        series = [{"start": (start + datetime.timedelta(days=i * bucket_days)).isoformat(),
+                   "events": 0, "ratings": 0, "rating_sum": 0, "topics": set(), "seconds": 0}
+                  for i in range(max(count, 0))]
+        first = start.toordinal()
+        day_cache: Dict[int, int] = {}
+        for timestamp, topic_id, rating, kind, duration in self._scan(start, end, subject):
+            # Every UTC offset is a multiple of 15 minutes, so one local-date
+            # conversion per quarter hour of history is enough
+            quarter = timestamp // 900
+            day = day_cache.get(quarter)
+            if day is None:
+                day = day_cache[quarter] = datetime.date.fromtimestamp(timestamp).toordinal()
+            bucket = series[(day - first) // bucket_days]
+            bucket["events"] += 1
+            bucket["seconds"] += duration
+            if rating:
+                bucket["ratings"] += 1
+                bucket["rating_sum"] += rating
+            if kind != SESSION:
+                bucket["topics"].add(topic_id)
+        for bucket in series:
+            rating_sum = bucket.pop("rating_sum")
+            bucket["average_rating"] = rating_sum / bucket["ratings"] if bucket["ratings"] else None
+            bucket["topics"] = len(bucket["topics"])
+            bucket["minutes"] = round(bucket.pop("seconds") / 60, 1)
+        return series
+
+    def daily(self, days: int = 14, subject: str = None, today: datetime.date = None) -> List[Dict[str, Any]]:
+        """Per-day activity and average rating over the last ``days`` days"""
+        today = today or datetime.date.today()
+        return self.buckets(today - datetime.timedelta(days=days - 1), today + datetime.timedelta(days=1),
+                            1, subject)
+
+    def learning_curve(self, subject: str, weeks: int = 12, today: datetime.date = None) -> List[Dict[str, Any]]:
+        """Weekly average rating for one subject over the last ``weeks`` weeks"""
+        today = today or datetime.date.today()
+        end = today + datetime.timedelta(days=1)
+        return self.buckets(end - datetime.timedelta(weeks=weeks), end, 7, subject)
@@ -0,0 +1,201 @@
+import csv
+import datetime
+import itertools
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple, Any
+
+from dedup import split_compound
+
+STATUSES = ("not_started", "in_progress", "completed")
+DIFFICULTIES = ("easy", "medium", "hard")
+PRIORITIES = ("high", "medium", "low")
+MAX_REPORTED_ERRORS = 20
+
+
+class RowError(ValueError):
+    """A syllabus row that cannot be imported"""
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream (line number, raw row) pairs from a CSV or JSONL file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {"__error__": f"invalid JSON ({e.msg})"}
+                yield line_no, row if isinstance(row, dict) else {"__error__": "not a JSON object"}
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _date(value: str, field: str) -> str:
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise RowError(f"invalid {field} '{value}' (expected YYYY-MM-DD)") from None
+    return value
+
+
+def parse_row(row: Dict[str, Any], default_subject: str = "") -> Dict[str, Any]:
+    """Validate one raw row into a topic record, raising RowError on bad input"""
+    if "__error__" in row:
+        raise RowError(row["__error__"])
+    clean = {k.strip().lower(): (v.strip() if isinstance(v, str) else v)
+             for k, v in row.items() if k is not None}
+    subject = clean.get("subject") or default_subject
+    topic = clean.get("topic")
+    if not subject:
+        raise RowError("missing subject")
+    if not topic:
+        raise RowError("missing topic")
+
+    fields = {}
+    if clean.get("status"):
+        if clean["status"] not in STATUSES:
+            raise RowError(f"unknown status '{clean['status']}'")
+        fields["status"] = clean["status"]
+    for field, low, high in (("confidence", 0, 10), ("study_time", 0, None)):
+        if clean.get(field) not in (None, ""):
+            try:
+                value = int(clean[field])
+            except (TypeError, ValueError):
+                raise RowError(f"{field} must be a whole number") from None
+            if value < low or (high is not None and value > high):
+                raise RowError(f"{field} out of range")
+            fields[field] = value
+    if clean.get("difficulty"):
+        if clean["difficulty"] not in DIFFICULTIES:
+            raise RowError(f"unknown difficulty '{clean['difficulty']}'")
+        fields["difficulty"] = clean["difficulty"]
+    if clean.get("last_reviewed"):
+        fields["last_reviewed"] = _date(clean["last_reviewed"], "last_reviewed")
+    if clean.get("notes"):
+        fields["notes"] = str(clean["notes"])
+
+    subject_fields = {}
+    if clean.get("exam_date"):
+        subject_fields["exam_date"] = _date(clean["exam_date"], "exam_date")
+    if clean.get("priority"):
+        if clean["priority"] not in PRIORITIES:
+            raise RowError(f"unknown priority '{clean['priority']}'")
+        subject_fields["priority"] = clean["priority"]
+    return {"subject": str(subject), "topic": str(topic), "fields": fields,
+            "subject_fields": subject_fields}
+
+
+class BulkImporter:
+    """Non-interactive syllabus import: read -> validate -> split -> dedupe -> insert in batches
+
+    Every stage is a generator, so only one batch of rows is held at a time
+    regardless of the input size. Topics already present (in the data or
+    earlier in the same file) are skipped. With ``split_topics``, comma-joined
+    topics become one row per part; with ``similarity``, topics at least that
+    similar to an existing or earlier topic of their subject are skipped as
+    near-duplicates. Each batch's changes are written out (without fsync)
+    once it is inserted, so a backend that buffers them, like the journal,
+    does not hold the whole import in memory; one durable flush at the end
+    makes the import safe.
+    """
+
+    def __init__(self, assistant, batch_size: int = 1000, default_subject: str = "",
+                 progress_every: int = 0, split_topics: bool = False, similarity: float = None):
+        self.assistant = assistant
+        self.batch_size = batch_size
+        self.default_subject = default_subject
+        self.progress_every = progress_every
+        self.split_topics = split_topics
+        self.similarity = similarity
+        self.report = {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0,
+                       "subjects_created": 0, "split": 0, "similar": 0, "errors": [], "similar_topics": []}
+
+    def validate(self, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        for line_no, row in rows:
+            self.report["rows"] += 1
+            try:
+                yield parse_row(row, self.default_subject)
+            except RowError as e:
+                self.report["invalid"] += 1
+                if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+                    self.report["errors"].append(f"line {line_no}: {e}")
+
+    def split(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            parts = split_compound(record["topic"])
+            if len(parts) > 1:
+                self.report["split"] += 1
+            for part in parts:
+                yield dict(record, topic=part)
+
+    def dedupe(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        # Inserted topics land in assistant.subjects before the next batch is
+        # read, so only the batch in flight needs its own seen-set
+        seen = set()
+        subjects = self.assistant.subjects
+        duplicates = self.assistant.duplicates
+        for record in records:
+            key = (record["subject"], record["topic"])
+            subject = subjects.get(record["subject"])
+            if key in seen or (subject is not None and record["topic"] in subject["topics"]):
+                self.report["duplicates"] += 1
+                continue
+            if self.similarity is not None:
+                similar = duplicates.similar(subjects, record["subject"], record["topic"], self.similarity)
+                if similar:
+                    self.report["similar"] += 1
+                    if len(self.report["similar_topics"]) < MAX_REPORTED_ERRORS:
+                        self.report["similar_topics"].append(
+                            f"{record['subject']}: '{record['topic']}' ~ '{similar[0][0]}'")
+                    continue
+                # Index it now so later rows of this batch are checked against it
+                duplicates.note(subjects, record["subject"], record["topic"])
+            seen.add(key)
+            if len(seen) >= self.batch_size:
+                seen.clear()
+            yield record
+
+    @staticmethod
+    def batched(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+        iterator = iter(records)
+        while True:
+            batch = list(itertools.islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+
+    def insert(self, batch: List[Dict[str, Any]]):
+        assistant = self.assistant
+        for record in batch:
+            if record["subject"] not in assistant.subjects:
+                assistant.create_subject(record["subject"])
+                self.report["subjects_created"] += 1
+            subject = assistant.subjects[record["subject"]]
+            changed = {k: v for k, v in record["subject_fields"].items() if subject.get(k) != v}
+            if changed:
+                assistant.update_subject(record["subject"], **changed)
+            assistant.create_topic(record["subject"], record["topic"], **record["fields"])
+        self.report["imported"] += len(batch)
+
+    def run(self, path: str) -> Dict[str, Any]:
+        """Import a CSV/JSONL syllabus file and return the import report"""
+        start = time.perf_counter()
+        next_progress = self.progress_every
+        records = self.validate(read_rows(path))
+        pipeline = self.dedupe(self.split(records) if self.split_topics else records)
+        for batch in self.batched(pipeline, self.batch_size):
+            self.insert(batch)
+            self.assistant.spill_data()
+            if self.progress_every and self.report["rows"] >= next_progress:
+                elapsed = time.perf_counter() - start
+                print(f"  ... {self.report['rows']:,} rows ({self.report['rows'] / elapsed:,.0f} rows/sec)")
+                next_progress += self.progress_every
+        self.assistant.save_data()
+        self.report["seconds"] = time.perf_counter() - start
+        self.report["rows_per_sec"] = self.report["rows"] / self.report["seconds"] if self.report["seconds"] else 0.0
+        return self.report
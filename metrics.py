@@ -0,0 +1,177 @@
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import time
+from typing import Dict, Tuple, Any
+
+# Core operations and menu actions that Instrumentation wraps
+OPERATIONS = (
+    "load_data", "save_data", "close", "save_subject", "add_topic_list", "progress_report",
+    "revision_queue", "review_topic", "log_study_session", "quiz_topics", "record_quiz_rating",
+    "schedule_report", "search_topics", "statistics_report", "study_plan", "history_report",
+    "find_topics", "delete_topics", "summary", "similar_topics", "duplicate_report", "split_topic",
+    "merge_topics", "sync_with", "quiz_questions", "quiz_score", "study_tips",
+)
+MENU_ACTIONS = (
+    "add_subject", "add_topics", "view_progress", "start_revision", "quiz_mode", "study_schedule",
+    "get_study_tips", "view_statistics", "delete_data", "delete_topics_menu", "search_menu",
+    "clean_up_topics",
+)
+PREFIX = "study_assistant"
+
+
+class Metrics:
+    """Registry of per-operation timers and counters
+
+    Timers keep ``[calls, total seconds, max seconds]``; counters are plain
+    totals keyed by ``(metric, operation)``. Recording is a couple of dict and
+    float operations, so it is cheap enough to leave on in production.
+    """
+
+    def __init__(self):
+        self.timers: Dict[str, list] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+
+    def observe(self, operation: str, seconds: float):
+        timer = self.timers.get(operation)
+        if timer is None:
+            self.timers[operation] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    def count(self, metric: str, operation: str, amount: int = 1):
+        key = (metric, operation)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        operations = {}
+        for operation, (calls, total, longest) in self.timers.items():
+            operations[operation] = {"calls": calls, "seconds": total, "max_seconds": longest}
+        for (metric, operation), value in self.counters.items():
+            operations.setdefault(operation, {})[metric] = value
+        return {"time": datetime.datetime.now().isoformat(timespec="seconds"), "operations": operations}
+
+    def prometheus(self) -> str:
+        """The registry in the Prometheus text exposition format"""
+        lines = [f"# TYPE {PREFIX}_operation_seconds summary"]
+        for operation, (calls, total, _) in sorted(self.timers.items()):
+            lines.append(f'{PREFIX}_operation_seconds_count{{operation="{operation}"}} {calls}')
+            lines.append(f'{PREFIX}_operation_seconds_sum{{operation="{operation}"}} {total:.6f}')
+        lines.append(f"# TYPE {PREFIX}_operation_max_seconds gauge")
+        for operation, (_, _, longest) in sorted(self.timers.items()):
+            lines.append(f'{PREFIX}_operation_max_seconds{{operation="{operation}"}} {longest:.6f}')
+        for metric in sorted({metric for metric, _ in self.counters}):
+            lines.append(f"# TYPE {PREFIX}_{metric}_total counter")
+            for (name, operation), value in sorted(self.counters.items()):
+                if name == metric:
+                    lines.append(f'{PREFIX}_{metric}_total{{operation="{operation}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Write the registry: ``.prom`` files are replaced, anything else gets a JSONL line"""
+        if path.endswith(".prom"):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, path)
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.snapshot(), separators=(",", ":")) + "\n")
+
+
+class Instrumentation:
+    """Opt-in timing of a StudyAssistant's operations
+
+    Replaces the listed methods on one assistant instance (and, through
+    ``instrument``, the menu actions of its front end) with wrappers that
+    record wall time, calls, bytes read/written by the storage backend,
+    topics scanned by the storage queries and listeners, and query-cache
+    hits and misses. Nothing is wrapped
+    unless this is attached, so an uninstrumented assistant pays only for the
+    plain integer counters the components keep anyway.
+
+    ``profile_action`` names one operation or menu action to run under
+    cProfile the first time it is called; its stats go to ``<name>.prof``
+    (next to the metrics file if there is one) and the top entries are printed.
+    """
+
+    def __init__(self, assistant, metrics_file: str = None, interval: float = 60.0,
+                 profile_action: str = None):
+        self.assistant = assistant
+        self.metrics = Metrics()
+        self.metrics_file = metrics_file
+        self.interval = interval
+        self.profile_action = profile_action
+        self.last_dump = time.monotonic()
+        self.instrument(assistant, OPERATIONS)
+
+    def instrument(self, target, names):
+        """Wrap the named methods of ``target`` (the assistant, or a front end such as the menu)"""
+        for name in names:
+            setattr(target, name, self._wrap(name, getattr(target, name)))
+
+    def topics_scanned(self) -> int:
+        components = [self.assistant.store, *getattr(self.assistant, "listeners", ())]
+        return sum(getattr(component, "topics_scanned", 0) for component in components)
+
+    def cache_counts(self):
+        queries = getattr(self.assistant, "queries", None)
+        return (queries.hits, queries.misses) if queries is not None else (0, 0)
+
+    def _wrap(self, name: str, method):
+        metrics = self.metrics
+
+        def instrumented(*args, **kwargs):
+            store = self.assistant.store
+            bytes_read, bytes_written = store.bytes_read, store.bytes_written
+            scanned = self.topics_scanned()
+            cache_counts = self.cache_counts()
+            start = time.perf_counter()
+            try:
+                if name == self.profile_action:
+                    self.profile_action = None
+                    return self._profile(name, method, args, kwargs)
+                return method(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+                store = self.assistant.store
+                if store.bytes_read != bytes_read:
+                    metrics.count("bytes_read", name, store.bytes_read - bytes_read)
+                if store.bytes_written != bytes_written:
+                    metrics.count("bytes_written", name, store.bytes_written - bytes_written)
+                scanned = self.topics_scanned() - scanned
+                if scanned:
+                    metrics.count("topics_scanned", name, scanned)
+                for metric, before, after in zip(("cache_hits", "cache_misses"), cache_counts,
+                                                 self.cache_counts()):
+                    if after != before:
+                        metrics.count(metric, name, after - before)
+                if name == "close" or time.monotonic() - self.last_dump >= self.interval:
+                    self.dump()
+
+        instrumented.__wrapped__ = method
+        return instrumented
+
+    def _profile(self, name: str, method, args, kwargs):
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(method, *args, **kwargs)
+        finally:
+            directory = os.path.dirname(self.metrics_file) if self.metrics_file else ""
+            path = os.path.join(directory, f"{name}.prof")
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+            print(f"\n⏱️ Profile of {name} saved to {path}")
+            print(out.getvalue())
+
+    def dump(self):
+        self.last_dump = time.monotonic()
+        if self.metrics_file:
+            self.metrics.dump(self.metrics_file)
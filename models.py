@@ -0,0 +1,147 @@
+import datetime
+import enum
+import functools
+import sys
+from typing import Dict, Any
+
+
+class Status(enum.IntEnum):
+    NOT_STARTED = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+
+
+class Level(enum.IntEnum):
+    """Shared scale for topic difficulty and subject priority"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+STATUS_VALUES = {"not_started": Status.NOT_STARTED, "in_progress": Status.IN_PROGRESS,
+                 "completed": Status.COMPLETED}
+DIFFICULTY_VALUES = {"easy": Level.LOW, "medium": Level.MEDIUM, "hard": Level.HIGH}
+PRIORITY_VALUES = {"low": Level.LOW, "medium": Level.MEDIUM, "high": Level.HIGH}
+STATUS_NAMES = {v: k for k, v in STATUS_VALUES.items()}
+DIFFICULTY_NAMES = {v: k for k, v in DIFFICULTY_VALUES.items()}
+PRIORITY_NAMES = {v: k for k, v in PRIORITY_VALUES.items()}
+
+TOPIC_KEYS = ("status", "confidence", "study_time", "last_reviewed", "notes", "difficulty")
+SUBJECT_KEYS = ("topics", "exam_date", "priority", "total_sessions", "last_studied", "notes")
+
+
+def _encode(value, values: Dict[str, int]):
+    """Known labels become small ints; anything else is kept verbatim"""
+    return values.get(value, value) if isinstance(value, str) else value
+
+
+def _decode(value, names: Dict[int, str]):
+    return names[value] if isinstance(value, enum.IntEnum) else value
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_date(value):
+    """YYYY-MM-DD strings become ordinals (0 for empty); odd spellings stay strings
+
+    Cached so topics reviewed on the same day share one int object.
+    """
+    if value == "":
+        return 0
+    try:
+        date = datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    return date.toordinal() if date.isoformat() == value else value
+
+
+def _decode_date(value):
+    if value == 0:
+        return ""
+    return datetime.date.fromordinal(value).isoformat() if isinstance(value, int) else value
+
+
+class Topic:
+    """Compact topic record; converts losslessly to and from the JSON dict
+
+    StudyAssistant, its listeners and the storage backends all work on the
+    JSON dicts, so nothing there uses these records yet: they are a building
+    block for code that holds a large syllabus read-only.
+    """
+
+    __slots__ = ("status", "confidence", "study_time", "last_reviewed", "notes", "difficulty", "extra")
+
+    def __init__(self, status=Status.NOT_STARTED, confidence: int = 0, study_time: int = 0,
+                 last_reviewed=0, notes: str = "", difficulty=Level.MEDIUM, extra=None):
+        self.status = status
+        self.confidence = confidence
+        self.study_time = study_time
+        self.last_reviewed = last_reviewed
+        self.notes = notes
+        self.difficulty = difficulty
+        self.extra = extra  # keys outside the schema, None when there are none
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Topic":
+        extra = {k: v for k, v in data.items() if k not in TOPIC_KEYS} or None
+        return cls(_encode(data["status"], STATUS_VALUES), data["confidence"], data["study_time"],
+                   _encode_date(data["last_reviewed"]), data["notes"],
+                   _encode(data["difficulty"], DIFFICULTY_VALUES), extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "status": _decode(self.status, STATUS_NAMES),
+            "confidence": self.confidence,
+            "study_time": self.study_time,
+            "last_reviewed": _decode_date(self.last_reviewed),
+            "notes": self.notes,
+            "difficulty": _decode(self.difficulty, DIFFICULTY_NAMES),
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Subject:
+    """Compact subject record holding its topics by interned name"""
+
+    __slots__ = ("topics", "exam_date", "priority", "total_sessions", "last_studied", "notes", "extra")
+
+    def __init__(self, topics: Dict[str, Topic] = None, exam_date=0, priority=Level.MEDIUM,
+                 total_sessions: int = 0, last_studied=0, notes: str = "", extra=None):
+        self.topics = topics if topics is not None else {}
+        self.exam_date = exam_date
+        self.priority = priority
+        self.total_sessions = total_sessions
+        self.last_studied = last_studied
+        self.notes = notes
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Subject":
+        topics = {sys.intern(name): Topic.from_dict(topic) for name, topic in data["topics"].items()}
+        extra = {k: v for k, v in data.items() if k not in SUBJECT_KEYS} or None
+        return cls(topics, _encode_date(data["exam_date"]), _encode(data["priority"], PRIORITY_VALUES),
+                   data["total_sessions"], _encode_date(data["last_studied"]), data["notes"], extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "topics": {name: topic.to_dict() for name, topic in self.topics.items()},
+            "exam_date": _decode_date(self.exam_date),
+            "priority": _decode(self.priority, PRIORITY_NAMES),
+            "total_sessions": self.total_sessions,
+            "last_studied": _decode_date(self.last_studied),
+            "notes": self.notes,
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def from_json_schema(subjects: Dict[str, Any]) -> Dict[str, Subject]:
+    """Convert a loaded study_data.json dict into compact records"""
+    return {name: Subject.from_dict(data) for name, data in subjects.items()}
+
+
+def to_json_schema(subjects: Dict[str, Subject]) -> Dict[str, Any]:
+    """Convert compact records back into the study_data.json layout"""
+    return {name: subject.to_dict() for name, subject in subjects.items()}
@@ -0,0 +1,235 @@
+import bisect
+import datetime
+from typing import Dict, List, Tuple, Any
+
+from scheduler import date_ordinal, days_left
+
+PRIORITY_WEIGHT = {"high": 3.0, "medium": 2.0, "low": 1.0}
+PRIORITY_RANK = {"high": 1, "medium": 2, "low": 3}
+DIFFICULTY_RANK = {"easy": 0, "medium": 1, "hard": 2}
+BASE_MINUTES = {"easy": 30, "medium": 45, "hard": 60}
+MAX_PLAN_DAYS = 366
+_EPSILON = 0.5  # minutes; anything smaller counts as done
+
+
+def topic_minutes(topic: Dict[str, Any]) -> float:
+    """Study time a not-yet-completed topic still needs
+
+    Hard topics need more time, and confidence already gained (and work
+    already in progress) shortens it, down to half the base time.
+    """
+    confidence = topic.get("confidence", 0)
+    confidence = min(max(confidence, 0), 10) if isinstance(confidence, int) else 0
+    minutes = BASE_MINUTES.get(topic.get("difficulty"), BASE_MINUTES["medium"]) * (1 - confidence / 20)
+    return minutes * 0.75 if topic.get("status") == "in_progress" else minutes
+
+
+def _topic_key(name: str, topic: Dict[str, Any]) -> Tuple[int, int, str]:
+    """Study order inside a subject: weakest first, then hardest"""
+    confidence = topic.get("confidence", 0)
+    return (confidence if isinstance(confidence, int) else 0,
+            -DIFFICULTY_RANK.get(topic.get("difficulty"), 1), name)
+
+
+def exam_schedule(subjects: Dict[str, Any], incomplete_topics, now: datetime.datetime = None) -> List[Dict[str, Any]]:
+    """Subjects with exam dates, soonest first, with the study pace they need
+
+    ``incomplete_topics(name)`` counts a subject's open topics, so backends
+    with an index can answer it without a scan.
+    """
+    now = now or datetime.datetime.now()
+    scheduled = []
+    for name, subject in subjects.items():
+        exam = date_ordinal(subject["exam_date"])
+        if exam:
+            scheduled.append((days_left(exam, now), PRIORITY_RANK.get(subject["priority"], 2), name))
+    scheduled.sort(key=lambda entry: entry[:2])
+
+    report = []
+    for left, _, name in scheduled:
+        incomplete = incomplete_topics(name)
+        report.append({"subject": name, "days_left": left, "priority": subjects[name]["priority"],
+                       "incomplete_topics": incomplete,
+                       "topics_per_day": incomplete / left if incomplete and left > 0 else None})
+    return report
+
+
+class _SubjectQueue:
+    """A subject's open topics in study order, with their minutes"""
+
+    __slots__ = ("order", "entries", "remaining")
+
+    def __init__(self):
+        self.order: List[Tuple[int, int, str]] = []
+        self.entries: Dict[str, Tuple[Tuple[int, int, str], float]] = {}
+        self.remaining = 0.0
+
+    def put(self, name: str, topic):
+        """Insert, update or (topic None / completed) drop one topic"""
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            key, minutes = entry
+            del self.order[bisect.bisect_left(self.order, key)]
+            self.remaining -= minutes
+        if topic is not None and topic.get("status") != "completed":
+            key, minutes = _topic_key(name, topic), topic_minutes(topic)
+            bisect.insort(self.order, key)
+            self.entries[name] = (key, minutes)
+            self.remaining += minutes
+
+
+class StudyPlanner:
+    """Day-by-day study plan across every subject with an upcoming exam
+
+    Planning runs in two stages. First the daily budget is shared between
+    subjects using only per-subject totals: each day every subject asks for the
+    pace that would finish its open topics by the day before its exam; if the
+    asks exceed the budget they are scaled by priority, and spare minutes go
+    to subjects that can get ahead. Then each subject's allotments are filled
+    with its topics, weakest and hardest first (a topic may span two days).
+
+    The planner is a change listener. A topic change updates its subject's
+    ordered queue in O(log n) and marks only that subject for refilling; the
+    budget stage is recomputed from totals, and subjects whose allotments did
+    not move keep their cached days. A subject's queue is built the first
+    time it has an upcoming exam to plan for, so subjects without one never
+    have their topics read.
+    """
+
+    def __init__(self, daily_minutes: int = 120):
+        self.daily_minutes = daily_minutes
+        self.queues: Dict[str, _SubjectQueue] = None
+        self.cache: Dict[str, Tuple[list, list]] = {}
+        self.today = 0
+        self.topics_scanned = 0
+
+    def rebuild(self, subjects: Dict[str, Any]):
+        """Drop every queue; each is rebuilt when its subject is next planned"""
+        self.queues = {}
+        self.cache = {}
+
+    def _queue(self, subjects: Dict[str, Any], name: str) -> _SubjectQueue:
+        queue = self.queues.get(name)
+        if queue is None:
+            queue = self.queues[name] = _SubjectQueue()
+            topics = subjects[name]["topics"]
+            for topic_name, topic in topics.items():
+                queue.put(topic_name, topic)
+            self.topics_scanned += len(topics)
+            self.cache.pop(name, None)
+        return queue
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        """Requeue the one topic (or subject) a mutation touched"""
+        if self.queues is None:
+            return
+        kind = op["op"]
+        name = op["subject"]
+        if kind in ("add_subject", "del_subject"):
+            self.queues.pop(name, None)
+            self.cache.pop(name, None)
+        elif kind != "set_subject" and name in self.queues:
+            self.queues[name].put(op["topic"], subjects[name]["topics"].get(op["topic"]))
+            self.cache.pop(name, None)
+
+    def allocate(self, subjects: Dict[str, Any], today: int) -> Dict[str, Tuple[list, float]]:
+        """Minutes per day for each subject: ``{name: ([(day, minutes)], unplanned)}``"""
+        active = []
+        for name, subject in subjects.items():
+            exam = date_ordinal(subject.get("exam_date", ""))
+            if exam > today:
+                queue = self._queue(subjects, name)
+                if queue.remaining > _EPSILON:
+                    weight = PRIORITY_WEIGHT.get(subject.get("priority"), PRIORITY_WEIGHT["medium"])
+                    active.append([name, exam - today, weight, queue.remaining])
+        allocation = {entry[0]: [] for entry in active}
+        budget = float(self.daily_minutes)
+        horizon = min(max((entry[1] for entry in active), default=0), MAX_PLAN_DAYS)
+
+        for day in range(horizon):
+            active = [entry for entry in active if entry[1] > day and entry[3] > _EPSILON]
+            if not active:
+                break
+            paces = [entry[3] / (entry[1] - day) for entry in active]
+            demand = sum(paces)
+            if demand > budget:
+                # Over-subscribed: share the day by priority-weighted need
+                weighted = [pace * entry[2] for pace, entry in zip(paces, active)]
+                scale = budget / sum(weighted)
+                grants = [min(entry[3], w * scale) for w, entry in zip(weighted, active)]
+            else:
+                grants = paces
+                spare = budget - demand
+                ahead = [(i, entry[2]) for i, entry in enumerate(active) if entry[3] - paces[i] > _EPSILON]
+                total_weight = sum(weight for _, weight in ahead)
+                for i, weight in ahead:
+                    extra = spare * weight / total_weight
+                    grants[i] = min(active[i][3], grants[i] + extra)
+            for entry, grant in zip(active, grants):
+                if grant > _EPSILON:
+                    allocation[entry[0]].append((day, grant))
+                    entry[3] -= grant
+
+        result = {}
+        for name, days in allocation.items():
+            planned = sum(minutes for _, minutes in days)
+            result[name] = (days, max(0.0, self.queues[name].remaining - planned))
+        return result
+
+    def _fill(self, name: str, days: list) -> list:
+        """Pour the subject's topics, in study order, into its daily allotments"""
+        queue = self.queues[name]
+        sessions = []
+        slots = iter(days)
+        day, free = next(slots, (None, 0.0))
+        for key in queue.order:
+            need = queue.entries[key[2]][1]
+            while need > _EPSILON and day is not None:
+                take = min(need, free)
+                sessions.append((day, key[2], take))
+                need -= take
+                free -= take
+                if free <= _EPSILON:
+                    day, free = next(slots, (None, 0.0))
+            if day is None:
+                break
+        return sessions
+
+    def plan(self, subjects: Dict[str, Any], days: int = 7, now: datetime.datetime = None) -> Dict[str, Any]:
+        """The next ``days`` days of sessions plus a per-subject outlook"""
+        now = now or datetime.datetime.now()
+        today = now.toordinal()
+        if self.queues is None or today != self.today:
+            self.rebuild(subjects)
+            self.today = today
+
+        calendar = [[] for _ in range(days)]
+        outlook = []
+        for name, (allotted, unplanned) in self.allocate(subjects, today).items():
+            cached = self.cache.get(name)
+            if cached is None or cached[0] != allotted:
+                cached = self.cache[name] = (allotted, self._fill(name, allotted))
+            sessions = cached[1]
+            end = bisect.bisect_left(sessions, (days,))
+            for day, topic, minutes in sessions[:end]:
+                calendar[day].append({"subject": name, "topic": topic, "minutes": round(minutes)})
+            subject = subjects[name]
+            outlook.append({
+                "subject": name,
+                "exam_date": subject["exam_date"],
+                "days_left": days_left(date_ordinal(subject["exam_date"]), now),
+                "priority": subject["priority"],
+                "remaining_minutes": round(self.queues[name].remaining),
+                "unplanned_minutes": round(unplanned),
+                "finishes_on": (datetime.date.fromordinal(today + allotted[-1][0]).isoformat()
+                                if allotted and not unplanned else None),
+            })
+        outlook.sort(key=lambda entry: (entry["days_left"], PRIORITY_RANK.get(entry["priority"], 2)))
+
+        plan_days = []
+        for day, sessions in enumerate(calendar):
+            sessions = [session for session in sessions if session["minutes"] > 0]
+            plan_days.append({"date": datetime.date.fromordinal(today + day).isoformat(),
+                              "minutes": sum(session["minutes"] for session in sessions),
+                              "sessions": sessions})
+        return {"daily_minutes": self.daily_minutes, "days": plan_days, "subjects": outlook}
@@ -0,0 +1,118 @@
+from typing import Dict, Iterator, List, Any
+
+STATUS_EMOJI = {"not_started": "🔴", "in_progress": "🟡", "completed": "🟢"}
+BAR_LENGTH = 20
+# Every bar the overview can show, rendered once
+PROGRESS_BARS = ["█" * filled + "-" * (BAR_LENGTH - filled) for filled in range(BAR_LENGTH + 1)]
+STARS = ["⭐" * confidence for confidence in range(11)]
+
+
+def progress_bar(percent: float) -> str:
+    return PROGRESS_BARS[min(max(int(BAR_LENGTH * percent // 100), 0), BAR_LENGTH)]
+
+
+def topic_line(name: str, topic: Dict[str, Any]) -> str:
+    confidence = topic.get("confidence", 0)
+    stars = STARS[min(max(confidence, 0), 10)] if isinstance(confidence, int) else ""
+    return f"  {STATUS_EMOJI.get(topic.get('status'), '⚪')} {name} - Confidence: {stars}"
+
+
+def topic_matches(topic: Dict[str, Any], statuses=None, max_confidence: int = None) -> bool:
+    """Whether a topic passes the status and confidence-below filters"""
+    if statuses and topic.get("status") not in statuses:
+        return False
+    if max_confidence is not None:
+        confidence = topic.get("confidence", 0)
+        return (confidence if isinstance(confidence, int) else 0) < max_confidence
+    return True
+
+
+class ProgressView:
+    """Progress overview rendered lazily, a line at a time, for paging
+
+    Subject headers and topic lines are cached and kept current through
+    on_change: a topic change re-renders that topic's line and drops its
+    subject's header, so paging through a large syllabus after an answer
+    re-renders two lines instead of everything. Topic lines are only built
+    for subjects that are expanded; subjects with more than ``expand_limit``
+    topics start collapsed. Headers show the days left, so the owner clears
+    ``headers`` when the date rolls over (the assistant registers that as a
+    query-cache rollover hook).
+    """
+
+    def __init__(self, page_size: int = 40, expand_limit: int = 50):
+        self.page_size = page_size
+        self.expand_limit = expand_limit
+        self.headers: Dict[str, List[str]] = {}
+        self.lines: Dict[str, Dict[str, str]] = {}
+        self.expanded: Dict[str, bool] = {}
+
+    def is_expanded(self, name: str, subject: Dict[str, Any]) -> bool:
+        expanded = self.expanded.get(name)
+        return len(subject["topics"]) <= self.expand_limit if expanded is None else expanded
+
+    def set_expanded(self, name: str, expanded: bool):
+        self.expanded[name] = expanded
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        kind = op["op"]
+        name = op["subject"]
+        self.headers.pop(name, None)
+        if kind in ("add_subject", "del_subject"):
+            self.lines.pop(name, None)
+            if kind == "del_subject":
+                self.expanded.pop(name, None)
+            return
+        lines = self.lines.get(name)
+        if lines is None or kind == "set_subject":
+            return
+        topic = subjects[name]["topics"].get(op["topic"])
+        if topic is None:
+            lines.pop(op["topic"], None)
+        else:
+            lines[op["topic"]] = topic_line(op["topic"], topic)
+
+    def _header(self, number: int, name: str, subject: Dict[str, Any],
+                figures: Dict[str, Any]) -> List[str]:
+        header = [f"\n📚 [{number}] {name.upper()}", f"Priority: {subject['priority'].upper()}"]
+        if subject["exam_date"]:
+            header.append(f"Exam Date: {subject['exam_date']} ({figures['days_until_exam']} days left)")
+        if not figures["topics"]:
+            header.append("No topics added yet.")
+            return header
+        header.append(f"Progress: {figures['completed']}/{figures['topics']} completed, "
+                      f"{figures['in_progress']} in progress")
+        header.append(f"[{progress_bar(figures['completion_rate'])}] {figures['completion_rate']:.1f}%")
+        return header
+
+    def render(self, subjects: Dict[str, Any], per_subject: Dict[str, Dict[str, Any]], start: int = 0,
+               statuses=None, max_confidence: int = None) -> Iterator[str]:
+        """Yield the overview's lines from subject number ``start + 1`` onwards
+
+        ``per_subject`` holds the summary figures; ``statuses`` and
+        ``max_confidence`` (confidence below) filter the topic lines.
+        """
+        filtered = bool(statuses) or max_confidence is not None
+        for number, name in enumerate(list(subjects)[start:], start + 1):
+            subject = subjects[name]
+            header = self.headers.get(name)
+            if header is None or header[0] != f"\n📚 [{number}] {name.upper()}":
+                header = self.headers[name] = self._header(number, name, subject, per_subject[name])
+            yield from header
+            topics = subject["topics"]
+            if not topics:
+                continue
+            if not self.is_expanded(name, subject):
+                yield f"  ▶ {len(topics):,} topics hidden (e {number} to expand)"
+                continue
+            lines = self.lines.get(name)
+            if lines is None:
+                lines = self.lines[name] = {topic: topic_line(topic, data) for topic, data in topics.items()}
+            yield "\nTopics:"
+            shown = 0
+            for topic, data in topics.items():
+                if not filtered or topic_matches(data, statuses, max_confidence):
+                    shown += 1
+                    yield lines[topic]
+            if not shown:
+                yield "  No topics match the filter."
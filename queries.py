@@ -0,0 +1,104 @@
+import collections
+import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+TOPICS = "topics"  # dependency on any topic of the subject
+EVERYTHING = None
+
+Key = Tuple[str, str, Hashable]  # query, subject (None = all subjects), arguments
+
+
+class QueryCache:
+    """Memoized derived queries, invalidated per subject as the data changes
+
+    Every entry is keyed by query name, subject and arguments, and lists what
+    it depends on: ``TOPICS`` (any topic of that subject) and/or subject
+    fields such as ``"exam_date"``. ``on_change`` drops only the changed
+    subject's entries whose dependencies the mutation touched, so editing a
+    subject's notes keeps its figures and answering a quiz question keeps
+    every other subject's. Entries for subject None cover the whole data set
+    and depend on every subject.
+
+    Entries marked ``daily`` hold day-relative values (days left, what is due)
+    and are dropped when the date rolls over; functions registered with
+    ``on_rollover`` run at the same moment. At most ``max_entries`` are kept,
+    least recently used first out. Cached values are shared, so callers must
+    treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # key -> (value, dependencies, daily), least recently used first
+        self.entries: "collections.OrderedDict[Key, Tuple[Any, frozenset, bool]]" = collections.OrderedDict()
+        self.keys: Dict[str, Set[Key]] = {}
+        self.rollover_hooks: List[Callable[[], None]] = []
+        self.today = datetime.date.today().toordinal()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, query: str, subject: str, compute: Callable[[], Any], args: Hashable = (),
+            depends: Iterable[str] = (TOPICS,), daily: bool = False) -> Any:
+        """The cached value of ``query`` for ``subject``, computing it on a miss"""
+        self.check_date()
+        key = (query, subject, args)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        value = compute()
+        self.entries[key] = (value, frozenset(depends), daily)
+        self.keys.setdefault(subject, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+        return value
+
+    def _drop(self, key: Key):
+        del self.entries[key]
+        keys = self.keys[key[1]]
+        keys.discard(key)
+        if not keys:
+            del self.keys[key[1]]
+
+    def invalidate(self, subject: str, changed: Set[str] = EVERYTHING):
+        """Drop a subject's entries that depend on any of ``changed`` (default: all of them)"""
+        for key in list(self.keys.get(subject, ())):
+            if changed is EVERYTHING or not changed.isdisjoint(self.entries[key][1]):
+                self._drop(key)
+                self.invalidations += 1
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        kind = op["op"]
+        if kind in ("add_subject", "del_subject"):
+            changed = EVERYTHING
+        elif kind == "set_subject":
+            changed = set(op["fields"])
+        else:
+            changed = {TOPICS}
+        self.invalidate(op["subject"], changed)
+        self.invalidate(None, changed)
+
+    def on_rollover(self, hook: Callable[[], None]):
+        """Call ``hook`` whenever the date changes between queries"""
+        self.rollover_hooks.append(hook)
+
+    def check_date(self, today: datetime.date = None):
+        """Drop the day-relative entries and run the rollover hooks if the date has changed"""
+        today = (today or datetime.date.today()).toordinal()
+        if today == self.today:
+            return
+        self.today = today
+        for key in [key for key, entry in self.entries.items() if entry[2]]:
+            self._drop(key)
+        for hook in self.rollover_hooks:
+            hook()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions, "invalidations": self.invalidations}
@@ -0,0 +1,202 @@
+import datetime
+import random
+from typing import Dict, List, Tuple, Any
+
+from scheduler import date_ordinal
+
+DIFFICULTY_WEIGHT = {"easy": 0.8, "medium": 1.0, "hard": 1.3}
+PRIORITY_WEIGHT = {"high": 1.5, "medium": 1.0, "low": 0.7}
+MAX_STALE_DAYS = 60
+
+
+def topic_weight(topic: Dict[str, Any], priority: str = "medium", today: int = 0) -> float:
+    """How strongly a topic should be favoured in a quiz
+
+    Grows with the confidence still missing (11 - confidence), with the days
+    since it was last reviewed (never reviewed counts as MAX_STALE_DAYS), and
+    with topic difficulty and subject priority. Always positive.
+    """
+    confidence = topic.get("confidence", 0)
+    confidence = confidence if isinstance(confidence, int) else 0
+    reviewed = date_ordinal(topic.get("last_reviewed", ""))
+    stale_days = MAX_STALE_DAYS if not reviewed else min(max(today - reviewed, 0), MAX_STALE_DAYS)
+    return ((11 - min(max(confidence, 0), 10)) * (1 + stale_days / 7)
+            * DIFFICULTY_WEIGHT.get(topic.get("difficulty"), 1.0)
+            * PRIORITY_WEIGHT.get(priority, 1.0))
+
+
+class FenwickTree:
+    """Prefix sums over non-negative weights: O(log n) update, append and weighted search"""
+
+    __slots__ = ("weights", "tree")
+
+    def __init__(self, weights: List[float]):
+        self.weights = list(weights)
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute every node from the weights (O(n)), dropping float drift"""
+        n = len(self.weights)
+        tree = [0.0] + self.weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def prefix(self, count: int) -> float:
+        """Sum of the first ``count`` weights"""
+        total = 0.0
+        while count:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    @property
+    def total(self) -> float:
+        return self.prefix(len(self.weights))
+
+    def set(self, index: int, weight: float):
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i, n = index + 1, len(self.weights)
+        while i <= n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def append(self, weight: float):
+        self.weights.append(weight)
+        n = len(self.weights)
+        # Node n covers weights (n - lowbit(n), n]; gather the nodes below it
+        value, child, low = weight, n - 1, n - (n & -n)
+        while child > low:
+            value += self.tree[child]
+            child -= child & -child
+        self.tree.append(value)
+
+    def find(self, target: float) -> int:
+        """Index whose cumulative weight range contains ``target`` (0 <= target < total)"""
+        pos, n = 0, len(self.weights)
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(pos, n - 1)
+
+
+class _Pool:
+    """One subject's topics laid out as Fenwick slots"""
+
+    __slots__ = ("names", "index", "tree", "priority", "dead")
+
+    def __init__(self, subject: Dict[str, Any], today: int):
+        self.priority = subject.get("priority", "medium")
+        self.names = list(subject["topics"])
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.tree = FenwickTree([topic_weight(topic, self.priority, today)
+                                 for topic in subject["topics"].values()])
+        self.dead = 0
+
+
+class QuizSampler:
+    """Weighted quiz draws without replacement, kept current through on_change
+
+    Each subject's topic weights live in a Fenwick tree that is built the first
+    time the subject is quizzed. Afterwards an answer (or any other topic
+    change) updates a single weight in O(log n), and each draw costs
+    O(log n) per subject pool instead of a scan of every topic. Drawn topics
+    get weight 0 until the quiz has been picked, so nothing repeats. Pools are
+    rebuilt when the date rolls over, since staleness depends on today.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.pools: Dict[str, _Pool] = {}
+        self.today = 0
+        self.topics_scanned = 0
+
+    def _pool(self, subjects: Dict[str, Any], subject_name: str, today: int) -> _Pool:
+        if today != self.today:
+            self.pools.clear()
+            self.today = today
+        pool = self.pools.get(subject_name)
+        if pool is None:
+            pool = self.pools[subject_name] = _Pool(subjects[subject_name], today)
+            self.topics_scanned += len(pool.names)
+        return pool
+
+    def sample(self, subjects: Dict[str, Any], subject_name: str = None,
+               count: int = 5, today: int = None) -> List[Tuple[str, str]]:
+        """Draw up to ``count`` distinct (subject, topic) pairs, from one subject or all
+
+        Staleness is measured up to ``today`` (an ordinal; default the current date).
+        """
+        if count < 1:
+            raise ValueError("Quiz length must be at least 1")
+        today = today or datetime.date.today().toordinal()
+        names = [subject_name] if subject_name is not None else list(subjects)
+        pools = [(name, self._pool(subjects, name, today)) for name in names]
+        drawn = []
+        try:
+            while len(drawn) < count:
+                totals = [pool.tree.total for _, pool in pools]
+                grand_total = sum(totals)
+                if grand_total <= 1e-9:
+                    break
+                target = self.rng.random() * grand_total
+                for (name, pool), total in zip(pools, totals):
+                    if target < total:
+                        break
+                    target -= total
+                index = pool.tree.find(target)
+                if pool.tree.weights[index] <= 0:
+                    # Accumulated float error pointed at an empty slot
+                    pool.tree.rebuild()
+                    continue
+                drawn.append((name, pool, index, pool.tree.weights[index]))
+                pool.tree.set(index, 0.0)
+        finally:
+            for _, pool, index, weight in reversed(drawn):
+                pool.tree.set(index, weight)
+        return [(name, pool.names[index]) for name, pool, index, _ in drawn]
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        """Update the affected weight in place; pools not yet built are left alone"""
+        kind = op["op"]
+        pool = self.pools.get(op["subject"])
+        if pool is None:
+            return
+        if kind in ("add_subject", "del_subject") or (
+                kind == "set_subject" and "priority" in op["fields"]):
+            del self.pools[op["subject"]]
+            return
+        if kind == "set_subject":
+            return
+
+        name = op["topic"]
+        index = pool.index.get(name)
+        if kind == "del_topic":
+            if index is not None:
+                pool.tree.set(index, 0.0)
+                pool.names[index] = None
+                del pool.index[name]
+                pool.dead += 1
+                if pool.dead * 2 > len(pool.names):
+                    del self.pools[op["subject"]]
+            return
+        topic = subjects[op["subject"]]["topics"].get(name)
+        if topic is None:
+            return
+        weight = topic_weight(topic, pool.priority, self.today)
+        if index is not None:
+            pool.tree.set(index, weight)
+        else:
+            pool.index[name] = len(pool.names)
+            pool.names.append(name)
+            pool.tree.append(weight)
@@ -0,0 +1,182 @@
+import datetime
+import hashlib
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+TRACE_VERSION = 1
+# Engine operations a trace captures: everything a revision or quiz session
+# (or any other menu action) reads or changes the data through
+TRACED = (
+    "create_subject", "update_subject", "remove_subject", "create_topic", "update_topic", "remove_topic",
+    "save_subject", "add_topic_list", "save_data", "progress_report", "revision_queue", "review_topic",
+    "log_study_session", "quiz_topics", "quiz_questions", "record_quiz_rating", "quiz_score",
+    "schedule_report", "find_topics", "delete_topics", "similar_topics", "duplicate_report",
+    "split_topic", "merge_topics", "search_topics", "study_plan", "history_report", "statistics_report",
+)
+MAX_EXAMPLES = 10
+
+
+def result_digest(result: Any) -> Optional[str]:
+    """Short hash of an operation's result, as it would be sent as JSON (None for no result)"""
+    if result is None:
+        return None
+    payload = json.dumps(result, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+class TraceRecorder:
+    """Writes every engine operation called on one StudyAssistant to a JSONL trace
+
+    Like ``Instrumentation``, it replaces the ``TRACED`` methods on the
+    assistant instance. Each outermost call becomes one line with its
+    arguments and a digest of its result (or the name of the exception it
+    raised); calls the operations make internally are not recorded again.
+    ``begin`` starts a new session, e.g. one menu action.
+
+    The first line records what a replay needs to repeat the run exactly:
+    the date (which the assistant keeps for the rest of the recording), the
+    seed given to the quiz sampler, the quiz length and daily study time,
+    and the size of the data the trace starts from. Attach the recorder
+    right after opening the assistant, so a replay starts from the same state.
+    """
+
+    def __init__(self, assistant, path: str, seed: int = None, meta: Dict[str, Any] = None):
+        self.assistant = assistant
+        self.path = path
+        self.session = 0
+        self.depth = 0
+        self.calls = 0
+        seed = random.randrange(1 << 32) if seed is None else seed
+        assistant.today = assistant._today()
+        assistant.quiz.rng.seed(seed)
+        self.file = open(path, "w", encoding="utf-8")
+        self._write({"trace": TRACE_VERSION, "date": assistant.today.isoformat(), "seed": seed,
+                     "quiz_length": assistant.quiz_length, "daily_minutes": assistant.planner.daily_minutes,
+                     "subjects": len(assistant.subjects), "topics": assistant.summary()["topics"],
+                     "meta": meta or {}})
+        self.originals = {}
+        for name in TRACED:
+            method = self.originals[name] = getattr(assistant, name)
+            setattr(assistant, name, self._wrap(name, method))
+
+    def _write(self, entry: Dict[str, Any]):
+        self.file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _wrap(self, name: str, method):
+        def traced(*args, **kwargs):
+            if self.depth:
+                return method(*args, **kwargs)
+            event = {"session": self.session, "call": name, "args": list(args)}
+            if kwargs:
+                event["kwargs"] = kwargs
+            self.depth += 1
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                event["error"] = type(e).__name__
+                raise
+            else:
+                event["result"] = result_digest(result)
+                return result
+            finally:
+                self.depth -= 1
+                self.calls += 1
+                self._write(event)
+
+        traced.__wrapped__ = method
+        return traced
+
+    def begin(self, kind: str):
+        """Start the next session; the calls that follow belong to it"""
+        self.session += 1
+        self._write({"session": self.session, "kind": kind})
+
+    def close(self):
+        """Finish the trace and put the assistant's own methods back"""
+        if self.file.closed:
+            return
+        self.file.close()
+        for name, method in self.originals.items():
+            setattr(self.assistant, name, method)
+
+
+def load_trace(path: str) -> Dict[str, Any]:
+    """A trace's header and its events (calls and session starts), in order"""
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("trace") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version: {header.get('trace')}")
+        return {"header": header, "events": [json.loads(line) for line in f if line.strip()]}
+
+
+def replay_trace(assistant, path: str, verify: bool = True) -> Dict[str, Any]:
+    """Run a recorded trace against an assistant as fast as it will go
+
+    The assistant should hold the data the trace was recorded from (a copy:
+    the replay changes it) and is pinned to the recording's date and quiz
+    seed, so every operation sees the same state as when it was recorded.
+    With ``verify`` each result and error is compared with the recording;
+    mismatches are counted and the first few returned as examples. Only the
+    operations themselves are timed, per session kind.
+    """
+    trace = load_trace(path)
+    header = trace["header"]
+    assistant.today = datetime.date.fromisoformat(header["date"])
+    assistant.quiz.rng.seed(header["seed"])
+    assistant.quiz_length = header["quiz_length"]
+    assistant.planner.daily_minutes = header["daily_minutes"]
+    topics = assistant.summary()["topics"]
+    if (len(assistant.subjects), topics) != (header["subjects"], header["topics"]):
+        raise ValueError(f"The trace starts from {header['subjects']:,} subjects and {header['topics']:,} "
+                         f"topics, but the data has {len(assistant.subjects):,} and {topics:,}")
+
+    kinds: Dict[int, str] = {0: "other"}
+    durations: Dict[int, float] = {}
+    calls: Dict[int, int] = {}
+    mismatches, examples = 0, []
+    for event in trace["events"]:
+        session = event["session"]
+        if "kind" in event:
+            kinds[session] = event["kind"]
+            continue
+        method = getattr(assistant, event["call"])
+        result = error = None
+        start = time.perf_counter()
+        try:
+            result = method(*event["args"], **event.get("kwargs", {}))
+        except Exception as e:
+            error = type(e).__name__
+        durations[session] = durations.get(session, 0.0) + time.perf_counter() - start
+        calls[session] = calls.get(session, 0) + 1
+        if not verify:
+            continue
+        expected = event.get("error") or event.get("result")
+        actual = error or result_digest(result)
+        if expected != actual:
+            mismatches += 1
+            if len(examples) < MAX_EXAMPLES:
+                examples.append({"session": session, "call": event["call"], "args": event["args"],
+                                 "kwargs": event.get("kwargs", {}), "expected": expected, "actual": actual})
+
+    by_kind: Dict[str, List[float]] = {}
+    for session, seconds in durations.items():
+        by_kind.setdefault(kinds.get(session, "other"), []).append(seconds)
+    total = sum(durations.values())
+    sessions = len([session for session in durations if session])
+    report = {"sessions": sessions, "calls": sum(calls.values()), "seconds": total,
+              "sessions_per_sec": sessions / total if total else None,
+              "calls_per_sec": sum(calls.values()) / total if total else None,
+              "verified": verify, "mismatches": mismatches, "examples": examples, "kinds": {}}
+    for kind, seconds in sorted(by_kind.items()):
+        seconds.sort()
+        report["kinds"][kind] = {"sessions": len(seconds), "seconds": sum(seconds),
+                                 "p50_ms": _percentile(seconds, 0.5) * 1000,
+                                 "p95_ms": _percentile(seconds, 0.95) * 1000,
+                                 "max_ms": seconds[-1] * 1000}
+    return report
@@ -0,0 +1,180 @@
+import datetime
+import functools
+import heapq
+import itertools
+from typing import Dict, List, Tuple, Any
+
+# Ease factor per difficulty, in the spirit of SM-2's EF (harder topics grow
+# their intervals more slowly)
+EASE = {"easy": 2.6, "medium": 2.3, "hard": 1.9}
+MAX_INTERVAL_DAYS = 180
+SCHEDULE_FIELDS = ("confidence", "difficulty", "last_reviewed")
+_REMOVED = None
+
+
+@functools.lru_cache(maxsize=4096)
+def date_ordinal(value: str) -> int:
+    """Parse a YYYY-MM-DD date into a proleptic ordinal (0 for empty/invalid)"""
+    if not value:
+        return 0
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return 0
+
+
+def days_left(exam_ordinal: int, now: datetime.datetime) -> int:
+    """Same value as ``(exam_date - now).days`` with the exam at midnight"""
+    return exam_ordinal - now.toordinal() - (now.time() != datetime.time())
+
+
+def interval_days(confidence: int, difficulty: str = "medium") -> int:
+    """Days until a topic reviewed with the given confidence is due again
+
+    Confidence 0-10 plays the role of SM-2's recall quality: anything below 5
+    is a lapse and comes back the next day, above that the interval grows
+    geometrically with the difficulty's ease factor.
+    """
+    if confidence < 5:
+        return 1
+    ease = EASE.get(difficulty, EASE["medium"])
+    return min(MAX_INTERVAL_DAYS, max(1, round(ease ** (confidence - 4))))
+
+
+def due_ordinal(topic: Dict[str, Any]) -> int:
+    """Ordinal day on which a topic is next due (0 if it was never reviewed)"""
+    last_reviewed = date_ordinal(topic.get("last_reviewed", ""))
+    if not last_reviewed:
+        return 0
+    return last_reviewed + interval_days(topic["confidence"], topic.get("difficulty", "medium"))
+
+
+class RevisionScheduler:
+    """Spaced-repetition due queue over every topic of every subject
+
+    Topics live in a global heap and a per-subject heap keyed by
+    ``(due day, confidence, insertion order)``. Changes push a fresh entry and
+    mark the old one removed, so an update costs O(log n) and taking the next
+    k due topics costs O(k log n) rather than a scan of all topics.
+
+    A lazy scheduler (for storage that loads subjects on demand) schedules a
+    subject only when ``ensure`` is first called for it; until then its
+    changes are ignored and the global queue does not include it.
+    """
+
+    def __init__(self):
+        self.heap: List[list] = []
+        self.subject_heaps: Dict[str, List[list]] = {}
+        self.entries: Dict[Tuple[str, str], Tuple[list, list]] = {}
+        self.counter = itertools.count()
+        self.stale = 0  # removed entries still sitting in the heaps
+        self.lazy = False
+        self.topics_scanned = 0
+
+    def rebuild(self, subjects: Dict[str, Any], lazy: bool = False):
+        """Schedule every topic from scratch (or nothing yet, if ``lazy``)"""
+        self.heap = []
+        self.subject_heaps = {}
+        self.entries = {}
+        self.stale = 0
+        self.lazy = lazy
+        if lazy:
+            return
+        for subject_name, subject in subjects.items():
+            subject_heap = self.subject_heaps.setdefault(subject_name, [])
+            for topic_name, topic in subject["topics"].items():
+                key = (subject_name, topic_name)
+                rank = (due_ordinal(topic), topic["confidence"], next(self.counter))
+                entry, subject_entry = [*rank, key], [*rank, key]
+                self.heap.append(entry)
+                subject_heap.append(subject_entry)
+                self.entries[key] = (entry, subject_entry)
+            heapq.heapify(subject_heap)
+        heapq.heapify(self.heap)
+
+    def ensure(self, subjects: Dict[str, Any], subject_name: str):
+        """Schedule a subject's topics if a lazy scheduler has not yet"""
+        if subject_name in self.subject_heaps or subject_name not in subjects:
+            return
+        self.subject_heaps[subject_name] = []
+        for topic_name, topic in subjects[subject_name]["topics"].items():
+            self.schedule(subject_name, topic_name, topic)
+
+    def schedule(self, subject_name: str, topic_name: str, topic: Dict[str, Any]):
+        """Insert or reschedule a topic"""
+        key = (subject_name, topic_name)
+        self.remove(subject_name, topic_name)
+        rank = (due_ordinal(topic), topic["confidence"], next(self.counter))
+        entry, subject_entry = [*rank, key], [*rank, key]
+        heapq.heappush(self.heap, entry)
+        heapq.heappush(self.subject_heaps.setdefault(subject_name, []), subject_entry)
+        self.entries[key] = (entry, subject_entry)
+
+    def remove(self, subject_name: str, topic_name: str):
+        """Drop a topic from the queue (lazily; its heap entries are skipped later)"""
+        entries = self.entries.pop((subject_name, topic_name), None)
+        if entries is not None:
+            for entry in entries:
+                entry[-1] = _REMOVED
+            self.stale += 1
+            if self.stale > len(self.entries) + 1024:
+                self._purge()
+
+    def _purge(self):
+        """Rebuild the heaps without removed entries once they dominate"""
+        self.heap = [entry for entry in self.heap if entry[-1] is not _REMOVED]
+        heapq.heapify(self.heap)
+        for subject_name, heap in self.subject_heaps.items():
+            heap[:] = [entry for entry in heap if entry[-1] is not _REMOVED]
+            heapq.heapify(heap)
+        self.stale = 0
+
+    def remove_subject(self, subject_name: str, topics):
+        for topic_name in topics:
+            self.remove(subject_name, topic_name)
+        self.subject_heaps.pop(subject_name, None)
+
+    def next_due(self, limit: int = None, subject_name: str = None,
+                 today: int = None) -> List[Tuple[str, str]]:
+        """Up to ``limit`` (subject, topic) pairs due on or before ``today``, soonest first
+
+        ``today`` defaults to the current date; pass 0 for no cut-off.
+        """
+        if today is None:
+            today = datetime.date.today().toordinal()
+        heap = self.heap if subject_name is None else self.subject_heaps.get(subject_name, [])
+        taken = []
+        while heap and (limit is None or len(taken) < limit):
+            entry = heap[0]
+            self.topics_scanned += 1
+            if entry[-1] is _REMOVED:
+                heapq.heappop(heap)
+                continue
+            if today and entry[0] > today:
+                break
+            taken.append(heapq.heappop(heap))
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [entry[-1] for entry in taken]
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        """Keep the queue in step with one applied mutation"""
+        kind = op["op"]
+        subject_name = op["subject"]
+        scheduled = subject_name in self.subject_heaps
+        if kind in ("add_subject", "del_subject"):
+            if old is not None and scheduled:
+                self.remove_subject(subject_name, old["topics"])
+            if kind == "add_subject" and (scheduled or old is None or not self.lazy):
+                self.subject_heaps.setdefault(subject_name, [])
+                for topic_name, topic in subjects[subject_name]["topics"].items():
+                    self.schedule(subject_name, topic_name, topic)
+        elif kind == "set_subject" or subject_name not in subjects or not scheduled:
+            return
+        else:
+            topic = subjects[subject_name]["topics"].get(op["topic"])
+            if topic is None:
+                self.remove(subject_name, op["topic"])
+            elif kind == "add_topic" or (
+                    old is not None and any(field in op["fields"] for field in SCHEDULE_FIELDS)):
+                self.schedule(subject_name, op["topic"], topic)
@@ -0,0 +1,299 @@
+import bisect
+import heapq
+import marshal
+import operator
+import os
+import re
+import struct
+import sys
+import zlib
+from typing import Dict, List, Set, Tuple, Any
+
+MAGIC = b"SASRCH"
+FORMAT_VERSION = 1
+# magic, format version, python major/minor (marshal is version specific),
+# CRC32 of the indexed text, CRC32 of the marshal body
+_HEADER = struct.Struct("<6sBBBII")
+
+NAME_WEIGHT = 3
+NOTES_WEIGHT = 1
+SUBJECT_WEIGHT = 1
+PREFIX_FACTOR = 0.5
+FUZZY_FACTOR = 0.3
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+MAX_EXPANSIONS = 64
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold()) if text else []
+
+
+def index_path(data_file: str) -> str:
+    return data_file + ".search"
+
+
+def content_digest(subjects: Dict[str, Any]) -> int:
+    """CRC32 of every searchable string, to tell whether a saved index is current"""
+    parts = []
+    for name, subject in subjects.items():
+        parts.append(name)
+        parts.append(subject.get("notes", ""))
+        for topic_name, topic in subject["topics"].items():
+            parts.append(topic_name)
+            parts.append(topic.get("notes", ""))
+    return zlib.crc32("\x00".join(parts).encode("utf-8"))
+
+
+def _deletes(token: str) -> Set[str]:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _fuzzy_keys(token: str) -> Set[str]:
+    """Deletion variants under which an index token is filed for typo lookups"""
+    return _deletes(token) if len(token) >= MIN_FUZZY_LENGTH else set()
+
+
+def _one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by one insertion, deletion, substitution or adjacent swap"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (
+        i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:])
+
+
+def _doc_terms(subject_name: str, topic_name, data: Dict[str, Any]) -> Dict[str, int]:
+    terms: Dict[str, int] = {}
+    for token in tokenize(topic_name if topic_name is not None else subject_name):
+        terms[token] = terms.get(token, 0) + NAME_WEIGHT
+    for token in tokenize(data.get("notes", "")):
+        terms[token] = terms.get(token, 0) + NOTES_WEIGHT
+    if topic_name is not None:
+        for token in tokenize(subject_name):
+            terms[token] = terms.get(token, 0) + SUBJECT_WEIGHT
+    return terms
+
+
+class SearchIndex:
+    """Inverted index over subject names, topic names and notes
+
+    Documents are subjects ``(subject, None)`` and topics ``(subject, topic)``,
+    numbered through ``docs``. ``postings`` maps each token to the ids of the
+    documents containing it and a weight (names count more than notes). A sorted vocabulary answers prefix lookups
+    with a binary search, and a single-deletion table (SymSpell style) finds
+    one-typo matches without scanning the vocabulary. Mutations update only
+    the affected document, and the index is saved next to the data file so
+    startup only has to check that it is still current.
+    """
+
+    def __init__(self):
+        self.docs: List[Tuple[str, Any]] = []  # id -> key, None for freed ids
+        self.doc_ids: Dict[Tuple[str, Any], int] = {}
+        self.free: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.variants: Dict[str, Set[str]] = {}
+        self.vocab: List[str] = []
+        self.topics_scanned = 0
+
+    def _add_doc(self, key: Tuple[str, Any], terms: Dict[str, int]):
+        doc_id = self.doc_ids.get(key)
+        if doc_id is None:
+            if self.free:
+                doc_id = self.free.pop()
+                self.docs[doc_id] = key
+            else:
+                doc_id = len(self.docs)
+                self.docs.append(key)
+            self.doc_ids[key] = doc_id
+        for token, weight in terms.items():
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                bisect.insort(self.vocab, token)
+                for variant in _fuzzy_keys(token):
+                    self.variants.setdefault(variant, set()).add(token)
+            docs[doc_id] = weight
+
+    def _remove_doc(self, key: Tuple[str, Any], terms: Dict[str, int]):
+        doc_id = self.doc_ids.pop(key, None)
+        if doc_id is None:
+            return
+        self.docs[doc_id] = None
+        self.free.append(doc_id)
+        for token in terms:
+            docs = self.postings.get(token)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[token]
+                del self.vocab[bisect.bisect_left(self.vocab, token)]
+                for variant in _fuzzy_keys(token):
+                    tokens = self.variants.get(variant)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self.variants[variant]
+
+    def _add_subject(self, subject_name: str, subject: Dict[str, Any]):
+        self._add_doc((subject_name, None), _doc_terms(subject_name, None, subject))
+        for topic_name, topic in subject["topics"].items():
+            self._add_doc((subject_name, topic_name), _doc_terms(subject_name, topic_name, topic))
+
+    def _remove_subject(self, subject_name: str, subject: Dict[str, Any]):
+        self._remove_doc((subject_name, None), _doc_terms(subject_name, None, subject))
+        for topic_name, topic in subject["topics"].items():
+            self._remove_doc((subject_name, topic_name), _doc_terms(subject_name, topic_name, topic))
+
+    def rebuild(self, subjects: Dict[str, Any]):
+        self.docs, self.doc_ids, self.free = [], {}, []
+        self.postings, self.variants, self.vocab = {}, {}, []
+        for subject_name, subject in subjects.items():
+            self._add_subject(subject_name, subject)
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        """Re-index only the subject or topic touched by one applied mutation"""
+        kind = op["op"]
+        subject_name = op["subject"]
+        if kind in ("add_subject", "del_subject"):
+            if old is not None:
+                self._remove_subject(subject_name, old)
+            if kind == "add_subject":
+                self._add_subject(subject_name, subjects[subject_name])
+            return
+        if subject_name not in subjects or (old is None and kind != "add_topic"):
+            return
+        if kind == "set_subject":
+            if "notes" in op["fields"]:
+                key = (subject_name, None)
+                self._remove_doc(key, _doc_terms(subject_name, None, old))
+                self._add_doc(key, _doc_terms(subject_name, None, subjects[subject_name]))
+            return
+        if kind == "set_topic" and "notes" not in op["fields"]:
+            return
+        key = (subject_name, op["topic"])
+        if old is not None:
+            self._remove_doc(key, _doc_terms(subject_name, op["topic"], old))
+        topic = subjects[subject_name]["topics"].get(op["topic"])
+        if topic is not None:
+            self._add_doc(key, _doc_terms(subject_name, op["topic"], topic))
+
+    def expand(self, term: str) -> Dict[str, float]:
+        """Index tokens a query term matches: exact, then prefix, then one-typo fuzzy"""
+        expansions = {}
+        if term in self.postings:
+            expansions[term] = 1.0
+        if len(term) >= MIN_PREFIX_LENGTH:
+            i = bisect.bisect_left(self.vocab, term)
+            while (i < len(self.vocab) and self.vocab[i].startswith(term)
+                   and len(expansions) < MAX_EXPANSIONS):
+                expansions.setdefault(self.vocab[i], PREFIX_FACTOR)
+                i += 1
+        if not expansions and len(term) >= MIN_FUZZY_LENGTH:
+            candidates = set(self.variants.get(term, ()))
+            for variant in _deletes(term):
+                if variant in self.postings:
+                    candidates.add(variant)
+                candidates.update(self.variants.get(variant, ()))
+            for token in candidates:
+                if _one_edit(term, token):
+                    expansions[token] = FUZZY_FACTOR
+        return expansions
+
+    def search(self, query: str, limit: int = 20, subject_name: str = None) -> List[Dict[str, Any]]:
+        """Best-scoring documents containing every query term (or a prefix/typo of it)"""
+        terms = []
+        for term in dict.fromkeys(tokenize(query)):
+            expansions = self.expand(term)
+            if not expansions:
+                return []
+            size = sum(len(self.postings[token]) for token in expansions)
+            terms.append((size, expansions))
+            self.topics_scanned += size
+        if not terms:
+            return []
+        # Start from the rarest term so later terms only probe its candidates
+        terms.sort(key=lambda item: item[0])
+
+        if len(terms) == 1 and len(terms[0][1]) == 1 and subject_name is None:
+            # One plain token: rank its postings directly, no score table needed
+            (token, factor), = terms[0][1].items()
+            best = heapq.nlargest(limit, self.postings[token].items(), key=operator.itemgetter(1))
+            return self._results((doc_id, weight * factor) for doc_id, weight in best)
+
+        scores: Dict[int, float] = {}
+        for token, factor in terms[0][1].items():
+            docs = self.postings[token]
+            if subject_name is not None:
+                docs = {doc_id: weight for doc_id, weight in docs.items()
+                        if self.docs[doc_id][0] == subject_name}
+            if not scores:
+                scores = {doc_id: weight * factor for doc_id, weight in docs.items()}
+                continue
+            for doc_id, weight in docs.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * factor
+        for _, expansions in terms[1:]:
+            lists = [(self.postings[token], factor) for token, factor in expansions.items()]
+            narrowed = {}
+            for doc_id, score in scores.items():
+                extra = sum(docs[doc_id] * factor for docs, factor in lists if doc_id in docs)
+                if extra:
+                    narrowed[doc_id] = score + extra
+            scores = narrowed
+            if not scores:
+                return []
+
+        return self._results(heapq.nlargest(limit, scores.items(), key=operator.itemgetter(1)))
+
+    def _results(self, ranked) -> List[Dict[str, Any]]:
+        return [{"subject": self.docs[doc_id][0], "topic": self.docs[doc_id][1], "score": round(score, 2)}
+                for doc_id, score in ranked]
+
+    def save(self, path: str, subjects: Dict[str, Any], digest: int = None):
+        """Write the index sidecar, stamped with the digest of the indexed text
+
+        ``digest`` is one a storage backend keeps up to date (see
+        ``Storage.content_digest``); without one the text is hashed here.
+        """
+        tmp_path = path + ".tmp"
+        try:
+            body = marshal.dumps((self.docs, self.postings, self.variants))
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, *sys.version_info[:2],
+                                     content_digest(subjects) if digest is None else digest,
+                                     zlib.crc32(body)))
+                f.write(body)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError):
+            # The sidecar only saves a rebuild; never fail a save over it
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str, subjects: Dict[str, Any], digest: int = None) -> "SearchIndex":
+        """Load the sidecar if it matches the current data, otherwise build from scratch"""
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                header = _HEADER.unpack(f.read(_HEADER.size))
+                body = f.read()
+            expected = (MAGIC, FORMAT_VERSION, *sys.version_info[:2],
+                        content_digest(subjects) if digest is None else digest, zlib.crc32(body))
+            if header == expected:
+                index.docs, index.postings, index.variants = marshal.loads(body)
+                index.doc_ids = {key: i for i, key in enumerate(index.docs) if key is not None}
+                index.free = [i for i, key in enumerate(index.docs) if key is None]
+                index.vocab = sorted(index.postings)
+                return index
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            pass
+        index.rebuild(subjects)
+        return index
@@ -0,0 +1,298 @@
+import asyncio
+import collections
+import json
+import os
+import re
+import urllib.parse
+import weakref
+from typing import Any, Callable, Dict, List, Tuple
+
+from study_assistant import StudyAssistant
+
+USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+MAX_BODY_BYTES = 1024 * 1024
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class UserStores:
+    """Per-user StudyAssistant instances with LRU eviction and per-user locks
+
+    Every operation for a user runs while holding that user's lock, in a
+    worker thread so disk I/O never blocks the event loop. Requests for
+    different users proceed concurrently; requests for the same user are
+    serialized. A user is taken out of the cache, flushed and closed while
+    holding their lock, and only when no request for them is running or
+    queued, so there is never a second instance open on the same files: a
+    request that arrives meanwhile reloads the data once it is on disk.
+    """
+
+    def __init__(self, data_dir: str, max_users: int = 128, backend: str = "journal"):
+        self.data_dir = data_dir
+        self.max_users = max_users
+        self.backend = backend
+        self.cache: "collections.OrderedDict[str, StudyAssistant]" = collections.OrderedDict()
+        # Weak values: a lock lives exactly as long as someone holds or waits on it
+        self.locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.evictions = set()
+        self.evicting = set()  # users with an eviction scheduled
+        self.active: Dict[str, int] = {}  # requests running or waiting, per user
+
+    def _lock_for(self, user_id: str) -> asyncio.Lock:
+        lock = self.locks.get(user_id)
+        if lock is None:
+            lock = self.locks[user_id] = asyncio.Lock()
+        return lock
+
+    def _open(self, user_id: str) -> StudyAssistant:
+        user_dir = os.path.join(self.data_dir, user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        return StudyAssistant(os.path.join(user_dir, "study_data.json"), self.backend)
+
+    async def run(self, user_id: str, operation: Callable[[StudyAssistant], Any]):
+        """Run operation(assistant) for a user, serialized with that user's other requests"""
+        if not USER_ID.match(user_id):
+            raise HTTPError(400, "User ids may only contain letters, digits, '-' and '_'")
+        loop = asyncio.get_running_loop()
+        self.active[user_id] = self.active.get(user_id, 0) + 1
+        try:
+            async with self._lock_for(user_id):
+                assistant = self.cache.get(user_id)
+                if assistant is None:
+                    assistant = await loop.run_in_executor(None, self._open, user_id)
+                    self.cache[user_id] = assistant
+                    self._evict_overflow(user_id)
+                else:
+                    self.cache.move_to_end(user_id)
+                return await loop.run_in_executor(None, operation, assistant)
+        finally:
+            self.active[user_id] -= 1
+            if not self.active[user_id]:
+                del self.active[user_id]
+
+    def _evict_overflow(self, current_user: str):
+        excess = len(self.cache) - len(self.evicting) - self.max_users
+        for user_id in list(self.cache):
+            if excess <= 0:
+                break
+            if user_id != current_user and user_id not in self.evicting and user_id not in self.active:
+                self.evicting.add(user_id)
+                task = asyncio.create_task(self._evict(user_id))
+                self.evictions.add(task)
+                task.add_done_callback(self.evictions.discard)
+                excess -= 1
+
+    async def _evict(self, user_id: str, force: bool = False):
+        """Close a cached user under their lock, unless a request for them came in meanwhile"""
+        try:
+            async with self._lock_for(user_id):
+                if user_id in self.active and not force:
+                    return
+                assistant = self.cache.pop(user_id, None)
+                if assistant is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, assistant.close)
+        finally:
+            self.evicting.discard(user_id)
+
+    async def close(self):
+        """Flush and close every cached user"""
+        await asyncio.gather(*self.evictions)
+        for user_id in list(self.cache):
+            await self._evict(user_id, force=True)
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default):
+    try:
+        return int(query[name][0]) if name in query else default
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be a whole number") from None
+
+
+def _search(query: Dict[str, List[str]]):
+    text = query.get("q", [""])[0]
+    limit = _int_param(query, "limit", 20)
+    subject = query.get("subject", [None])[0]
+    return lambda assistant: (200, {"results": assistant.search_topics(text, limit, subject)})
+
+
+def _plan(query: Dict[str, List[str]]):
+    days = _int_param(query, "days", 7)
+    return lambda assistant: (200, assistant.study_plan(days))
+
+
+def _history(query: Dict[str, List[str]]):
+    days = _int_param(query, "days", 30)
+    bucket_days = _int_param(query, "bucket", 1)
+    subject = query.get("subject", [None])[0]
+    return lambda assistant: (200, {"buckets": assistant.history_report(days, bucket_days, subject)})
+
+
+def _save_subject(body):
+    name = str(body.get("name", "")).strip()
+
+    def operation(assistant: StudyAssistant):
+        created = assistant.save_subject(name, body.get("exam_date", ""),
+                                         body.get("priority", ""), body.get("notes", ""))
+        return (201 if created else 200), {"subject": name, "created": created}
+    return operation
+
+
+def _add_topics(subject: str, body):
+    topics = body.get("topics")
+    if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+        raise HTTPError(400, "'topics' must be a list of strings")
+    return lambda assistant: (200, assistant.add_topic_list(subject, topics))
+
+
+def _review(subject: str, body):
+    def operation(assistant: StudyAssistant):
+        assistant.review_topic(subject, body.get("topic", ""), body.get("action", ""),
+                               body.get("confidence"), body.get("notes"))
+        assistant.log_study_session(subject)
+        assistant.save_data()
+        return 200, {"topic": assistant.subjects[subject]["topics"][body["topic"]]}
+    return operation
+
+
+def _answer_quiz(subject: str, body):
+    answers = body.get("answers")
+    if not isinstance(answers, list) or not answers or not all(isinstance(a, dict) for a in answers):
+        raise HTTPError(400, "'answers' must be a non-empty list of {topic, rating} objects")
+
+    def operation(assistant: StudyAssistant):
+        # Check every answer first, so a rejected request changes nothing
+        for answer in answers:
+            assistant.check_quiz_rating(subject, answer.get("topic", ""), answer.get("rating"))
+        for answer in answers:
+            assistant.record_quiz_rating(subject, answer.get("topic", ""), answer["rating"])
+        assistant.save_data()
+        average = sum(answer["rating"] for answer in answers) / len(answers)
+        return 200, {"answered": len(answers), "average_score": average}
+    return operation
+
+
+def route(method: str, target: str, body: Dict[str, Any]) -> Tuple[str, Callable]:
+    """Map a request to (user id, operation); raises HTTPError for unknown routes"""
+    url = urllib.parse.urlsplit(target)
+    query = urllib.parse.parse_qs(url.query)
+    parts = [urllib.parse.unquote(p) for p in url.path.strip("/").split("/")]
+    if len(parts) < 3 or parts[0] != "users":
+        raise HTTPError(404, "Not found")
+    user_id, resource = parts[1], parts[2:]
+
+    routes = {
+        ("GET", "progress"): lambda: (lambda a: (200, a.progress_report())),
+        ("GET", "statistics"): lambda: (lambda a: (200, a.statistics_report())),
+        ("GET", "schedule"): lambda: (lambda a: (200, a.schedule_report())),
+        ("GET", "plan"): lambda: _plan(query),
+        ("GET", "history"): lambda: _history(query),
+        ("GET", "search"): lambda: _search(query),
+        ("POST", "subjects"): lambda: _save_subject(body),
+    }
+    if len(resource) == 1 and (method, resource[0]) in routes:
+        return user_id, routes[(method, resource[0])]()
+
+    if len(resource) == 3 and resource[0] == "subjects":
+        subject, action = resource[1], resource[2]
+        if (method, action) == ("POST", "topics"):
+            return user_id, _add_topics(subject, body)
+        if (method, action) == ("GET", "revision"):
+            limit = _int_param(query, "limit", None)
+            return user_id, lambda a: (200, {"topics": a.revision_queue(subject, limit)})
+        if (method, action) == ("POST", "reviews"):
+            return user_id, _review(subject, body)
+        if (method, action) == ("GET", "quiz"):
+            count = _int_param(query, "count", 5)
+            return user_id, lambda a: (200, {"topics": a.quiz_topics(subject, count)})
+        if (method, action) == ("POST", "quiz"):
+            return user_id, _answer_quiz(subject, body)
+    raise HTTPError(404 if method in ("GET", "POST") else 405, "Not found")
+
+
+class StudyService:
+    """Minimal asyncio HTTP/1.1 JSON server (keep-alive, Content-Length bodies)"""
+
+    def __init__(self, data_dir: str, max_users: int = 128, backend: str = "journal"):
+        self.users = UserStores(data_dir, max_users, backend)
+
+    async def dispatch(self, method: str, target: str, raw_body: bytes) -> Tuple[int, Any]:
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            user_id, operation = route(method, target, body)
+            return await self.users.run(user_id, operation)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except json.JSONDecodeError:
+            return 400, {"error": "Request body is not valid JSON"}
+        except KeyError as e:
+            return 404, {"error": f"Unknown subject or topic: {e.args[0]}"}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {"error": "Request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target, body)
+                    keep_alive = (version == "HTTP/1.1"
+                                  and headers.get("connection", "").lower() != "close")
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"🎓 Study service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.users.close()
+
+
+def run_service(data_dir: str, host: str = "127.0.0.1", port: int = 8080,
+                max_users: int = 128, backend: str = "journal"):
+    """Run the HTTP service until interrupted"""
+    try:
+        asyncio.run(StudyService(data_dir, max_users, backend).serve(host, port))
+    except KeyboardInterrupt:
+        print("\n👋 Study service stopped")
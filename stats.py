@@ -0,0 +1,214 @@
+import datetime
+from typing import Dict, List, Any
+
+from scheduler import date_ordinal, days_left
+
+STATUSES = ("not_started", "in_progress", "completed")
+
+
+class Aggregate:
+    """Running totals over a set of topics"""
+
+    __slots__ = ("topics", "status_counts", "confidence_sum", "rated_topics", "study_time", "histogram", "sessions")
+
+    def __init__(self):
+        self.topics = 0
+        self.status_counts = dict.fromkeys(STATUSES, 0)
+        self.confidence_sum = 0
+        self.rated_topics = 0  # topics with confidence > 0
+        self.study_time = 0
+        self.histogram = [0] * 11  # topics per confidence level 0-10
+        self.sessions = 0
+
+    def add_topic(self, topic: Dict[str, Any], sign: int = 1):
+        self.topics += sign
+        self.status_counts[topic["status"]] = self.status_counts.get(topic["status"], 0) + sign
+        if topic["confidence"] > 0:
+            self.confidence_sum += sign * topic["confidence"]
+            self.rated_topics += sign
+        self.study_time += sign * topic["study_time"]
+        self.histogram[min(max(topic["confidence"], 0), 10)] += sign
+
+    def merge(self, other: "Aggregate", sign: int = 1):
+        self.topics += sign * other.topics
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + sign * count
+        self.confidence_sum += sign * other.confidence_sum
+        self.rated_topics += sign * other.rated_topics
+        self.study_time += sign * other.study_time
+        for level, count in enumerate(other.histogram):
+            self.histogram[level] += sign * count
+        self.sessions += sign * other.sessions
+
+    @property
+    def completed(self) -> int:
+        return self.status_counts["completed"]
+
+    @property
+    def in_progress(self) -> int:
+        return self.status_counts["in_progress"]
+
+    @property
+    def completion_rate(self) -> float:
+        """Completed topics as a percentage (0 when there are no topics)"""
+        return (self.completed / self.topics) * 100 if self.topics else 0.0
+
+    @property
+    def average_confidence(self):
+        """Mean confidence over rated topics, or None if nothing is rated"""
+        return self.confidence_sum / self.rated_topics if self.rated_topics else None
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "Aggregate":
+        """Inverse of ``as_dict`` (``sessions`` is optional)"""
+        aggregate = cls()
+        aggregate.topics = values["topics"]
+        aggregate.status_counts.update(values["status_counts"])
+        aggregate.confidence_sum = values["confidence_sum"]
+        aggregate.rated_topics = values["rated_topics"]
+        aggregate.study_time = values["study_time"]
+        aggregate.histogram = list(values["histogram"])
+        aggregate.sessions = values.get("sessions", 0)
+        return aggregate
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "topics": self.topics,
+            "status_counts": {k: v for k, v in self.status_counts.items() if v},
+            "confidence_sum": self.confidence_sum,
+            "rated_topics": self.rated_topics,
+            "study_time": self.study_time,
+            "histogram": list(self.histogram),
+            "sessions": self.sessions,
+        }
+
+
+def summary_totals(per_subject: Dict[str, Dict[str, Any]], histogram, sessions: int,
+                   rated: int, confidence_sum: int) -> Dict[str, Any]:
+    """Combine per-subject figures into the report shared by every statistics source"""
+    topics = sum(s["topics"] for s in per_subject.values())
+    completed = sum(s["completed"] for s in per_subject.values())
+    in_progress = sum(s["in_progress"] for s in per_subject.values())
+    return {
+        "subjects": len(per_subject),
+        "topics": topics,
+        "completed": completed,
+        "in_progress": in_progress,
+        "not_started": topics - completed - in_progress,
+        "completion_rate": (completed / topics) * 100 if topics else 0.0,
+        "average_confidence": confidence_sum / rated if rated else None,
+        "sessions": sessions,
+        "confidence_histogram": histogram,
+        "per_subject": per_subject,
+    }
+
+
+class StatsEngine:
+    """Per-subject and global aggregates kept up to date as topics change
+
+    ``on_change`` receives every mutation applied to the subjects dict along
+    with the state it replaced, so each update costs O(1) (O(topics) only when
+    a whole subject is added or removed). Reports then read the totals
+    directly instead of walking every topic.
+    """
+
+    def __init__(self):
+        self.subjects: Dict[str, Aggregate] = {}
+        self.total = Aggregate()
+
+    def rebuild(self, subjects: Dict[str, Any], counts: Dict[str, Dict[str, Any]] = None):
+        """Recompute every aggregate from scratch
+
+        ``counts`` holds topic totals a storage backend saved per subject (in
+        ``Aggregate.as_dict`` form); those subjects' topics are not walked.
+        """
+        self.subjects = {}
+        self.total = Aggregate()
+        for name in subjects:
+            self._add_subject(subjects, name, counts.get(name) if counts else None)
+
+    def _add_subject(self, subjects: Dict[str, Any], name: str, counts: Dict[str, Any] = None):
+        if counts is not None:
+            aggregate = Aggregate.from_dict(counts)
+        else:
+            aggregate = Aggregate()
+            for topic in subjects[name]["topics"].values():
+                aggregate.add_topic(topic)
+        aggregate.sessions = subjects[name].get("total_sessions", 0)
+        self.subjects[name] = aggregate
+        self.total.merge(aggregate)
+
+    def _remove_subject(self, name: str):
+        aggregate = self.subjects.pop(name, None)
+        if aggregate is not None:
+            self.total.merge(aggregate, -1)
+
+    def _update_topic(self, name: str, old, new):
+        aggregate = self.subjects.get(name)
+        if aggregate is None:
+            return
+        for topic, sign in ((old, -1), (new, 1)):
+            if topic is not None:
+                aggregate.add_topic(topic, sign)
+                self.total.add_topic(topic, sign)
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        """Fold one applied mutation (and the state it replaced) into the totals"""
+        kind = op["op"]
+        name = op["subject"]
+        if kind == "add_subject":
+            self._remove_subject(name)
+            self._add_subject(subjects, name)
+        elif kind == "del_subject":
+            self._remove_subject(name)
+        elif kind == "set_subject":
+            if old is not None and "total_sessions" in op["fields"]:
+                delta = subjects[name]["total_sessions"] - old.get("total_sessions", 0)
+                self.subjects[name].sessions += delta
+                self.total.sessions += delta
+        elif name in subjects:
+            new = subjects[name]["topics"].get(op["topic"])
+            self._update_topic(name, old, new)
+
+    def subject(self, name: str) -> Aggregate:
+        return self.subjects[name]
+
+    def subject_figures(self, name: str, subject: Dict[str, Any], now: datetime.datetime = None) -> Dict[str, Any]:
+        """One subject's entry in the ``per_subject`` part of the report"""
+        aggregate = self.subjects[name]
+        exam = date_ordinal(subject["exam_date"])
+        return {
+            "topics": aggregate.topics,
+            "completed": aggregate.completed,
+            "in_progress": aggregate.in_progress,
+            "completion_rate": aggregate.completion_rate,
+            "average_confidence": aggregate.average_confidence,
+            "study_time": aggregate.study_time,
+            "days_until_exam": days_left(exam, now or datetime.datetime.now()) if exam else None,
+        }
+
+    def totals(self, per_subject: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Report in the ``summary_totals`` layout from already computed subject figures"""
+        return summary_totals(per_subject, list(self.total.histogram), self.total.sessions,
+                              self.total.rated_topics, self.total.confidence_sum)
+
+    def summary(self, subjects: Dict[str, Any], now: datetime.datetime = None) -> Dict[str, Any]:
+        """Report in the ``summary_totals`` layout, in O(subjects)"""
+        now = now or datetime.datetime.now()
+        return self.totals({name: self.subject_figures(name, subject, now) for name, subject in subjects.items()})
+
+    def verify(self, subjects: Dict[str, Any]) -> List[str]:
+        """Rebuild the aggregates from scratch and list any that disagree"""
+        fresh = StatsEngine()
+        fresh.rebuild(subjects)
+        problems = []
+        if fresh.total.as_dict() != self.total.as_dict():
+            problems.append(f"total: expected {fresh.total.as_dict()}, have {self.total.as_dict()}")
+        for name in set(fresh.subjects) | set(self.subjects):
+            expected = fresh.subjects.get(name)
+            actual = self.subjects.get(name)
+            expected = expected.as_dict() if expected else None
+            actual = actual.as_dict() if actual else None
+            if expected != actual:
+                problems.append(f"{name}: expected {expected}, have {actual}")
+        return problems
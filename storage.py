@@ -0,0 +1,1266 @@
+import collections
+import copy
+import datetime
+import json
+import marshal
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, List, Set, Tuple, Any
+
+from cache import load_json, write_cache
+from scheduler import SCHEDULE_FIELDS, due_ordinal
+from stats import Aggregate
+
+
+def apply_op(subjects: Dict[str, Any], op: Dict[str, Any]):
+    """Apply a single mutation record to the subjects dict in place
+
+    Every record carries absolute values (never increments), so replaying a
+    journal over a snapshot that already contains some of its records still
+    converges to the same state. Returns the subject or topic state the record
+    replaced (None if it did not exist) so listeners can compute deltas.
+    """
+    kind = op["op"]
+    subject = subjects.get(op["subject"])
+
+    if kind == "add_subject":
+        subjects[op["subject"]] = copy.deepcopy(op["data"])
+        return subject
+    if kind == "del_subject":
+        return subjects.pop(op["subject"], None)
+    if subject is None:
+        return None
+    if kind == "set_subject":
+        old = dict(subject)
+        subject.update(op["fields"])
+        return old
+    if kind == "add_topic":
+        old = subject["topics"].get(op["topic"])
+        subject["topics"][op["topic"]] = dict(op["data"])
+        return old
+    if kind == "set_topic":
+        topic = subject["topics"].get(op["topic"])
+        if topic is None:
+            return None
+        old = dict(topic)
+        topic.update(op["fields"])
+        return old
+    if kind == "del_topic":
+        return subject["topics"].pop(op["topic"], None)
+    raise ValueError(f"Unknown journal operation: {kind}")
+
+
+def write_snapshot(path: str, subjects: Dict[str, Any]) -> bytes:
+    """Atomically replace path with a JSON dump of subjects, returning the bytes written"""
+    payload = json.dumps(subjects, indent=2, ensure_ascii=False).encode("utf-8")
+    replace_file(path, payload)
+    return payload
+
+
+def replace_file(path: str, payload: bytes):
+    """Write payload to a temporary file, fsync it and rename it over path"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def _fsync_dir(path: str):
+    """Make a rename durable by syncing the containing directory (POSIX only)"""
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+TOPIC_FIELDS = ("status", "confidence", "study_time", "last_reviewed", "notes", "difficulty")
+SUBJECT_FIELDS = ("exam_date", "priority", "total_sessions", "last_studied", "notes")
+OPEN_STATUSES = ("not_started", "in_progress")
+
+
+class Storage:
+    """Base class for persistence backends
+
+    A backend loads the subjects dict once, is told about every mutation via
+    ``record`` and makes them durable on ``flush``. The topic queries below
+    scan the in-memory dict; backends with indexes override them and set
+    ``indexed``, and StudyAssistant then asks them rather than its in-memory
+    scheduler and aggregates.
+
+    ``bytes_read``, ``bytes_written`` and ``topics_scanned`` are running
+    totals for instrumentation. ``lazy`` backends read a subject's topics
+    only when they are first touched, so components should avoid walking
+    every subject up front.
+    """
+
+    lazy = False
+    indexed = False
+
+    def __init__(self, data_file: str, use_cache: bool = True):
+        self.data_file = data_file
+        self.use_cache = use_cache
+        self.subjects: Dict[str, Any] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.topics_scanned = 0
+
+    def load(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def record(self, op: Dict[str, Any]):
+        raise NotImplementedError
+
+    def flush(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def prepare_flush(self):
+        """First half of a flush made off the calling thread (see writer.WriteBehind)
+
+        Runs while mutations are paused: captures whatever the flush has to
+        write and returns a function that does the slow I/O afterwards, or
+        None when nothing is left to do. Backends without a cheap way to
+        capture their state simply flush here.
+        """
+        self.flush()
+        return None
+
+    def spill(self):
+        """Write out recorded changes held in memory, without making them durable
+
+        For long runs of changes with one ``flush`` at the end (bulk imports):
+        no fsync and no compaction. Backends that hold nothing back do nothing.
+        """
+
+    def read(self) -> Dict[str, Any]:
+        """Everything stored, read without creating, migrating or repairing any file
+
+        For analysing data files that are not open. None when this backend's
+        files do not exist yet.
+        """
+        return None
+
+    def subject_counts(self) -> Dict[str, Dict[str, Any]]:
+        """Per-subject topic totals (``Aggregate.as_dict`` form) as of load, if stored"""
+        return None
+
+    def content_digest(self) -> int:
+        """A digest of the searchable text kept without reading the topics, if available"""
+        return None
+
+    def revision_topics(self, subject_name: str, today: int = None, limit: int = None) -> List[str]:
+        """Up to ``limit`` topics due for review on or before ``today`` (an ordinal), soonest first
+
+        The order is the revision scheduler's: due day, then confidence.
+        ``today`` defaults to the current date.
+        """
+        if today is None:
+            today = datetime.date.today().toordinal()
+        topics = self.subjects[subject_name]["topics"]
+        self.topics_scanned += len(topics)
+        due = []
+        for topic, data in topics.items():
+            day = due_ordinal(data)
+            if day <= today:
+                due.append((day, data["confidence"], len(due), topic))
+        due.sort()
+        return [entry[-1] for entry in due[:limit]]
+
+    def incomplete_topics(self, subject_name: str) -> List[str]:
+        """Topics that are not completed yet"""
+        topics = self.subjects[subject_name]["topics"]
+        self.topics_scanned += len(topics)
+        return [t for t, data in topics.items() if data["status"] != "completed"]
+
+    def find_topics(self, subject_name: str = None, status: str = None, min_confidence: int = None,
+                    reviewed_before: str = None) -> List[Tuple[str, str]]:
+        """(subject, topic) pairs matching every given criterion
+
+        ``reviewed_before`` is a YYYY-MM-DD date; never-reviewed topics match it.
+        """
+        subjects = self.subjects.items() if subject_name is None else [
+            (subject_name, self.subjects[subject_name])]
+        found = []
+        for name, subject in subjects:
+            self.topics_scanned += len(subject["topics"])
+            for topic, data in subject["topics"].items():
+                if ((status is None or data["status"] == status)
+                        and (min_confidence is None or data["confidence"] >= min_confidence)
+                        and (reviewed_before is None or data["last_reviewed"] < reviewed_before)):
+                    found.append((name, topic))
+        return found
+
+    def status_counts(self, subject_name: str = None) -> Dict[str, int]:
+        """Topic counts by status for one subject, or for all subjects"""
+        if subject_name is None:
+            subjects = self.subjects.values()
+        else:
+            subjects = [self.subjects[subject_name]]
+        counts = {"not_started": 0, "in_progress": 0, "completed": 0}
+        for subject in subjects:
+            self.topics_scanned += len(subject["topics"])
+            for topic in subject["topics"].values():
+                counts[topic["status"]] = counts.get(topic["status"], 0) + 1
+        return counts
+
+
+def _load_json(path: str, use_cache: bool) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        return load_json(path, use_cache)
+    except (json.JSONDecodeError, UnicodeDecodeError, FileNotFoundError):
+        return {}
+
+
+def _save_json(path: str, subjects: Dict[str, Any], use_cache: bool, body: bytes = None) -> int:
+    """Write the JSON snapshot (and refresh its binary cache), returning its size"""
+    payload = write_snapshot(path, subjects)
+    if use_cache:
+        write_cache(path, payload, subjects, body)
+    return len(payload)
+
+
+def _snapshot_writer(path: str, subjects: Dict[str, Any], use_cache: bool):
+    """Freeze subjects as they are now and return a function that saves that copy
+
+    The copy is a marshal dump, which is over an order of magnitude faster
+    than the JSON encoding that the returned function then does on its own
+    copy; the dump doubles as the binary cache body.
+    """
+    body = marshal.dumps(subjects)
+    return lambda: _save_json(path, marshal.loads(body), use_cache, body)
+
+
+class JSONStorage(Storage):
+    """The plain JSON file, rewritten in full on every flush"""
+
+    def __init__(self, data_file: str, use_cache: bool = True):
+        super().__init__(data_file, use_cache)
+        self.dirty = False
+
+    def load(self) -> Dict[str, Any]:
+        if os.path.exists(self.data_file):
+            self.bytes_read += os.path.getsize(self.data_file)
+        self.subjects = _load_json(self.data_file, self.use_cache)
+        return self.subjects
+
+    def record(self, op: Dict[str, Any]):
+        self.dirty = True
+
+    def flush(self):
+        if self.dirty:
+            self.bytes_written += _save_json(self.data_file, self.subjects, self.use_cache)
+            self.dirty = False
+
+    def prepare_flush(self):
+        if not self.dirty:
+            return None
+        save = _snapshot_writer(self.data_file, self.subjects, self.use_cache)
+        self.dirty = False
+
+        def write():
+            try:
+                self.bytes_written += save()
+            except BaseException:
+                self.dirty = True
+                raise
+        return write
+
+
+class JournalStorage(Storage):
+    """JSON snapshot plus an append-only journal of mutation records
+
+    Each journal line is ``<crc32> <json>``. A torn or corrupt tail left by a
+    crash is detected on load and truncated, so only whole records are ever
+    replayed. Once the journal grows past ``compact_ratio`` times the snapshot
+    size (and at least ``min_compact_bytes``) it is folded into a fresh snapshot.
+
+    Field updates to a topic (or subject) that is already pending are merged
+    into its pending record, so answering the same topic many times between
+    flushes journals one record. A structural change to a subject stops merging
+    into that subject's earlier records, keeping the replay order intact.
+
+    Deletions are journaled as tombstone records (``del_topic`` and
+    ``del_subject``); the snapshot still holds the deleted data until the next
+    compaction, which also runs once ``max_tombstones`` have piled up.
+    Compaction runs in the background: the journal is renamed to
+    ``.journal.old`` and new records go to a fresh journal while a thread
+    writes the snapshot, then deletes the old journal. Until then a load
+    replays both, which is harmless for the same reason as above.
+    """
+
+    def __init__(self, data_file: str, use_cache: bool = True, compact_ratio: float = 0.5,
+                 min_compact_bytes: int = 64 * 1024, max_tombstones: int = 1000):
+        super().__init__(data_file, use_cache)
+        self.journal_file = data_file + ".journal"
+        self.rotated_file = self.journal_file + ".old"
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.max_tombstones = max_tombstones
+        self.snapshot_bytes = 0
+        self.journal_bytes = 0
+        self.tombstones = 0
+        self.compaction: threading.Thread = None
+        self.compaction_error = None
+        self.pending: List[Dict[str, Any]] = []
+        self.coalesce: Dict[Tuple[str, str], int] = {}
+        self.unwritten = b""
+
+    def load(self) -> Dict[str, Any]:
+        """Load the snapshot and replay every intact journal record on top"""
+        if os.path.exists(self.data_file):
+            self.snapshot_bytes = os.path.getsize(self.data_file)
+        self.subjects = _load_json(self.data_file, self.use_cache)
+        rotated_ops, rotated_bytes = self._read_journal(self.rotated_file)
+        ops, self.journal_bytes = self._read_journal(self.journal_file)
+        for op in rotated_ops + ops:
+            apply_op(self.subjects, op)
+        self.bytes_read += self.snapshot_bytes + rotated_bytes + self.journal_bytes
+        if os.path.exists(self.rotated_file):
+            # A background compaction was interrupted; finish it now
+            self.compact()
+        return self.subjects
+
+    def read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.data_file) and not os.path.exists(self.journal_file):
+            return None
+        subjects = load_json(self.data_file, use_cache=False) if os.path.exists(self.data_file) else {}
+        for path in (self.rotated_file, self.journal_file):
+            for op in self._read_journal(path, repair=False)[0]:
+                apply_op(subjects, op)
+        return subjects
+
+    def _read_journal(self, path: str, repair: bool = True) -> Tuple[List[Dict[str, Any]], int]:
+        """Intact records of a journal file and their size in bytes (cutting off a torn tail if ``repair``)"""
+        if not os.path.exists(path):
+            return [], 0
+
+        ops = []
+        good_offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                op = self._decode(line)
+                if op is None:
+                    break
+                ops.append(op)
+                good_offset += len(line)
+
+        if repair and good_offset != os.path.getsize(path):
+            # Drop the torn tail so later appends are not hidden behind it
+            with open(path, 'r+b') as f:
+                f.truncate(good_offset)
+                f.flush()
+                os.fsync(f.fileno())
+        return ops, good_offset
+
+    @staticmethod
+    def _encode(op: Dict[str, Any]) -> bytes:
+        body = json.dumps(op, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(body), body)
+
+    @staticmethod
+    def _decode(line: bytes):
+        if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+            return None
+        body = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(body):
+                return None
+            return json.loads(body.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    def record(self, op: Dict[str, Any]):
+        kind = op["op"]
+        if kind in ("set_topic", "set_subject"):
+            key = (op["subject"], op.get("topic"))
+            index = self.coalesce.get(key)
+            if index is not None:
+                merged = self.pending[index]
+                self.pending[index] = {**merged, "fields": {**merged["fields"], **op["fields"]}}
+                return
+            self.coalesce[key] = len(self.pending)
+        else:
+            self.coalesce = {key: index for key, index in self.coalesce.items() if key[0] != op["subject"]}
+            if kind in ("del_topic", "del_subject"):
+                self.tombstones += 1
+        self.pending.append(op)
+
+    def _take_pending(self) -> bytes:
+        """Encode and clear the pending records, after any a failed append left over"""
+        payload = self.unwritten + b"".join(self._encode(op) for op in self.pending)
+        self.unwritten = payload
+        self.pending = []
+        self.coalesce = {}
+        return payload
+
+    def _append(self, payload: bytes, sync: bool = True):
+        try:
+            with open(self.journal_file, 'ab') as f:
+                f.write(payload)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError:
+            # Never leave a torn record in front of the retry
+            if os.path.exists(self.journal_file):
+                os.truncate(self.journal_file, self.journal_bytes)
+            raise
+        self.journal_bytes += len(payload)
+        self.bytes_written += len(payload)
+        self.unwritten = b""
+
+    def flush(self):
+        """Durably append pending records, compacting if the journal got large"""
+        payload = self._take_pending()
+        if payload:
+            self._append(payload)
+        if self.needs_compaction():
+            self.start_compaction()
+
+    def spill(self):
+        """Append pending records to the journal without fsync; the next flush syncs them"""
+        payload = self._take_pending()
+        if payload:
+            self._append(payload, sync=False)
+
+    def prepare_flush(self):
+        payload = self._take_pending()
+        if self.needs_compaction(len(payload)):
+            # The snapshot copy is taken here, with mutations paused; records
+            # in payload then land in the fresh journal, which is harmless
+            self.start_compaction()
+        if not payload:
+            return None
+        return lambda: self._append(payload)
+
+    def close(self):
+        self.flush()
+        self.wait_compaction()
+        if self.journal_bytes or os.path.exists(self.rotated_file):
+            self.compact()
+
+    def needs_compaction(self, pending_bytes: int = 0) -> bool:
+        """Whether the journal (or its tombstones) has grown enough to fold into the snapshot"""
+        threshold = max(self.min_compact_bytes, self.snapshot_bytes * self.compact_ratio)
+        return self.journal_bytes + pending_bytes > threshold or self.tombstones >= self.max_tombstones
+
+    def compact(self):
+        """Write a fresh snapshot of the subjects and reset the journal, on this thread"""
+        self.wait_compaction()
+        self.snapshot_bytes = _save_json(self.data_file, self.subjects, self.use_cache)
+        self.bytes_written += self.snapshot_bytes
+        # A crash before this truncate only means replaying records the new
+        # snapshot already contains, which is harmless (see apply_op)
+        with open(self.journal_file, 'wb') as f:
+            os.fsync(f.fileno())
+        if os.path.exists(self.rotated_file):
+            os.remove(self.rotated_file)
+        self.journal_bytes = 0
+        self.tombstones = 0
+
+    def start_compaction(self):
+        """Rotate the journal and write the snapshot on a background thread
+
+        Must be called while the subjects are not being mutated; only the
+        marshal copy happens here. Falls back to a synchronous compaction if
+        an earlier background one failed and left its rotated journal behind.
+        """
+        if self.compaction is not None:
+            if self.compaction.is_alive():
+                return
+            self.compaction = None
+        if self.compaction_error is not None or os.path.exists(self.rotated_file):
+            self.compaction_error = None
+            self.compact()
+            return
+        save = _snapshot_writer(self.data_file, self.subjects, self.use_cache)
+        rotated = os.path.exists(self.journal_file)
+        if rotated:
+            os.replace(self.journal_file, self.rotated_file)
+            _fsync_dir(self.journal_file)
+        self.journal_bytes = 0
+        self.tombstones = 0
+
+        def run():
+            try:
+                size = save()
+                if rotated:
+                    os.remove(self.rotated_file)
+                self.snapshot_bytes = size
+                self.bytes_written += size
+            except (OSError, ValueError) as e:
+                # The rotated journal stays; loads replay it and the next
+                # compaction starts over synchronously
+                self.compaction_error = e
+
+        self.compaction = threading.Thread(target=run, name="journal-compaction", daemon=True)
+        self.compaction.start()
+
+    def wait_compaction(self):
+        """Block until a background compaction (if any) has finished"""
+        if self.compaction is not None:
+            self.compaction.join()
+            self.compaction = None
+
+
+def topics_digest(topics: Dict[str, Any]) -> int:
+    """CRC32 of a subject's topic names and notes (its part of the searchable text)"""
+    parts = []
+    for topic_name, topic in topics.items():
+        parts.append(topic_name)
+        parts.append(topic.get("notes", ""))
+    return zlib.crc32("\x00".join(parts).encode("utf-8"))
+
+
+def _subjects_digest(subjects: Dict[str, Any], digests: Dict[str, int]) -> int:
+    """CRC32 over subject names, notes and each subject's ``topics_digest``"""
+    parts = []
+    for name, subject in subjects.items():
+        digest = digests.get(name)
+        parts.append(f"{name}\x00{subject.get('notes', '')}\x00{'' if digest is None else digest}")
+    return zlib.crc32("\x00".join(parts).encode("utf-8"))
+
+
+def _write_new_file(path: str, payload: bytes):
+    """Write and fsync a file under a name nothing references yet"""
+    with open(path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class ShardTopics(MutableMapping):
+    """A subject's topics dict, read from its shard (file or rows) on first access
+
+    ``len`` answers from the stored counts while the shard is not loaded. The
+    backend may drop a loaded dict again (``data = None``) to stay under its
+    memory cap; the next access reads the shard back.
+    """
+
+    __slots__ = ("store", "name", "count", "data")
+
+    def __init__(self, store: "LazyStorage", name: str, count: int, data: Dict[str, Any] = None):
+        self.store = store
+        self.name = name
+        self.count = count
+        self.data = data
+
+    def _topics(self) -> Dict[str, Any]:
+        if self.data is None:
+            self.store.load_shard(self)
+        else:
+            self.store.touch(self)
+        return self.data
+
+    def __getitem__(self, key):
+        return self._topics()[key]
+
+    def __setitem__(self, key, value):
+        self._topics()[key] = value
+
+    def __delitem__(self, key):
+        del self._topics()[key]
+
+    def __iter__(self):
+        return iter(self._topics())
+
+    def __len__(self) -> int:
+        return self.count if self.data is None else len(self.data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._topics()
+
+    def get(self, key, default=None):
+        return self._topics().get(key, default)
+
+    def pop(self, key, *default):
+        return self._topics().pop(key, *default)
+
+    def keys(self):
+        return self._topics().keys()
+
+    def items(self):
+        return self._topics().items()
+
+    def values(self):
+        return self._topics().values()
+
+    def __repr__(self) -> str:
+        state = "unloaded" if self.data is None else "loaded"
+        return f"<ShardTopics {self.name!r}: {len(self)} topics, {state}>"
+
+
+class LazyStorage(Storage):
+    """Base for backends whose subjects hold ``ShardTopics`` read on first access
+
+    Loaded shards are dropped again, least recently used first, while more
+    than ``max_resident_topics`` topics are in memory. Subjects for which
+    ``_pinned`` is true (unsaved changes) are kept.
+    """
+
+    lazy = True
+
+    def __init__(self, data_file: str, use_cache: bool = True, max_resident_topics: int = 200_000):
+        super().__init__(data_file, use_cache)
+        self.max_resident_topics = max_resident_topics
+        self.shards: Dict[str, ShardTopics] = {}
+        self.resident: "collections.OrderedDict[str, ShardTopics]" = collections.OrderedDict()
+        self.shards_loaded = 0
+        self.evictions = 0
+
+    def _read(self, name: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _pinned(self, name: str) -> bool:
+        return False
+
+    def load_shard(self, topics: ShardTopics):
+        """Read a subject's topics, then evict others if over the memory cap"""
+        topics.data = self._read(topics.name)
+        self.resident[topics.name] = topics
+        self._evict()
+
+    def touch(self, topics: ShardTopics):
+        if self.resident.get(topics.name) is topics:
+            self.resident.move_to_end(topics.name)
+
+    def resident_topics(self) -> int:
+        return sum(len(topics.data) for topics in self.resident.values())
+
+    def _evict(self):
+        resident = self.resident_topics()
+        # The most recently used shard stays, however large
+        for name in list(self.resident)[:-1]:
+            if resident <= self.max_resident_topics:
+                break
+            if self._pinned(name):
+                continue
+            topics = self.resident.pop(name)
+            resident -= len(topics.data)
+            topics.count = len(topics.data)
+            topics.data = None
+            self.evictions += 1
+
+
+class SQLiteStorage(LazyStorage):
+    """Normalized SQLite database with indexed topic queries
+
+    The database lives next to the JSON file (``study_data.json`` ->
+    ``study_data.db``) and is seeded from the JSON file the first time it is
+    created. Mutations are executed as they are recorded and committed on flush.
+    New databases use incremental auto-vacuum, so after ``vacuum_after``
+    deleted rows a flush hands the freed pages back to the file system.
+
+    Startup reads the subjects table and per-subject totals only; a subject's
+    topic rows are read the first time anything touches them. Each topic row
+    keeps the day it is next due and each subject row a digest of its topics
+    (updated on flush), so the revision queue, exam schedule, statistics and
+    search sidecar are answered without reading the topics.
+    """
+
+    indexed = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            exam_date TEXT NOT NULL DEFAULT '',
+            priority TEXT NOT NULL DEFAULT 'medium',
+            total_sessions INTEGER NOT NULL DEFAULT 0,
+            last_studied TEXT NOT NULL DEFAULT '',
+            notes TEXT NOT NULL DEFAULT '',
+            extra TEXT NOT NULL DEFAULT '{}',
+            digest INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY,
+            subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'not_started',
+            confidence INTEGER NOT NULL DEFAULT 0,
+            study_time INTEGER NOT NULL DEFAULT 0,
+            last_reviewed TEXT NOT NULL DEFAULT '',
+            notes TEXT NOT NULL DEFAULT '',
+            difficulty TEXT NOT NULL DEFAULT 'medium',
+            extra TEXT NOT NULL DEFAULT '{}',
+            due INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (subject_id, name)
+        );
+    """
+    # Created after older databases have gained the columns they index
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_topics_status ON topics(subject_id, status);
+        CREATE INDEX IF NOT EXISTS idx_topics_confidence ON topics(subject_id, confidence);
+        CREATE INDEX IF NOT EXISTS idx_topics_last_reviewed ON topics(last_reviewed);
+        CREATE INDEX IF NOT EXISTS idx_topics_due ON topics(subject_id, due, confidence);
+        CREATE INDEX IF NOT EXISTS idx_subjects_exam_date ON subjects(exam_date);
+    """
+
+    def __init__(self, data_file: str, use_cache: bool = True, vacuum_after: int = 1000,
+                 max_resident_topics: int = 200_000):
+        super().__init__(data_file, use_cache, max_resident_topics)
+        self.db_file = os.path.splitext(data_file)[0] + ".db"
+        self.conn = None
+        self.vacuum_after = vacuum_after
+        self.deleted = 0
+        self.counts: Dict[str, Dict[str, Any]] = {}
+        self.digests: Dict[str, int] = {}  # subject -> topics_digest as stored
+        self.changed: Set[str] = set()  # subjects whose stored digest is out of date
+
+    def load(self) -> Dict[str, Any]:
+        is_new = not os.path.exists(self.db_file)
+        # A write-behind thread may commit; StudyAssistant serializes the calls
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if is_new:
+            # Only takes effect before the first table is created
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(self.SCHEMA)
+        self._upgrade()
+        self.conn.executescript(self.INDEXES)
+        self.subjects, self.shards = {}, {}
+        self.resident = collections.OrderedDict()
+        if is_new:
+            for name, data in _load_json(self.data_file, self.use_cache).items():
+                self.record({"op": "add_subject", "subject": name, "data": data})
+        self.conn.commit()
+
+        self.counts = self._count_topics()
+        self.digests = dict(self.conn.execute("SELECT name, digest FROM subjects"))
+        for row in self.conn.execute(
+                "SELECT name, exam_date, priority, total_sessions, last_studied, notes, extra"
+                " FROM subjects ORDER BY id"):
+            topics = self.shards[row[0]] = ShardTopics(self, row[0], self.counts[row[0]]["topics"])
+            subject = {"topics": topics}
+            subject.update(zip(SUBJECT_FIELDS, row[1:6]))
+            subject.update(json.loads(row[6]))
+            self.subjects[row[0]] = subject
+        return self.subjects
+
+    def _upgrade(self):
+        """Add the due and digest columns to a database created before them"""
+        topic_columns = {row[1] for row in self.conn.execute("PRAGMA table_info(topics)")}
+        if "due" not in topic_columns:
+            self.conn.execute("ALTER TABLE topics ADD COLUMN due INTEGER NOT NULL DEFAULT 0")
+            rows = self.conn.execute("SELECT id, confidence, difficulty, last_reviewed FROM topics"
+                                     " WHERE last_reviewed != ''").fetchall()
+            self.conn.executemany("UPDATE topics SET due = ? WHERE id = ?", [
+                (due_ordinal({"confidence": confidence, "difficulty": difficulty, "last_reviewed": reviewed}), id_)
+                for id_, confidence, difficulty, reviewed in rows])
+        subject_columns = {row[1] for row in self.conn.execute("PRAGMA table_info(subjects)")}
+        if "digest" not in subject_columns:
+            self.conn.execute("ALTER TABLE subjects ADD COLUMN digest INTEGER")
+        for (name,) in self.conn.execute("SELECT name FROM subjects WHERE digest IS NULL").fetchall():
+            self.conn.execute("UPDATE subjects SET digest = ? WHERE name = ?",
+                              (topics_digest(self._read(name)), name))
+
+    def _count_topics(self) -> Dict[str, Dict[str, Any]]:
+        counts = {}
+        for name, topics, confidence_sum, rated_topics, study_time in self.conn.execute(
+                "SELECT s.name, COUNT(t.id), COALESCE(SUM(CASE WHEN t.confidence > 0 THEN t.confidence END), 0),"
+                " COUNT(CASE WHEN t.confidence > 0 THEN 1 END), COALESCE(SUM(t.study_time), 0)"
+                " FROM subjects s LEFT JOIN topics t ON t.subject_id = s.id GROUP BY s.id"):
+            status_counts = {status: n for status, n in self.status_counts(name).items() if n}
+            counts[name] = {"topics": topics, "status_counts": status_counts, "confidence_sum": confidence_sum,
+                            "rated_topics": rated_topics, "study_time": study_time, "histogram": [0] * 11}
+        for name, level, n in self.conn.execute(
+                "SELECT s.name, MIN(MAX(t.confidence, 0), 10) AS level, COUNT(*)"
+                " FROM topics t JOIN subjects s ON s.id = t.subject_id GROUP BY s.id, level"):
+            counts[name]["histogram"][level] = n
+        return counts
+
+    def read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.db_file):
+            return None
+        # Read-only still creates -wal/-shm files for a database in WAL mode;
+        # with no WAL left over (a clean close) it can be opened as immutable
+        mode = "mode=ro" if os.path.exists(self.db_file + "-wal") else "immutable=1"
+        conn = sqlite3.connect(f"{pathlib.Path(os.path.abspath(self.db_file)).as_uri()}?{mode}", uri=True)
+        try:
+            return self._read_rows(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read_rows(conn) -> Dict[str, Any]:
+        subjects = {}
+        subject_names = {}
+        for row in conn.execute(
+                "SELECT id, name, exam_date, priority, total_sessions, last_studied, notes, extra"
+                " FROM subjects ORDER BY id"):
+            subject = {"topics": {}}
+            subject.update(zip(SUBJECT_FIELDS, row[2:7]))
+            subject.update(json.loads(row[7]))
+            subjects[row[1]] = subject
+            subject_names[row[0]] = row[1]
+        for row in conn.execute(
+                "SELECT subject_id, name, status, confidence, study_time, last_reviewed,"
+                " notes, difficulty, extra FROM topics ORDER BY id"):
+            topic = dict(zip(TOPIC_FIELDS, row[2:8]))
+            topic.update(json.loads(row[8]))
+            subjects[subject_names[row[0]]]["topics"][row[1]] = topic
+        return subjects
+
+    def _read(self, name: str) -> Dict[str, Any]:
+        topics = {}
+        for row in self.conn.execute(
+                "SELECT t.name, t.status, t.confidence, t.study_time, t.last_reviewed, t.notes,"
+                " t.difficulty, t.extra FROM topics t JOIN subjects s ON s.id = t.subject_id"
+                " WHERE s.name = ? ORDER BY t.id", (name,)):
+            topic = dict(zip(TOPIC_FIELDS, row[1:7]))
+            topic.update(json.loads(row[7]))
+            topics[row[0]] = topic
+        self.shards_loaded += 1
+        return topics
+
+    def _pinned(self, name: str) -> bool:
+        return name in self.changed
+
+    def _subject_id(self, subject_name: str):
+        row = self.conn.execute("SELECT id FROM subjects WHERE name = ?", (subject_name,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _split(fields: Dict[str, Any], columns) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        known = {k: v for k, v in fields.items() if k in columns}
+        extra = {k: v for k, v in fields.items() if k not in columns and k != "topics"}
+        return known, extra
+
+    def _update(self, table: str, row_id: int, fields: Dict[str, Any], columns):
+        known, extra = self._split(fields, columns)
+        if known:
+            assignments = ", ".join(f"{k} = ?" for k in known)
+            self.conn.execute(f"UPDATE {table} SET {assignments} WHERE id = ?",
+                              (*known.values(), row_id))
+        if extra:
+            stored = self.conn.execute(f"SELECT extra FROM {table} WHERE id = ?", (row_id,)).fetchone()
+            merged = json.loads(stored[0])
+            merged.update(extra)
+            self.conn.execute(f"UPDATE {table} SET extra = ? WHERE id = ?",
+                              (json.dumps(merged, ensure_ascii=False), row_id))
+
+    def _insert_topic(self, subject_id: int, topic: str, data: Dict[str, Any]):
+        known, extra = self._split(data, TOPIC_FIELDS)
+        known["due"] = due_ordinal(data)
+        columns = ", ".join(("subject_id", "name", "extra") + tuple(known))
+        placeholders = ", ".join("?" * (3 + len(known)))
+        updates = ", ".join(f"{k} = excluded.{k}" for k in ("extra",) + tuple(known))
+        self.conn.execute(
+            f"INSERT INTO topics ({columns}) VALUES ({placeholders})"
+            f" ON CONFLICT (subject_id, name) DO UPDATE SET {updates}",
+            (subject_id, topic, json.dumps(extra, ensure_ascii=False), *known.values()))
+
+    def record(self, op: Dict[str, Any]):
+        kind, name = op["op"], op["subject"]
+        if kind in ("add_subject", "del_subject"):
+            old = self.shards.pop(name, None)
+            if old is not None and old.data is None:
+                # Listeners still walk the old topics after this returns
+                old.data = self._read(name)
+            self.resident.pop(name, None)
+            self.changed.discard(name)
+        if kind == "add_subject":
+            self.conn.execute("INSERT INTO subjects (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (name,))
+            subject_id = self._subject_id(name)
+            self.conn.execute("DELETE FROM topics WHERE subject_id = ?", (subject_id,))
+            self.conn.execute("UPDATE subjects SET extra = '{}' WHERE id = ?", (subject_id,))
+            self._update("subjects", subject_id, op["data"], SUBJECT_FIELDS)
+            topics = op["data"].get("topics", {})
+            for topic, data in topics.items():
+                self._insert_topic(subject_id, topic, data)
+            digest = self.digests[name] = topics_digest(topics)
+            self.conn.execute("UPDATE subjects SET digest = ? WHERE id = ?", (digest, subject_id))
+            subject = self.subjects.get(name)
+            if subject is not None:  # None while a new database is seeded
+                topics = self.shards[name] = ShardTopics(self, name, 0, dict(subject["topics"]))
+                subject["topics"] = topics
+                self.resident[name] = topics
+            return
+        if kind == "del_subject":
+            self.conn.execute("DELETE FROM subjects WHERE name = ?", (name,))
+            self.digests.pop(name, None)
+            self.deleted += 1
+            return
+
+        subject_id = self._subject_id(name)
+        if subject_id is None:
+            return
+        if kind == "set_subject":
+            self._update("subjects", subject_id, op["fields"], SUBJECT_FIELDS)
+        elif kind == "add_topic":
+            self._insert_topic(subject_id, op["topic"], op["data"])
+            self.changed.add(name)
+        elif kind == "set_topic":
+            row = self.conn.execute("SELECT id FROM topics WHERE subject_id = ? AND name = ?",
+                                    (subject_id, op["topic"])).fetchone()
+            if row:
+                self._update("topics", row[0], op["fields"], TOPIC_FIELDS)
+                if not set(SCHEDULE_FIELDS).isdisjoint(op["fields"]):
+                    confidence, difficulty, reviewed = self.conn.execute(
+                        "SELECT confidence, difficulty, last_reviewed FROM topics WHERE id = ?", (row[0],)).fetchone()
+                    due = due_ordinal({"confidence": confidence, "difficulty": difficulty, "last_reviewed": reviewed})
+                    self.conn.execute("UPDATE topics SET due = ? WHERE id = ?", (due, row[0]))
+                if "notes" in op["fields"]:
+                    self.changed.add(name)
+        elif kind == "del_topic":
+            self.conn.execute("DELETE FROM topics WHERE subject_id = ? AND name = ?",
+                              (subject_id, op["topic"]))
+            self.deleted += 1
+            self.changed.add(name)
+        else:
+            raise ValueError(f"Unknown journal operation: {kind}")
+
+    def flush(self):
+        for name in self.changed:
+            if name in self.subjects:
+                digest = self.digests[name] = topics_digest(self.subjects[name]["topics"])
+                self.conn.execute("UPDATE subjects SET digest = ? WHERE name = ?", (digest, name))
+        self.changed = set()
+        # Committed pages land in the WAL; its growth approximates the bytes
+        # written (it restarts from the beginning after a checkpoint)
+        wal_file = self.db_file + "-wal"
+        before = os.path.getsize(wal_file) if os.path.exists(wal_file) else 0
+        self.conn.commit()
+        if self.deleted >= self.vacuum_after:
+            self.conn.execute("PRAGMA incremental_vacuum")
+            self.conn.commit()
+            self.deleted = 0
+        after = os.path.getsize(wal_file) if os.path.exists(wal_file) else 0
+        self.bytes_written += after - before if after >= before else after
+        self._evict()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def subject_counts(self) -> Dict[str, Dict[str, Any]]:
+        return self.counts
+
+    def content_digest(self) -> int:
+        """CRC32 over subject names, notes and the stored topic digests (current after a flush)"""
+        return _subjects_digest(self.subjects, self.digests)
+
+    def revision_topics(self, subject_name: str, today: int = None, limit: int = None) -> List[str]:
+        if today is None:
+            today = datetime.date.today().toordinal()
+        # idx_topics_due yields the rows in this order, so only the first ``limit`` are read
+        rows = self.conn.execute(
+            "SELECT t.name FROM topics t JOIN subjects s ON s.id = t.subject_id"
+            " WHERE s.name = ? AND t.due <= ? ORDER BY t.due, t.confidence, t.id LIMIT ?",
+            (subject_name, today, -1 if limit is None else limit))
+        topics = [row[0] for row in rows]
+        self.topics_scanned += len(topics)
+        return topics
+
+    def incomplete_topics(self, subject_name: str) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT t.name FROM topics t JOIN subjects s ON s.id = t.subject_id"
+            " WHERE s.name = ? AND t.status IN (?, ?) ORDER BY t.id",
+            (subject_name, *OPEN_STATUSES))
+        topics = [row[0] for row in rows]
+        self.topics_scanned += len(topics)
+        return topics
+
+    def find_topics(self, subject_name: str = None, status: str = None, min_confidence: int = None,
+                    reviewed_before: str = None) -> List[Tuple[str, str]]:
+        conditions, params = [], []
+        for clause, value in (("s.name = ?", subject_name), ("t.status = ?", status),
+                              ("t.confidence >= ?", min_confidence), ("t.last_reviewed < ?", reviewed_before)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        if subject_name is not None and subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        rows = self.conn.execute(
+            "SELECT s.name, t.name FROM topics t JOIN subjects s ON s.id = t.subject_id"
+            f"{where} ORDER BY s.id, t.id", params).fetchall()
+        self.topics_scanned += len(rows)
+        return rows
+
+    def status_counts(self, subject_name: str = None) -> Dict[str, int]:
+        counts = {"not_started": 0, "in_progress": 0, "completed": 0}
+        if subject_name is None:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM topics GROUP BY status")
+        else:
+            rows = self.conn.execute(
+                "SELECT t.status, COUNT(*) FROM topics t JOIN subjects s ON s.id = t.subject_id"
+                " WHERE s.name = ? GROUP BY t.status", (subject_name,))
+        counts.update(rows)
+        return counts
+
+
+class ShardedStorage(LazyStorage):
+    """One JSON file per subject plus a small manifest, with topics loaded lazily
+
+    ``study_data.shards/manifest.json`` lists the subjects in order with their
+    fields, topic totals (``Aggregate.as_dict`` form) and a digest of their
+    topics, which is all the menus, statistics, exam schedule and search
+    sidecar need, so startup reads just the manifest. A subject's topics are
+    read from its shard the first time anything touches them. Loaded shards
+    without unsaved changes are dropped again, least recently used first,
+    while more than ``max_resident_topics`` topics are in memory.
+
+    A flush writes each changed subject's shard under a new name, then
+    atomically replaces the manifest, then deletes the shards it superseded,
+    so a crash at any point leaves a manifest whose files are intact. Files
+    the manifest does not list are removed on load. The first load fills the
+    directory from the single-file data (snapshot plus journal).
+    """
+
+    VERSION = 1
+
+    def __init__(self, data_file: str, use_cache: bool = True, max_resident_topics: int = 200_000):
+        super().__init__(data_file, use_cache, max_resident_topics)
+        self.directory = os.path.splitext(data_file)[0] + ".shards"
+        self.manifest_file = os.path.join(self.directory, "manifest.json")
+        self.generation = 0
+        self.entries: Dict[str, Dict[str, Any]] = {}  # name -> {"file", "counts", "digest"} as saved
+        self.dirty: Set[str] = set()
+        self.flushing: Set[str] = set()  # captured by prepare_flush, pinned until written
+        self.manifest_dirty = False
+        self.obsolete: List[str] = []  # files to delete once a manifest no longer lists them
+
+    def load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_file):
+            self._import_single_file()
+        manifest = self._read_manifest()
+        self.generation = manifest["generation"]
+        self.subjects, self.entries, self.shards = {}, {}, {}
+        self.resident = collections.OrderedDict()
+        for name, entry in manifest["subjects"].items():
+            if "histogram" not in entry["counts"]:
+                # Saved before the totals included study time and the confidence histogram
+                aggregate = Aggregate()
+                for topic in self._read(name, entry["file"]).values():
+                    aggregate.add_topic(topic)
+                entry["counts"] = aggregate.as_dict()
+                del entry["counts"]["sessions"]
+                self.manifest_dirty = True
+            topics = self.shards[name] = ShardTopics(self, name, entry["counts"]["topics"])
+            self.subjects[name] = dict(entry["fields"], topics=topics)
+            self.entries[name] = {"file": entry["file"], "counts": entry["counts"], "digest": entry["digest"]}
+        listed = {entry["file"] for entry in self.entries.values()}
+        for file_name in os.listdir(self.directory):
+            if file_name != "manifest.json" and file_name not in listed:
+                # Written by a flush that never reached its manifest, or superseded by one
+                os.remove(os.path.join(self.directory, file_name))
+        return self.subjects
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        with open(self.manifest_file, "rb") as f:
+            payload = f.read()
+        self.bytes_read += len(payload)
+        manifest = json.loads(payload)
+        if manifest.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported shard manifest version: {manifest.get('version')}")
+        return manifest
+
+    def read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_file):
+            return None
+        subjects = {}
+        for name, entry in self._read_manifest()["subjects"].items():
+            with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                subjects[name] = dict(entry["fields"], topics=json.loads(f.read()))
+        return subjects
+
+    def _import_single_file(self):
+        source = JournalStorage(self.data_file, self.use_cache)
+        subjects = source.load()
+        self.bytes_read += source.bytes_read
+        os.makedirs(self.directory, exist_ok=True)
+        self.subjects = {}
+        for name, data in subjects.items():
+            self.subjects[name] = data
+            self.record({"op": "add_subject", "subject": name, "data": data})
+        self.manifest_dirty = True
+        self.flush()
+
+    def _read(self, name: str, file_name: str = None) -> Dict[str, Any]:
+        with open(os.path.join(self.directory, file_name or self.entries[name]["file"]), "rb") as f:
+            payload = f.read()
+        self.bytes_read += len(payload)
+        self.shards_loaded += 1
+        return json.loads(payload)
+
+    def _pinned(self, name: str) -> bool:
+        return name in self.dirty or name in self.flushing
+
+    def record(self, op: Dict[str, Any]):
+        kind, name = op["op"], op["subject"]
+        if kind in ("add_subject", "del_subject"):
+            old = self.shards.pop(name, None)
+            if old is not None and old.data is None:
+                # Listeners still walk the old topics after this returns
+                old.data = self._read(name)
+            self.resident.pop(name, None)
+            self.dirty.discard(name)
+            if name in self.entries:
+                self.obsolete.append(self.entries.pop(name)["file"])
+            if kind == "add_subject":
+                subject = self.subjects[name]
+                topics = self.shards[name] = ShardTopics(self, name, 0, dict(subject["topics"]))
+                subject["topics"] = topics
+                self.resident[name] = topics
+                self.dirty.add(name)
+        elif kind != "set_subject" and name in self.shards:
+            self.dirty.add(name)
+        self.manifest_dirty = True
+
+    def flush(self):
+        write = self.prepare_flush()
+        if write is not None:
+            write()
+        self._evict()
+
+    def prepare_flush(self):
+        if not self.manifest_dirty:
+            return None
+        self.generation += 1
+        generation = self.generation
+        fields = marshal.dumps({name: {key: value for key, value in subject.items() if key != "topics"}
+                                for name, subject in self.subjects.items()})
+        shards = [(name, marshal.dumps(self.shards[name].data)) for name in self.dirty]
+        entries = dict(self.entries)
+        obsolete = self.obsolete
+        self.flushing |= self.dirty
+        self.dirty = set()
+        self.obsolete = []
+        self.manifest_dirty = False
+
+        def write():
+            try:
+                written = {}
+                for name, body in shards:
+                    topics = marshal.loads(body)
+                    aggregate = Aggregate()
+                    for topic in topics.values():
+                        aggregate.add_topic(topic)
+                    counts = aggregate.as_dict()
+                    del counts["sessions"]
+                    slug = re.sub(r"[^\w-]+", "_", name.lower())[:40]
+                    file_name = f"{slug}-{zlib.crc32(name.encode('utf-8')):08x}.{generation}.json"
+                    payload = json.dumps(topics, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    _write_new_file(os.path.join(self.directory, file_name), payload)
+                    self.bytes_written += len(payload)
+                    written[name] = {"file": file_name, "counts": counts, "digest": topics_digest(topics)}
+                subjects = {}
+                for name, subject_fields in marshal.loads(fields).items():
+                    entry = written.get(name) or entries.get(name)
+                    if entry is not None:
+                        subjects[name] = dict(entry, fields=subject_fields)
+                payload = json.dumps({"version": self.VERSION, "generation": generation, "subjects": subjects},
+                                     ensure_ascii=False).encode("utf-8")
+                replace_file(self.manifest_file, payload)
+                self.bytes_written += len(payload)
+            except BaseException:
+                self.dirty |= {name for name, _ in shards if name in self.shards}
+                self.obsolete = obsolete + self.obsolete
+                self.manifest_dirty = True
+                raise
+            finally:
+                self.flushing -= {name for name, _ in shards}
+            for name, entry in written.items():
+                if name in self.entries:
+                    obsolete.append(self.entries[name]["file"])
+                if name in self.shards:
+                    self.entries[name] = entry
+            for file_name in obsolete:
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except FileNotFoundError:
+                    pass
+        return write
+
+    def subject_counts(self) -> Dict[str, Dict[str, Any]]:
+        return {name: entry["counts"] for name, entry in self.entries.items()}
+
+    def content_digest(self) -> int:
+        """CRC32 over subject names, notes and the saved topic digests (current after a flush)"""
+        return _subjects_digest(self.subjects, {name: entry["digest"] for name, entry in self.entries.items()})
+
+
+BACKENDS = {
+    "json": JSONStorage,
+    "journal": JournalStorage,
+    "sqlite": SQLiteStorage,
+    "sharded": ShardedStorage,
+}
+
+
+def open_storage(data_file: str, backend: str = "journal", use_cache: bool = True, **options) -> Storage:
+    """Create the storage backend registered under the given name
+
+    ``options`` are passed on to the backend (e.g. ``max_resident_topics``).
+    """
+    try:
+        factory = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {backend}") from None
+    return factory(data_file, use_cache, **options)
+
+
+def read_subjects(data_file: str, backend: str = "journal") -> Dict[str, Any]:
+    """A data file's subjects as the backend stores them, without writing anything
+
+    Unlike ``open_storage(...).load()`` this never creates, migrates, repairs
+    or compacts files. If the backend's own files do not exist yet, the
+    single-file data (snapshot plus journal) is read instead.
+    """
+    subjects = open_storage(data_file, backend, use_cache=False).read()
+    if subjects is None:
+        subjects = JournalStorage(data_file, use_cache=False).read()
+    return subjects if subjects is not None else {}
+
+
+def migrate_storage(data_file: str, source: str, target: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Copy everything the ``source`` backend holds into the ``target`` backend
+
+    The target's previous contents are replaced; the source is left as it
+    is. The target is re-opened afterwards to check that every subject and
+    topic arrived. Returns the counts copied.
+    """
+    if source == target:
+        raise ValueError("Source and target backends are the same")
+    start = time.perf_counter()
+    reader = open_storage(data_file, source, use_cache)
+    subjects = reader.load()
+    expected = {name: len(subject["topics"]) for name, subject in subjects.items()}
+    copies = [(name, dict(subject, topics=dict(subject["topics"]))) for name, subject in subjects.items()]
+    reader.close()
+    subjects = None
+
+    writer = open_storage(data_file, target, use_cache)
+    existing = writer.load()
+    ops = [{"op": "del_subject", "subject": name} for name in existing if name not in expected]
+    ops += [{"op": "add_subject", "subject": name, "data": data} for name, data in copies]
+    for op in ops:
+        apply_op(existing, op)
+        writer.record(op)
+    writer.close()
+
+    check = open_storage(data_file, target, use_cache)
+    copied = {name: len(subject["topics"]) for name, subject in check.load().items()}
+    check.close()
+    if copied != expected:
+        raise RuntimeError(f"Migration to {target} storage lost data: expected {expected}, found {copied}")
+    return {"source": source, "target": target, "subjects": len(copied), "topics": sum(copied.values()),
+            "bytes_written": writer.bytes_written, "seconds": time.perf_counter() - start}
@@ -1,585 +1,725 @@
+import argparse
+import contextlib
 import json
-import osS
+import os
 import datetime
 import random
-from typing import Dict, List, Any 
-      
-class StudyAssistant: 
-    def __init__(self):  
-        self.data_file = "study_data.json"   
-        self.subjects = self.load_data()  
-         
-    def load_data(self) -> Dict[str, Any]: 
-        """Load study data from JSON file"""
-        if os.path.exists(self.data_file): 
-            try: 
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}
-        return {}
-    
+import sys
+import threading
+from typing import Dict, List, Tuple, Any
+
+from columnar import ColumnarTopics
+from dedup import DuplicateFinder, split_compound
+from history import CONFIDENCE, QUIZ, REVIEW, SESSION, StudyHistory, history_path
+from importer import BulkImporter
+from metrics import MENU_ACTIONS, OPERATIONS, Instrumentation
+from planner import StudyPlanner, exam_schedule
+from progress import ProgressView
+from queries import TOPICS, QueryCache
+from quiz import QuizSampler
+from replay import TraceRecorder, replay_trace
+from scheduler import RevisionScheduler
+from search import SearchIndex, index_path
+from stats import STATUSES, StatsEngine
+from storage import BACKENDS, apply_op, migrate_storage, open_storage
+from sync import EditLog, edit_log_path, replica_path, sync_pair
+from terminal import TerminalUI
+from writer import WriteBehind
+
+STUDY_TIPS = (
+    "🧠 Use the Pomodoro Technique: 25 minutes focused study, 5-minute break",
+    "📝 Create mind maps to visualize connections between topics",
+    "🔄 Review topics multiple times with increasing intervals (spaced repetition)",
+    "📚 Teach concepts to someone else or explain them out loud",
+    "🎯 Focus on understanding concepts rather than memorizing facts",
+    "💡 Use mnemonics and memory techniques for difficult information",
+    "📱 Minimize distractions: put phone away during study sessions",
+    "🏃 Take regular breaks and include physical activity",
+    "🍎 Maintain good nutrition and stay hydrated",
+    "😴 Get adequate sleep - your brain consolidates memory during sleep",
+    "📊 Track your progress to stay motivated",
+    "🤝 Form study groups for collaborative learning",
+    "❓ Ask questions and seek clarification on difficult topics",
+    "📝 Make your own notes in your own words",
+    "🔍 Use active recall: test yourself without looking at notes",
+)
+
+class StudyAssistant:
+    def __init__(self, data_file: str = "study_data.json", backend: str = "journal",
+                 columnar: bool = False, use_cache: bool = True, quiz_length: int = 5,
+                 metrics_file: str = None, metrics_interval: float = 60.0, profile_action: str = None,
+                 daily_minutes: int = 120, write_behind: bool = False, flush_interval: float = 1.0,
+                 flush_bytes: int = 256 * 1024, query_cache_size: int = 4096,
+                 storage_options: Dict[str, Any] = None):
+        self.data_file = data_file
+        self.backend = backend
+        self.quiz_length = quiz_length
+        # A pinned date (for recorded and replayed sessions); None follows the clock
+        self.today: datetime.date = None
+        self.store = open_storage(data_file, backend, use_cache, **(storage_options or {}))
+        self.instrumentation = None
+        if metrics_file or profile_action:
+            self.instrumentation = Instrumentation(self, metrics_file, metrics_interval, profile_action)
+        self.subjects = self.load_data()
+        self.stats = StatsEngine()
+        # A lazily loading backend supplies what startup needs without reading the topics
+        self.stats.rebuild(self.subjects, self.store.subject_counts())
+        self.scheduler = RevisionScheduler()
+        self.scheduler.rebuild(self.subjects, lazy=self.store.lazy)
+        self.quiz = QuizSampler()
+        self.search = SearchIndex.load(index_path(data_file), self.subjects, self.store.content_digest())
+        self.planner = StudyPlanner(daily_minutes)
+        # Events follow the pinned date too, so replayed history reports match
+        self.history = StudyHistory(history_path(data_file), clock=lambda: self._now().timestamp())
+        self.progress = ProgressView()
+        self.queries = QueryCache(query_cache_size)
+        self.queries.on_rollover(self.progress.headers.clear)
+        self.duplicates = DuplicateFinder()
+        self.listeners = [self.stats, self.scheduler, self.quiz, self.search, self.planner, self.progress,
+                          self.queries, self.duplicates]
+        # Edit times are only logged for data that takes part in sync
+        self.edits = None
+        if os.path.exists(replica_path(data_file)):
+            self.edits = EditLog(edit_log_path(data_file))
+            self.listeners.append(self.edits)
+        self.columns = None
+        if columnar:
+            self.columns = ColumnarTopics(self.subjects)
+            self.listeners.append(self.columns)
+        self.lock = threading.Lock()
+        self.writer = None
+        if write_behind:
+            self.writer = WriteBehind(self.store, self.lock, flush_interval,
+                                      max_pending_bytes=flush_bytes)
+
+    def load_data(self) -> Dict[str, Any]:
+        """Load study data through the configured storage backend"""
+        return self.store.load()
+
     def save_data(self):
-        """Save study data to JSON file"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.subjects, f, indent=2, ensure_ascii=False)
-    
-    def clear_screen(self):
-        """Clear the terminal screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
-    
-    def display_menu(self):
-        """Display main menu"""
-        print("\n" + "="*50)
-        print("🎓 AI STUDY ASSISTANT - EXAM REVISION HELPER")
-        print("="*50)
-        print("1. 📚 Add/Edit Subject")
-        print("2. 📝 Add Topics to Subject")
-        print("3. 📊 View Study Progress")
-        print("4. 🎯 Start Revision Session")
-        print("5. ❓ Quiz Mode")
-        print("6. 📅 Set Study Schedule")
-        print("7. 💡 Get Study Tips")
-        print("8. 📈 View Statistics")
-        print("9. 🗑️  Delete Subject/Topic")
-        print("10. 🚪 Exit")
-        print("="*50)
-    
-    def add_subject(self):
-        """Add or edit a subject"""
-        print("\n📚 SUBJECT MANAGEMENT")
-        print("-" * 30) 
-        
-        if self.subjects:
-            print("Existing subjects:")
-            for i, subject in enumerate(self.subjects.keys(), 1):
-                print(f"{i}. {subject}")
-            print()
-        
-        subject_name = input("Enter subject name: ").strip()
-        if not subject_name:
-            print("❌ Subject name cannot be empty!")
-            return
-        
-        if subject_name not in self.subjects:
-            self.subjects[subject_name] = {
-                "topics": {},
-                "exam_date": "",
-                "priority": "medium",
-                "total_sessions": 0,
-                "last_studied": "",
-                "notes": ""
-            }
-            print(f"✅ Subject '{subject_name}' added successfully!")
+        """Persist changes made since the last save (in the background with write-behind)"""
+        self.history.flush()
+        if self.edits is not None:
+            self.edits.flush()
+        if self.writer is not None:
+            self.writer.mark_dirty()
+        else:
+            self.store.flush()
+
+    def spill_data(self):
+        """Write recorded changes out without syncing them, so a long import need not hold them"""
+        io_lock = self.writer.io_lock if self.writer is not None else contextlib.nullcontext()
+        with io_lock, self.lock:
+            self.store.spill()
+
+    def close(self):
+        """Flush pending changes, save the search index and release the storage backend"""
+        if self.writer is not None:
+            self.writer.close()
         else:
-            print(f"📝 Editing existing subject '{subject_name}'")
-        
-        # Get additional details
-        exam_date = input("Enter exam date (YYYY-MM-DD) [optional]: ").strip()
+            self.store.close()
+        self.history.close()
+        if self.edits is not None:
+            self.edits.flush()
+        self.search.save(index_path(self.data_file), self.subjects, self.store.content_digest())
+
+    def _today(self) -> datetime.date:
+        return self.today or datetime.date.today()
+
+    def _now(self) -> datetime.datetime:
+        now = datetime.datetime.now()
+        return now if self.today is None else datetime.datetime.combine(self.today, now.time())
+
+    def summary(self) -> Dict[str, Any]:
+        """Progress and statistics figures from the columnar engine or the aggregates (memoized)"""
+        return self.queries.get("summary", None, self._summary,
+                                depends=(TOPICS, "exam_date", "total_sessions"), daily=True)
+
+    def _summary(self) -> Dict[str, Any]:
+        if self.columns is not None:
+            return self.columns.summary(self._now())
+        return self.stats.totals({name: self.subject_figures(name) for name in self.subjects})
+
+    def subject_figures(self, subject_name: str) -> Dict[str, Any]:
+        """One subject's progress figures, recomputed only when its topics or exam date change"""
+        return self.queries.get("figures", subject_name,
+                                lambda: self.stats.subject_figures(subject_name, self.subjects[subject_name],
+                                                                   self._now()),
+                                depends=(TOPICS, "exam_date"), daily=True)
+
+    def _record(self, op: Dict[str, Any]):
+        """Apply a mutation, hand it to the storage backend and notify listeners"""
+        with self.lock:
+            old = apply_op(self.subjects, op)
+            self.store.record(op)
+            if self.writer is not None:
+                self.writer.note(op)
+        for listener in self.listeners:
+            listener.on_change(self.subjects, op, old)
+
+    def create_subject(self, subject_name: str):
+        """Add a new, empty subject"""
+        self._record({"op": "add_subject", "subject": subject_name, "data": {
+            "topics": {},
+            "exam_date": "",
+            "priority": "medium",
+            "total_sessions": 0,
+            "last_studied": "",
+            "notes": ""
+        }})
+
+    def update_subject(self, subject_name: str, **fields):
+        """Change top-level fields of a subject"""
+        self._record({"op": "set_subject", "subject": subject_name, "fields": fields})
+
+    def remove_subject(self, subject_name: str):
+        """Delete a subject and all of its topics"""
+        self._record({"op": "del_subject", "subject": subject_name})
+
+    def create_topic(self, subject_name: str, topic: str, **fields):
+        """Add a new topic to a subject, optionally overriding its initial fields"""
+        data = {
+            "status": "not_started",  # not_started, in_progress, completed
+            "confidence": 0,  # 0-10 scale
+            "study_time": 0,  # minutes
+            "last_reviewed": "",
+            "notes": "",
+            "difficulty": "medium"
+        }
+        data.update(fields)
+        self._record({"op": "add_topic", "subject": subject_name, "topic": topic, "data": data})
+
+    def update_topic(self, subject_name: str, topic: str, **fields):
+        """Change fields of a single topic"""
+        self._record({"op": "set_topic", "subject": subject_name, "topic": topic, "fields": fields})
+
+    def remove_topic(self, subject_name: str, topic: str):
+        """Delete a single topic"""
+        self._record({"op": "del_topic", "subject": subject_name, "topic": topic})
+
+    # Non-interactive operations behind the menu actions. They take plain
+    # arguments, raise KeyError for unknown subjects/topics and ValueError for
+    # invalid input, and are shared by the terminal menu and the HTTP service.
+
+    def save_subject(self, subject_name: str, exam_date: str = "", priority: str = "",
+                     notes: str = "") -> bool:
+        """Create or edit a subject, returning True if it was newly created"""
+        subject_name = subject_name.strip()
+        if not subject_name:
+            raise ValueError("Subject name cannot be empty")
+        fields = {}
         if exam_date:
-            try: 
-                datetime.datetime.strptime(exam_date, "%Y-%m-%d")
-                self.subjects[subject_name]["exam_date"] = exam_date
-            except ValueError:
-                print("⚠️ Invalid date format, skipping...")
-        
-        priority = input("Enter priority (high/medium/low) [medium]: ").strip().lower()
-        if priority in ["high", "medium", "low"]:
-            self.subjects[subject_name]["priority"] = priority
-        
-        notes = input("Enter general notes [optional]: ").strip()
+            datetime.datetime.strptime(exam_date, "%Y-%m-%d")
+            fields["exam_date"] = exam_date
+        if priority:
+            if priority not in ("high", "medium", "low"):
+                raise ValueError("Priority must be high, medium or low")
+            fields["priority"] = priority
         if notes:
-            self.subjects[subject_name]["notes"] = notes
-        
+            fields["notes"] = notes
+
+        created = subject_name not in self.subjects
+        if created:
+            self.create_subject(subject_name)
+        if fields:
+            self.update_subject(subject_name, **fields)
         self.save_data()
-        print("💾 Data saved successfully!")
-    
-    def add_topics(self):
-        """Add topics to a subject"""
-        if not self.subjects:
-            print("❌ No subjects found! Please add a subject first.")
-            return
-        
-        print("\n📝 ADD TOPICS")
-        print("-" * 20)
-        
-        # Display subjects
-        subjects_list = list(self.subjects.keys())
-        for i, subject in enumerate(subjects_list, 1):
-            print(f"{i}. {subject}")
-        
-        try:
-            choice = int(input("\nSelect subject number: ")) - 1
-            if 0 <= choice < len(subjects_list):
-                subject_name = subjects_list[choice]
-            else:
-                print("❌ Invalid selection!")
-                return
-        except ValueError:
-            print("❌ Please enter a valid number!")
-            return
-        
-        print(f"\nAdding topics to: {subject_name}")
-        print("Enter topics one by one (press Enter with empty line to finish):")
-        
-        while True:
-            topic = input("Topic: ").strip()
+        return created
+
+    def add_topic_list(self, subject_name: str, topics: List[str]) -> Dict[str, List[str]]:
+        """Add several topics to a subject, reporting which were added and which existed"""
+        existing_topics = self.subjects[subject_name]["topics"]
+        added, existing = [], []
+        for topic in topics:
+            topic = topic.strip()
             if not topic:
-                break
-            
-            if topic not in self.subjects[subject_name]["topics"]:
-                self.subjects[subject_name]["topics"][topic] = {
-                    "status": "not_started",  # not_started, in_progress, completed
-                    "confidence": 0,  # 0-10 scale
-                    "study_time": 0,  # minutes
-                    "last_reviewed": "",
-                    "notes": "",
-                    "difficulty": "medium"
-                }
-                print(f"✅ Added: {topic}")
+                continue
+            if topic in existing_topics:
+                existing.append(topic)
             else:
-                print(f"⚠️ Topic '{topic}' already exists!")
-        
+                self.create_topic(subject_name, topic)
+                added.append(topic)
+        self.save_data()
+        return {"added": added, "existing": existing}
+
+    def progress_report(self) -> Dict[str, Any]:
+        """Per-subject progress figures plus each subject's priority and exam date"""
+        report = {}
+        for subject_name, figures in self.summary()["per_subject"].items():
+            subject = self.subjects[subject_name]
+            report[subject_name] = dict(figures, priority=subject["priority"],
+                                        exam_date=subject["exam_date"])
+        return report
+
+    def revision_queue(self, subject_name: str, limit: int = None) -> List[str]:
+        """Up to ``limit`` topics of a subject due for spaced-repetition review, soonest first"""
+        if subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        today = self._today().toordinal()
+        # Only the first ``limit`` due topics are taken off the heap (or index), so
+        # each limit is a separate entry
+        queue = self.queries.get("revision_queue", subject_name,
+                                 lambda: self._due_topics(subject_name, today, limit), limit, daily=True)
+        return list(queue)
+
+    def _due_topics(self, subject_name: str, today: int, limit: int = None) -> List[str]:
+        if self.store.indexed:
+            # Read off the database's due-day index, without loading the topics
+            return self.store.revision_topics(subject_name, today, limit)
+        self.scheduler.ensure(self.subjects, subject_name)
+        return [topic for _, topic in self.scheduler.next_due(limit, subject_name, today)]
+
+    def review_topic(self, subject_name: str, topic: str, action: str,
+                     confidence: int = None, notes: str = None, duration: float = None):
+        """Apply one revision action: "complete", "confidence" or "notes"
+
+        Completions and confidence updates also go into the study history,
+        with ``duration`` seconds spent on the topic if known.
+        """
+        if topic not in self.subjects[subject_name]["topics"]:
+            raise KeyError(topic)
+        today = self._today().isoformat()
+        if action == "complete":
+            self.update_topic(subject_name, topic, status="completed", last_reviewed=today)
+            self.history.record(subject_name, topic, REVIEW, duration=duration)
+        elif action == "confidence":
+            if type(confidence) is not int or not 1 <= confidence <= 10:
+                raise ValueError("Confidence must be a number between 1-10")
+            self.update_topic(subject_name, topic, confidence=confidence,
+                              status="completed" if confidence >= 8 else "in_progress",
+                              last_reviewed=today)
+            self.history.record(subject_name, topic, CONFIDENCE, confidence, duration)
+        elif action == "notes":
+            self.update_topic(subject_name, topic, notes=notes or "")
+        else:
+            raise ValueError(f"Unknown revision action: {action}")
+
+    def log_study_session(self, subject_name: str, duration: float = None):
+        """Count a study session for a subject and stamp it as studied today"""
+        self.update_subject(subject_name,
+                            last_studied=self._today().isoformat(),
+                            total_sessions=self.subjects[subject_name]["total_sessions"] + 1)
+        self.history.record(subject_name, "", SESSION, duration=duration)
+
+    def quiz_topics(self, subject_name: str, count: int = None) -> List[str]:
+        """Pick up to ``count`` distinct topics of a subject, favouring weak and stale ones"""
+        return [topic for _, topic in self.quiz_questions(subject_name, count)]
+
+    def quiz_questions(self, subject_name: str = None, count: int = None) -> List[Tuple[str, str]]:
+        """Pick up to ``count`` distinct (subject, topic) pairs from one subject or (None) all of them"""
+        if subject_name is not None and subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        return self.quiz.sample(self.subjects, subject_name, count or self.quiz_length,
+                                self._today().toordinal())
+
+    def quiz_score(self, ratings: List[int], questions: int = None) -> Dict[str, Any]:
+        """Average rating of a finished quiz and its verdict ("excellent", "good" or "practice")
+
+        Questions left unrated (``questions`` beyond ``len(ratings)``) count as 0.
+        """
+        questions = max(questions or 0, len(ratings))
+        average = sum(ratings) / questions if questions else 0.0
+        verdict = "excellent" if average >= 8 else "good" if average >= 6 else "practice"
+        return {"questions": questions, "rated": len(ratings), "average": average, "verdict": verdict}
+
+    def check_quiz_rating(self, subject_name: str, topic: str, rating: int):
+        """Raise KeyError or ValueError if ``record_quiz_rating`` would reject this answer"""
+        if topic not in self.subjects[subject_name]["topics"]:
+            raise KeyError(topic)
+        # bool is an int subclass, but True is not a rating
+        if type(rating) is not int or not 1 <= rating <= 10:
+            raise ValueError("Rating must be a number between 1-10")
+
+    def record_quiz_rating(self, subject_name: str, topic: str, rating: int, duration: float = None):
+        """Store a 1-10 self-assessment from a quiz question (and log it in the history)"""
+        self.check_quiz_rating(subject_name, topic, rating)
+        fields = {"confidence": rating,
+                  "last_reviewed": self._today().isoformat()}
+        if rating >= 8:
+            fields["status"] = "completed"
+        elif rating >= 5:
+            fields["status"] = "in_progress"
+        self.update_topic(subject_name, topic, **fields)
+        self.history.record(subject_name, topic, QUIZ, rating, duration)
+
+    def schedule_report(self) -> List[Dict[str, Any]]:
+        """Subjects with exam dates, soonest first, with the study pace they need"""
+        return self.queries.get("schedule", None,
+                                lambda: exam_schedule(self.subjects, self.incomplete_count, self._now()),
+                                depends=(TOPICS, "exam_date", "priority"), daily=True)
+
+    def incomplete_count(self, subject_name: str) -> int:
+        """Number of topics of a subject not completed yet"""
+        if self.store.indexed:
+            return len(self.store.incomplete_topics(subject_name))
+        aggregate = self.stats.subject(subject_name)
+        return aggregate.topics - aggregate.completed
+
+    def find_topics(self, subject_name: str = None, status: str = None, min_confidence: int = None,
+                    stale_days: int = None) -> List[Tuple[str, str]]:
+        """(subject, topic) pairs matching every given criterion
+
+        With no criteria this is every topic of the subject (or of all
+        subjects). ``stale_days`` matches topics not reviewed in that many days.
+        """
+        if subject_name is not None and subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Status must be one of: {', '.join(STATUSES)}")
+        if min_confidence is not None and (not isinstance(min_confidence, int) or not 0 <= min_confidence <= 10):
+            raise ValueError("Confidence must be a number between 0-10")
+        reviewed_before = None
+        if stale_days is not None:
+            if not isinstance(stale_days, int) or stale_days < 0:
+                raise ValueError("Days must be a whole number of at least 0")
+            reviewed_before = (self._today() - datetime.timedelta(days=stale_days)).isoformat()
+        return self.store.find_topics(subject_name, status, min_confidence, reviewed_before)
+
+    def delete_topics(self, topics: List[Tuple[str, str]]) -> int:
+        """Delete (subject, topic) pairs, skipping ones already gone, and save; returns the count"""
+        deleted = 0
+        for subject_name, topic in topics:
+            if topic in self.subjects.get(subject_name, {}).get("topics", {}):
+                self.remove_topic(subject_name, topic)
+                deleted += 1
         self.save_data()
-        print("💾 Topics saved successfully!")
-    
-    def view_progress(self):
-        """View study progress for all subjects"""
-        if not self.subjects:
-            print("❌ No subjects found!")
-            return
-        
-        print("\n📊 STUDY PROGRESS OVERVIEW")
-        print("=" * 50)
-         
-        for subject_name, subject_data in self.subjects.items():
-            print(f"\n📚 {subject_name.upper()}")
-            print(f"Priority: {subject_data['priority'].upper()}")
-            if subject_data['exam_date']:
-                exam_date = datetime.datetime.strptime(subject_data['exam_date'], "%Y-%m-%d")
-                days_left = (exam_date - datetime.datetime.now()).days
-                print(f"Exam Date: {subject_data['exam_date']} ({days_left} days left)")
-            
-            topics = subject_data["topics"]
-            if not topics:
-                print("No topics added yet.")
+        return deleted
+
+    def similar_topics(self, subject_name: str, topic: str, threshold: float = None) -> List[Tuple[str, float]]:
+        """Existing topics of a subject that look like ``topic`` (typos, case, punctuation), with similarity"""
+        if subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        return self.duplicates.similar(self.subjects, subject_name, topic, threshold)
+
+    def duplicate_report(self, subject_name: str, threshold: float = None) -> Dict[str, Any]:
+        """Compound topics to split, groups of near-duplicate topics, and topics listed in the notes but missing"""
+        if subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        return self.duplicates.report(self.subjects, subject_name, threshold)
+
+    def split_topic(self, subject_name: str, topic: str) -> Dict[str, List[str]]:
+        """Replace a comma-joined topic with its parts, which inherit its progress
+
+        Parts that already exist (or have a near-duplicate) are left alone;
+        the study time stays with the first new part.
+        """
+        data = self.subjects[subject_name]["topics"][topic]
+        parts = split_compound(topic)
+        if len(parts) < 2:
+            raise ValueError(f"'{topic}' is a single topic")
+        self.remove_topic(subject_name, topic)
+        added, existing = [], []
+        for part in parts:
+            if part in self.subjects[subject_name]["topics"] or self.similar_topics(subject_name, part):
+                existing.append(part)
                 continue
-            
-            # Calculate progress
-            total_topics = len(topics)
-            completed = sum(1 for t in topics.values() if t["status"] == "completed")
-            in_progress = sum(1 for t in topics.values() if t["status"] == "in_progress")
-            
-            print(f"Progress: {completed}/{total_topics} completed, {in_progress} in progress")
-            
-            # Progress bar
-            progress_percent = (completed / total_topics) * 100
-            bar_length = 20
-            filled_length = int(bar_length * progress_percent // 100)
-            bar = "█" * filled_length + "-" * (bar_length - filled_length)
-            print(f"[{bar}] {progress_percent:.1f}%")
-            
-            # Show topic details
-            print("\nTopics:")
-            for topic, data in topics.items():
-                status_emoji = {"not_started": "🔴", "in_progress": "🟡", "completed": "🟢"}
-                confidence_bar = "⭐" * data["confidence"]
-                print(f"  {status_emoji[data['status']]} {topic} - Confidence: {confidence_bar}")
-    
-    def start_revision(self):
-        """Start interactive revision session"""
-        if not self.subjects:
-            print("❌ No subjects found!")
-            return
-        
-        print("\n🎯 REVISION SESSION")
-        print("-" * 25)
-        
-        # Select subject
-        subjects_list = list(self.subjects.keys())
-        for i, subject in enumerate(subjects_list, 1):
-            print(f"{i}. {subject}")
-        
-        try:
-            choice = int(input("\nSelect subject: ")) - 1
-            subject_name = subjects_list[choice]
-        except (ValueError, IndexError):
-            print("❌ Invalid selection!")
-            return
-        
+            fields = dict(data, study_time=0 if added else data.get("study_time", 0))
+            self.create_topic(subject_name, part, **fields)
+            added.append(part)
+        self.save_data()
+        return {"added": added, "existing": existing}
+
+    def merge_topics(self, subject_name: str, keep: str, others: List[str]):
+        """Fold duplicate topics into ``keep``: study time adds up, notes are joined, the others are deleted"""
         topics = self.subjects[subject_name]["topics"]
-        if not topics:
-            print("❌ No topics found for this subject!")
-            return
-        
-        # Filter topics that need revision
-        revision_topics = [t for t, data in topics.items() 
-                          if data["status"] != "completed" or data["confidence"] < 7]
-        
-        if not revision_topics:
-            print("🎉 All topics are well-understood! Great job!")
-            return
-        
-        print(f"\nStarting revision for: {subject_name}")
-        print(f"Topics to review: {len(revision_topics)}")
-        
-        for topic in revision_topics:
-            print(f"\n📖 Studying: {topic}")
-            print(f"Current status: {topics[topic]['status']}")
-            print(f"Confidence level: {topics[topic]['confidence']}/10")
-            
-            if topics[topic]['notes']:
-                print(f"Notes: {topics[topic]['notes']}")
-            
-            # Interactive session
-            print("\nWhat would you like to do?")
-            print("1. Mark as completed")
-            print("2. Update confidence level")
-            print("3. Add notes")
-            print("4. Skip to next topic")
-            print("5. End session")
-            
-            action = input("Choose action (1-5): ").strip()
-            
-            if action == "1":
-                topics[topic]["status"] = "completed"
-                topics[topic]["last_reviewed"] = datetime.datetime.now().strftime("%Y-%m-%d")
-                print("✅ Topic marked as completed!")
-            
-            elif action == "2":
-                try:
-                    confidence = int(input("Enter confidence level (1-10): "))
-                    if 1 <= confidence <= 10:
-                        topics[topic]["confidence"] = confidence
-                        topics[topic]["status"] = "completed" if confidence >= 8 else "in_progress"
-                        print(f"✅ Confidence updated to {confidence}/10")
-                    else:
-                        print("❌ Please enter a number between 1-10")
-                except ValueError:
-                    print("❌ Please enter a valid number")
-            
-            elif action == "3":
-                note = input("Enter your notes: ").strip()
-                topics[topic]["notes"] = note
-                print("✅ Notes added!")
-            
-            elif action == "4":
-                continue
-            
-            elif action == "5":
-                break
-            
-            # Update last studied
-            self.subjects[subject_name]["last_studied"] = datetime.datetime.now().strftime("%Y-%m-%d")
-            self.subjects[subject_name]["total_sessions"] += 1
-        
+        for topic in [keep, *others]:
+            if topic not in topics:
+                raise KeyError(topic)
+        others = [topic for topic in others if topic != keep]
+        notes = [topics[keep]["notes"]] + [topics[t]["notes"] for t in others]
+        self.update_topic(subject_name, keep,
+                          study_time=sum(topics[t]["study_time"] for t in [keep, *others]),
+                          notes="\n".join(dict.fromkeys(n for n in notes if n)))
+        for topic in others:
+            self.remove_topic(subject_name, topic)
         self.save_data()
-        print("💾 Session saved! Great work! 🎉")
-    
-    def quiz_mode(self):
-        """Interactive quiz mode"""
-        if not self.subjects:
-            print("❌ No subjects found!")
-            return
-        
-        print("\n❓ QUIZ MODE")
-        print("-" * 15)
-        
-        # Select subject
-        subjects_list = list(self.subjects.keys())
-        for i, subject in enumerate(subjects_list, 1):
-            print(f"{i}. {subject}")
-        
+
+    def sync_with(self, other_data_file: str, backend: str = None) -> Dict[str, Any]:
+        """Exchange changes with another copy of the data, e.g. a synced folder from another device
+
+        ``other_data_file`` may be a directory holding a data file of the same
+        name. Both copies end up with the merged data.
+        """
+        if os.path.isdir(other_data_file):
+            other_data_file = os.path.join(other_data_file, os.path.basename(self.data_file))
+        if os.path.abspath(other_data_file) == os.path.abspath(self.data_file):
+            raise ValueError("Cannot sync a data file with itself")
+        other = StudyAssistant(other_data_file, backend or self.backend, use_cache=self.store.use_cache)
+        try:
+            return sync_pair(self, other)
+        finally:
+            other.close()
+
+    def apply_sync(self, ops: List[Dict[str, Any]]):
+        """Apply merged changes from another replica and save them durably
+
+        They are not logged as local edits; the edit log is cleared, since
+        the sync that produced ``ops`` has consumed it.
+        """
+        if self.edits is None:
+            self.edits = EditLog(edit_log_path(self.data_file))
+            self.listeners.append(self.edits)
+        self.edits.paused = True
         try:
-            choice = int(input("\nSelect subject: ")) - 1
-            subject_name = subjects_list[choice]
-        except (ValueError, IndexError):
-            print("❌ Invalid selection!")
-            return
-        
-        topics = list(self.subjects[subject_name]["topics"].keys())
-        if not topics:
-            print("❌ No topics found for this subject!")
-            return
-        
-        print(f"\n🎯 Quiz on: {subject_name}")
-        print("I'll ask you about random topics. Rate your understanding!")
-        
-        score = 0
-        total_questions = min(5, len(topics))
-        
-        for i in range(total_questions):
-            topic = random.choice(topics)
-            print(f"\nQuestion {i+1}: Explain '{topic}'")
-            
-            input("Press Enter when you've thought about it...")
-            
-            understanding = input("How well do you understand this topic? (1-10): ").strip()
-            try:
-                rating = int(understanding)
-                if 1 <= rating <= 10:
-                    score += rating
-                    # Update topic data
-                    self.subjects[subject_name]["topics"][topic]["confidence"] = rating
-                    if rating >= 8:
-                        self.subjects[subject_name]["topics"][topic]["status"] = "completed"
-                    elif rating >= 5:
-                        self.subjects[subject_name]["topics"][topic]["status"] = "in_progress"
-                    
-                    print(f"✅ Recorded: {rating}/10")
-                else:
-                    print("❌ Please enter 1-10")
-            except ValueError:
-                print("❌ Invalid input")
-        
-        average_score = score / total_questions
-        print(f"\n🏆 Quiz Complete!")
-        print(f"Average Score: {average_score:.1f}/10")
-        
-        if average_score >= 8:
-            print("🌟 Excellent! You're well-prepared!")
-        elif average_score >= 6:
-            print("👍 Good progress! Keep studying!")
+            for op in ops:
+                self._record(op)
+        finally:
+            self.edits.paused = False
+        self.edits.clear()
+        self.history.flush()
+        if self.writer is not None:
+            self.writer.flush()
         else:
-            print("📚 Need more practice! Don't give up!")
-        
-        self.save_data()
-    
-    def study_schedule(self):
-        """Set study schedule and reminders"""
-        print("\n📅 STUDY SCHEDULE")
-        print("-" * 20)
-        
-        if not self.subjects:
-            print("❌ No subjects found!")
-            return
-        
-        print("Upcoming exams and recommended study plan:")
-        
-        # Sort subjects by exam date and priority
-        scheduled_subjects = []
-        for name, data in self.subjects.items():
-            if data["exam_date"]:
-                exam_date = datetime.datetime.strptime(data["exam_date"], "%Y-%m-%d")
-                days_left = (exam_date - datetime.datetime.now()).days
-                scheduled_subjects.append((name, days_left, data["priority"]))
-        
-        scheduled_subjects.sort(key=lambda x: (x[1], {"high": 1, "medium": 2, "low": 3}[x[2]]))
-        
-        for subject, days_left, priority in scheduled_subjects:
-            topics = self.subjects[subject]["topics"]
-            incomplete_topics = [t for t, data in topics.items() 
-                               if data["status"] != "completed"]
-            
-            print(f"\n📚 {subject} ({days_left} days left, {priority} priority)")
-            print(f"Topics to complete: {len(incomplete_topics)}")
-            
-            if incomplete_topics and days_left > 0:
-                topics_per_day = len(incomplete_topics) / days_left
-                print(f"Recommended: {topics_per_day:.1f} topics per day")
-                
-                if topics_per_day > 3:
-                    print("⚠️ Warning: Heavy study load required!")
-                elif topics_per_day > 1:
-                    print("📈 Moderate study pace needed")
-                else:
-                    print("✅ Manageable study pace")
-    
-    def get_study_tips(self):
-        """Provide AI-generated study tips"""
-        tips = [
-            "🧠 Use the Pomodoro Technique: 25 minutes focused study, 5-minute break",
-            "📝 Create mind maps to visualize connections between topics",
-            "🔄 Review topics multiple times with increasing intervals (spaced repetition)",
-            "📚 Teach concepts to someone else or explain them out loud",
-            "🎯 Focus on understanding concepts rather than memorizing facts",
-            "💡 Use mnemonics and memory techniques for difficult information",
-            "📱 Minimize distractions: put phone away during study sessions",
-            "🏃 Take regular breaks and include physical activity",
-            "🍎 Maintain good nutrition and stay hydrated",
-            "😴 Get adequate sleep - your brain consolidates memory during sleep",
-            "📊 Track your progress to stay motivated",
-            "🤝 Form study groups for collaborative learning",
-            "❓ Ask questions and seek clarification on difficult topics",
-            "📝 Make your own notes in your own words",
-            "🔍 Use active recall: test yourself without looking at notes"
-        ]
-        
-        print("\n💡 AI STUDY TIPS")
-        print("-" * 20)
-        
-        # Show personalized tips based on user's data
-        if self.subjects:
-            total_topics = sum(len(subject["topics"]) for subject in self.subjects.values())
-            completed_topics = sum(
-                sum(1 for topic in subject["topics"].values() if topic["status"] == "completed")
-                for subject in self.subjects.values()
-            )
-            
-            if total_topics > 0:
-                completion_rate = (completed_topics / total_topics) * 100
-                print(f"📊 Your current completion rate: {completion_rate:.1f}%")
-                
-                if completion_rate < 25:
-                    print("🚀 Just getting started! Here are some tips to build momentum:")
-                elif completion_rate < 50:
-                    print("👍 Good progress! Here are tips to maintain consistency:")
-                elif completion_rate < 75:
-                    print("💪 You're doing great! Tips for the final push:")
-                else:
-                    print("🌟 Excellent progress! Tips for exam preparation:")
-        
-        # Show 3 random tips
-        selected_tips = random.sample(tips, 3)
-        for i, tip in enumerate(selected_tips, 1):
-            print(f"{i}. {tip}")
-        
-        print("\n🎯 Remember: Consistency is key to success!")
-    
-    def view_statistics(self):
-        """View detailed statistics"""
-        if not self.subjects:
-            print("❌ No subjects found!")
-            return
-        
-        print("\n📈 STUDY STATISTICS")
-        print("=" * 30)
-        
-        total_subjects = len(self.subjects)
-        total_topics = sum(len(subject["topics"]) for subject in self.subjects.values())
-        
-        completed_topics = sum(
-            sum(1 for topic in subject["topics"].values() if topic["status"] == "completed")
-            for subject in self.subjects.values()
-        )
-        
-        in_progress_topics = sum(
-            sum(1 for topic in subject["topics"].values() if topic["status"] == "in_progress")
-            for subject in self.subjects.values()
-        )
-        
-        print(f"📚 Total Subjects: {total_subjects}")
-        print(f"📝 Total Topics: {total_topics}")
-        print(f"✅ Completed Topics: {completed_topics}")
-        print(f"🟡 In Progress Topics: {in_progress_topics}")
-        print(f"🔴 Not Started Topics: {total_topics - completed_topics - in_progress_topics}")
-        
-        if total_topics > 0:
-            completion_percentage = (completed_topics / total_topics) * 100
-            print(f"📊 Overall Completion: {completion_percentage:.1f}%")
-        
-        # Subject-wise breakdown
-        print("\n📊 Subject-wise Progress:")
-        for subject_name, subject_data in self.subjects.items():
-            topics = subject_data["topics"]
-            if topics:
-                completed = sum(1 for t in topics.values() if t["status"] == "completed")
-                total = len(topics)
-                percentage = (completed / total) * 100
-                print(f"  {subject_name}: {completed}/{total} ({percentage:.1f}%)")
-        
-        # Study streak
-        print(f"\n📅 Total Study Sessions: {sum(s['total_sessions'] for s in self.subjects.values())}")
-        
-        # Confidence analysis
-        all_confidences = []
-        for subject in self.subjects.values():
-            for topic in subject["topics"].values():
-                if topic["confidence"] > 0:
-                    all_confidences.append(topic["confidence"])
-        
-        if all_confidences:
-            avg_confidence = sum(all_confidences) / len(all_confidences)
-            print(f"🎯 Average Confidence: {avg_confidence:.1f}/10")
-    
-    def delete_data(self):
-        """Delete subjects or topics"""
-        if not self.subjects:
-            print("❌ No subjects found!")
-            return
-        
-        print("\n🗑️ DELETE DATA")
-        print("-" * 15)
-        print("1. Delete a subject")
-        print("2. Delete a topic")
-        print("3. Cancel")
-        
-        choice = input("Choose option (1-3): ").strip()
-        
-        if choice == "1":
-            subjects_list = list(self.subjects.keys())
-            for i, subject in enumerate(subjects_list, 1):
-                print(f"{i}. {subject}")
-            
-            try:
-                selection = int(input("Select subject to delete: ")) - 1
-                subject_name = subjects_list[selection]
-                
-                confirm = input(f"Are you sure you want to delete '{subject_name}'? (yes/no): ").strip().lower()
-                if confirm == "yes":
-                    del self.subjects[subject_name]
-                    self.save_data()
-                    print(f"✅ Subject '{subject_name}' deleted!")
-                else:
-                    print("❌ Deletion cancelled.")
-            except (ValueError, IndexError):
-                print("❌ Invalid selection!")
-        
-        elif choice == "2":
-            # Similar implementation for deleting topics
-            print("Topic deletion functionality - select subject first...")
-            # Implementation similar to above
-        
-        elif choice == "3":
-            print("Operation cancelled.")
-    
-    def run(self):
-        """Main application loop"""
-        print("🎓 Welcome to AI Study Assistant!")
-        print("Your intelligent companion for exam preparation!")
-        
-        while True:
-            try:
-                self.display_menu()
-                choice = input("\nEnter your choice (1-10): ").strip()
-                
-                if choice == "1":
-                    self.add_subject()
-                elif choice == "2":
-                    self.add_topics()
-                elif choice == "3":
-                    self.view_progress()
-                elif choice == "4":
-                    self.start_revision()
-                elif choice == "5":
-                    self.quiz_mode()
-                elif choice == "6":
-                    self.study_schedule()
-                elif choice == "7":
-                    self.get_study_tips()
-                elif choice == "8":
-                    self.view_statistics()
-                elif choice == "9":
-                    self.delete_data()
-                elif choice == "10":
-                    print("\n🎉 Thanks for using AI Study Assistant!")
-                    print("Good luck with your exams! 📚✨")
-                    break
-                else:
-                    print("❌ Invalid choice! Please enter 1-10.")
-                
-                input("\nPress Enter to continue...")
-                
-            except KeyboardInterrupt:
-                print("\n\n👋 Goodbye! Study hard and succeed!")
-                break
-            except Exception as e:
-                print(f"❌ An error occurred: {e}")
-                input("Press Enter to continue...")
+            self.store.flush()
+
+    def search_topics(self, query: str, limit: int = 20, subject_name: str = None) -> List[Dict[str, Any]]:
+        """Subjects and topics whose names or notes match every word of the query"""
+        if subject_name is not None and subject_name not in self.subjects:
+            raise KeyError(subject_name)
+        return self.search.search(query, limit, subject_name)
+
+    def study_plan(self, days: int = 7) -> Dict[str, Any]:
+        """Day-by-day sessions within the daily time budget, plus each subject's outlook"""
+        if days < 1:
+            raise ValueError("The plan must cover at least one day")
+        return self.queries.get("study_plan", None, lambda: self.planner.plan(self.subjects, days, self._now()), days,
+                                depends=(TOPICS, "exam_date", "priority"), daily=True)
+
+    def history_report(self, days: int = 30, bucket_days: int = 1,
+                       subject_name: str = None) -> List[Dict[str, Any]]:
+        """Activity and average rating over the last ``days`` days, in ``bucket_days`` buckets"""
+        if days < 1:
+            raise ValueError("Days must be at least 1")
+        end = self._today() + datetime.timedelta(days=1)
+        return self.history.buckets(end - datetime.timedelta(days=days), end, bucket_days, subject_name)
+
+    def statistics_report(self) -> Dict[str, Any]:
+        """Overall and per-subject statistics"""
+        return self.summary()
+
+    def study_tips(self, count: int = 3) -> Dict[str, Any]:
+        """``count`` random study tips, and the completion rate and stage they are picked for
+
+        The stage ("starting", "steady", "final_push" or "exam_ready") and rate
+        are None before any topic exists.
+        """
+        completion_rate = stage = None
+        summary = self.summary()
+        if summary["topics"]:
+            completion_rate = summary["completion_rate"]
+            stage = ("starting" if completion_rate < 25 else "steady" if completion_rate < 50
+                     else "final_push" if completion_rate < 75 else "exam_ready")
+        return {"completion_rate": completion_rate, "stage": stage,
+                "tips": random.sample(STUDY_TIPS, min(count, len(STUDY_TIPS)))}
+
+def print_cohort_report(directory: str, workers: int = None, json_path: str = None,
+                        backend: str = "journal"):
+    """Analyse a directory of student data files and print the cohort summary"""
+    from cohort import analyze_cohort
+    report = analyze_cohort(directory, workers, backend=backend)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("\n👥 COHORT REPORT")
+    print("=" * 50)
+    print(f"🎓 Students: {report['students']:,} ({report['students_without_topics']:,} without topics)")
+    print(f"📝 Topics: {report['topics']:,}")
+    completion = report["completion"]
+    if completion["mean"] is not None:
+        percentiles = ", ".join(f"{name} {value}%" for name, value in completion["percentiles"].items())
+        print(f"📊 Completion: mean {completion['mean']:.1f}% ({percentiles})")
+        for bucket, count in completion["histogram"].items():
+            print(f"  {bucket:>8}: {count:,}")
+    if report["average_confidence"] is not None:
+        print(f"🎯 Average Confidence: {report['average_confidence']:.1f}/10")
+
+    at_risk = report["at_risk"]
+    print(f"\n⚠️ At risk (≥ {at_risk['topics_per_day_threshold']:g} topics/day needed): {at_risk['students']:,}")
+    for entry in at_risk["worst"]:
+        print(f"  {entry['student']}: {entry['subject']} - {entry['incomplete_topics']} topics "
+              f"in {entry['days_left']} days ({entry['topics_per_day']:.1f}/day)")
+    if report["weakest_topics"]:
+        print("\n🔴 Weakest topics:")
+        for entry in report["weakest_topics"]:
+            print(f"  {entry['subject']} - {entry['topic']}: weak for {entry['weak_share']:.0%} "
+                  f"of {entry['students']:,} students (avg confidence {entry['average_confidence']:.1f})")
+    for failure in report["failed"]:
+        print(f"  ❌ {failure['file']}: {failure['error']}")
+    print(f"\n✅ Analysed {report['students']:,} files in {report['seconds']:.2f}s "
+          f"with {report['workers']} workers ({report['failed_count']} failed)")
+
+def print_stats_check(problems: List[str]):
+    """Print the aggregates that disagree with a rebuild, or that all of them agree"""
+    for problem in problems:
+        print(f"❌ {problem}")
+    print("✅ Statistics are consistent" if not problems else f"{len(problems)} mismatches found")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Study Assistant - Exam Revision Helper")
+    parser.add_argument("--data-file", default="study_data.json", help="study data JSON file")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="journal",
+                        help="storage backend (default: journal)")
+    parser.add_argument("--resident-topics", type=int, metavar="N",
+                        help="sharded and sqlite backends: topics kept in memory before least recently used "
+                             "subjects are unloaded (default: 200000)")
+    parser.add_argument("--migrate-to", choices=sorted(BACKENDS), metavar="BACKEND",
+                        help="copy all data from --backend into BACKEND's files and exit")
+    parser.add_argument("--sync-with", metavar="PATH",
+                        help="merge changes with another copy of the data (a data file or its folder) and exit")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse the JSON file instead of using its binary snapshot cache")
+    parser.add_argument("--columnar", action="store_true",
+                        help="compute progress and statistics with the NumPy columnar engine")
+    parser.add_argument("--import-file", metavar="PATH",
+                        help="bulk import topics from a CSV or JSONL syllabus file and exit")
+    parser.add_argument("--subject", default="",
+                        help="subject for imported rows that have no subject column")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows inserted per import batch")
+    parser.add_argument("--split-topics", action="store_true",
+                        help="import comma-joined topics as one topic per part")
+    parser.add_argument("--skip-similar", type=float, metavar="SIMILARITY",
+                        help="skip imported topics at least this similar (0-1, e.g. 0.5) to an existing topic")
+    parser.add_argument("--check-stats", action="store_true",
+                        help="compare the statistics aggregates with a rebuild from scratch and exit; "
+                             "with --replay-trace, after the replay has updated them change by change")
+    parser.add_argument("--quiz-length", type=int, default=5, help="questions per quiz")
+    parser.add_argument("--daily-minutes", type=int, default=120,
+                        help="study time per day available to the study planner")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="record per-operation timings and counters to PATH "
+                             "(Prometheus text if it ends in .prom, JSONL otherwise)")
+    parser.add_argument("--metrics-interval", type=float, default=60.0,
+                        help="seconds between metrics dumps (default: 60)")
+    parser.add_argument("--profile", choices=OPERATIONS + MENU_ACTIONS, metavar="ACTION",
+                        help="run the first call of ACTION (e.g. quiz_mode) under cProfile")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the multi-user HTTP service instead of the interactive menu")
+    parser.add_argument("--host", default="127.0.0.1", help="service bind address")
+    parser.add_argument("--port", type=int, default=8080, help="service port")
+    parser.add_argument("--data-dir", default="users",
+                        help="service directory holding one data folder per user")
+    parser.add_argument("--max-users", type=int, default=128,
+                        help="users kept open in memory by the service")
+    parser.add_argument("--cohort", metavar="DIR",
+                        help="report statistics across every student data file under DIR and exit")
+    parser.add_argument("--workers", type=int, help="cohort: worker processes (default: one per core)")
+    parser.add_argument("--cohort-json", metavar="PATH", help="cohort: also write the full report as JSON")
+    parser.add_argument("--record-trace", metavar="PATH",
+                        help="record every operation of this menu session to a replayable JSONL trace")
+    parser.add_argument("--replay-trace", metavar="PATH",
+                        help="replay a recorded trace against --data-file (a copy: it is changed), "
+                             "check every result and exit")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="save in a background thread instead of blocking the menu on disk writes")
+    parser.add_argument("--flush-interval", type=float, default=1.0,
+                        help="write-behind: seconds without a save before flushing (default: 1)")
+    parser.add_argument("--flush-bytes", type=int, default=256 * 1024,
+                        help="write-behind: flush early once this many bytes of changes are pending")
+    args = parser.parse_args()
+    if args.skip_similar is not None and not 0 < args.skip_similar <= 1:
+        parser.error("--skip-similar must be between 0 and 1")
+    if args.resident_topics is not None and (not BACKENDS[args.backend].lazy or args.resident_topics < 1):
+        parser.error("--resident-topics needs --backend sharded or sqlite and a positive number")
+
+    if args.migrate_to:
+        try:
+            report = migrate_storage(args.data_file, args.backend, args.migrate_to, not args.no_cache)
+        except (OSError, RuntimeError, ValueError) as e:
+            parser.error(str(e))
+        print(f"✅ Copied {report['subjects']:,} subjects and {report['topics']:,} topics "
+              f"from {report['source']} to {report['target']} storage in {report['seconds']:.2f}s")
+        return
+
+    if args.serve:
+        from server import run_service
+        run_service(args.data_dir, args.host, args.port, args.max_users, args.backend)
+        return
+
+    if args.cohort:
+        print_cohort_report(args.cohort, args.workers, args.cohort_json, args.backend)
+        return
+
+    try:
+        assistant = StudyAssistant(args.data_file, args.backend, args.columnar,
+                                   use_cache=not args.no_cache, quiz_length=args.quiz_length,
+                                   metrics_file=args.metrics_file,
+                                   metrics_interval=args.metrics_interval, profile_action=args.profile,
+                                   daily_minutes=args.daily_minutes, write_behind=args.write_behind,
+                                   flush_interval=args.flush_interval, flush_bytes=args.flush_bytes,
+                                   storage_options={"max_resident_topics": args.resident_topics}
+                                   if args.resident_topics else None)
+    except RuntimeError as e:
+        parser.error(str(e))
+    if args.import_file:
+        importer = BulkImporter(assistant, args.batch_size, args.subject, progress_every=100_000,
+                                split_topics=args.split_topics, similarity=args.skip_similar)
+        report = importer.run(args.import_file)
+        assistant.close()
+        print(f"✅ Imported {report['imported']:,} topics "
+              f"({report['subjects_created']} new subjects) from {report['rows']:,} rows "
+              f"in {report['seconds']:.2f}s ({report['rows_per_sec']:,.0f} rows/sec)")
+        print(f"⚠️ Skipped {report['duplicates']:,} duplicates and {report['invalid']:,} invalid rows")
+        for error in report["errors"]:
+            print(f"  ❌ {error}")
+        if report["split"]:
+            print(f"✂️ Split {report['split']:,} comma-joined topics into separate topics")
+        if report["similar"]:
+            print(f"⚠️ Skipped {report['similar']:,} near-duplicate topics")
+            for similar in report["similar_topics"]:
+                print(f"  👯 {similar}")
+        return
+    if args.sync_with:
+        try:
+            report = assistant.sync_with(args.sync_with)
+        except (OSError, ValueError) as e:
+            assistant.close()
+            parser.error(str(e))
+        assistant.close()
+        print(f"🔄 Sent {report['remote_records']:,} changed subjects/topics ({report['sent_bytes']:,} bytes), "
+              f"received {report['local_records']:,} ({report['received_bytes']:,} bytes)")
+        print(f"✅ Applied {report['local_changes']:,} changes here and {report['remote_changes']:,} there "
+              f"in {report['seconds']:.2f}s")
+        return
+    if args.replay_trace:
+        try:
+            report = replay_trace(assistant, args.replay_trace)
+        except (OSError, ValueError) as e:
+            assistant.close()
+            parser.error(str(e))
+        problems = assistant.stats.verify(assistant.subjects) if args.check_stats else []
+        assistant.close()
+        print(f"▶️ Replayed {report['sessions']:,} sessions ({report['calls']:,} operations) "
+              f"in {report['seconds']:.2f}s: {report['sessions_per_sec'] or 0:,.0f} sessions/sec, "
+              f"{report['calls_per_sec'] or 0:,.0f} operations/sec")
+        for kind, figures in report["kinds"].items():
+            print(f"  {kind}: {figures['sessions']:,} sessions, p50 {figures['p50_ms']:.2f} ms, "
+                  f"p95 {figures['p95_ms']:.2f} ms, max {figures['max_ms']:.2f} ms")
+        for example in report["examples"]:
+            print(f"  ❌ session {example['session']}: {example['call']}{tuple(example['args'])} "
+                  f"returned {example['actual']}, recorded {example['expected']}")
+        if args.check_stats:
+            print_stats_check(problems)
+        if report["mismatches"]:
+            sys.exit(f"{report['mismatches']:,} results differ from the recording")
+        print("✅ Every result matches the recording")
+        if problems:
+            sys.exit(1)
+        return
+    if args.check_stats:
+        # Only startup has built the aggregates here, e.g. from the sharded manifest's counts
+        problems = assistant.stats.verify(assistant.subjects)
+        assistant.close()
+        print_stats_check(problems)
+        if problems:
+            sys.exit(1)
+        return
+    recorder = TraceRecorder(assistant, args.record_trace) if args.record_trace else None
+    TerminalUI(assistant, recorder).run()
 
 if __name__ == "__main__":
-    assistant = StudyAssistant()
-    assistant.run()
+    main()
 
 
 
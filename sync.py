@@ -0,0 +1,519 @@
+import bisect
+import json
+import os
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from storage import SUBJECT_FIELDS, TOPIC_FIELDS, replace_file
+
+COUNTER_FIELDS = ("total_sessions", "study_time")  # every replica's increments add up
+MAX_FIELDS = ("last_reviewed", "last_studied")  # the latest date wins
+TEXT_FIELDS = ("notes",)  # merged line by line
+EXISTS = ""  # pseudo-field: whether the subject or topic exists
+WHOLE = "*"  # edit-log field: every field of the subject or topic
+BASE, EDIT = 0, 1  # rank of a register value: a replica's starting data loses to any edit
+
+Record = Tuple[str, Optional[str]]  # (subject, topic); topic None for the subject's own fields
+_MISSING = object()
+
+
+def replica_path(data_file: str) -> str:
+    return data_file + ".sync"
+
+
+def edit_log_path(data_file: str) -> str:
+    return data_file + ".sync.log"
+
+
+def _applied_path(data_file: str) -> str:
+    return data_file + ".sync.applied"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _tag(clock: int, origin: str, position: int = 0) -> str:
+    return f"{clock}:{position}:{origin}"
+
+
+def _parse_tag(tag: str) -> Tuple[int, int, str]:
+    """(clock, position in the text written, origin) of a note-line tag"""
+    clock, position, origin = tag.split(":", 2)
+    return int(clock), int(position), origin
+
+
+def _order(value) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+# Field states are plain JSON values so deltas and the state file need no
+# extra encoding:
+#   register (most fields, MAX_FIELDS):  [value, clock, origin, rank]
+#   counter (COUNTER_FIELDS):            {origin: [increments, decrements, clock]}
+#   text (TEXT_FIELDS):                  {line: {tag: None, or the tag of its removal}}
+# A note-line tag is "clock:position:origin"; live lines are ordered by their
+# oldest tag, so lines keep the order they were written in.
+
+def field_value(field: str, state) -> Any:
+    """The value a field state stands for"""
+    if field in COUNTER_FIELDS:
+        return sum(up - down for up, down, _ in state.values())
+    if field in TEXT_FIELDS:
+        live = []
+        for line, tags in state.items():
+            added = [_parse_tag(tag)[:2] for tag, removed in tags.items() if removed is None]
+            if added:
+                live.append((min(added), line))
+        return "\n".join(line for _, line in sorted(live))
+    return state[0]
+
+
+def field_stamps(field: str, state) -> Iterator[Tuple[str, int]]:
+    """(origin, clock) of every change folded into a field state"""
+    if field in COUNTER_FIELDS:
+        for origin, entry in state.items():
+            yield origin, entry[2]
+    elif field in TEXT_FIELDS:
+        for tags in state.values():
+            for tag, removed in tags.items():
+                clock, _, origin = _parse_tag(tag)
+                yield origin, clock
+                if removed is not None:
+                    clock, _, origin = _parse_tag(removed)
+                    yield origin, clock
+    else:
+        yield state[2], state[1]
+
+
+def merge_field(field: str, mine, theirs):
+    """Join two states of a field; commutative, associative and idempotent"""
+    if field in COUNTER_FIELDS:
+        merged = {origin: list(entry) for origin, entry in mine.items()}
+        for origin, entry in theirs.items():
+            current = merged.get(origin)
+            merged[origin] = list(entry) if current is None else [max(a, b) for a, b in zip(current, entry)]
+        return merged
+    if field in TEXT_FIELDS:
+        merged = {line: dict(tags) for line, tags in mine.items()}
+        for line, tags in theirs.items():
+            current = merged.setdefault(line, {})
+            for tag, removed in tags.items():
+                known = current.get(tag)
+                if known is None or (removed is not None and _parse_tag(removed) > _parse_tag(known)):
+                    current[tag] = removed
+        return merged
+    if field in MAX_FIELDS:
+        return max(mine, theirs, key=lambda state: (_order(state[0]), state[1], state[2]))
+    return max(mine, theirs, key=lambda state: (state[3], state[1], state[2], _order(state[0])))
+
+
+def _write_field(field: str, state, value, clock: int, origin: str, rank: int):
+    """The state after a local write of ``value`` (None if nothing changes)
+
+    A ``BASE`` write only adds what the state does not know about yet: it
+    never removes note lines or lowers a counter, and its register values
+    lose to every edit. ``MAX_FIELDS`` never go back to an earlier value.
+    """
+    if field in COUNTER_FIELDS:
+        state = {} if state is None else {key: list(entry) for key, entry in state.items()}
+        delta = value - field_value(field, state)
+        if not delta or (rank == BASE and delta < 0):
+            return None
+        entry = state.setdefault(origin, [0, 0, clock])
+        entry[0 if delta > 0 else 1] += abs(delta)
+        entry[2] = clock
+        return state
+    if field in TEXT_FIELDS:
+        state = {} if state is None else {line: dict(tags) for line, tags in state.items()}
+        lines = [line for line in dict.fromkeys(str(value).split("\n")) if line.strip()]
+        live = {line for line, tags in state.items() if None in tags.values()}
+        changed = False
+        if rank == EDIT:
+            for line in live.difference(lines):
+                for tag, removed in state[line].items():
+                    if removed is None:
+                        state[line][tag] = _tag(clock, origin)
+                changed = True
+        for position, line in enumerate(lines):
+            if line not in live and (rank == EDIT or line not in state):
+                state.setdefault(line, {})[_tag(clock, origin, position)] = None
+                changed = True
+        return state if changed else None
+    written = [value, clock, origin, rank]
+    # An earlier date than one already synced cannot win, even when edited here
+    if state is not None and (rank == BASE or field in MAX_FIELDS):
+        written = merge_field(field, state, written)
+        return None if written is state else written
+    return written
+
+
+class EditLog:
+    """When each field was last edited here, so a sync can stamp changes with their edit time
+
+    A change listener; edits are appended to ``<data file>.sync.log`` as
+    JSON lines on every save and the log is cleared by the next sync. It is
+    only attached to data that has been synced before.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.times: Dict[Tuple[str, Optional[str], str], int] = {}
+        self.pending: List[list] = []
+        self.paused = False
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        subject, topic, field, when = json.loads(line)
+                    except ValueError:
+                        break  # torn tail
+                    self.times[(subject, topic, field)] = when
+
+    def on_change(self, subjects: Dict[str, Any], op: Dict[str, Any], old):
+        if self.paused:
+            return
+        kind, subject, now = op["op"], op["subject"], _now_ms()
+        if kind in ("add_subject", "del_subject"):
+            keys = [(subject, None, WHOLE)]
+        elif kind == "set_subject":
+            keys = [(subject, None, field) for field in op["fields"]]
+        elif kind == "set_topic":
+            keys = [(subject, op["topic"], field) for field in op["fields"]]
+        else:
+            keys = [(subject, op["topic"], WHOLE)]
+        for key in keys:
+            self.times[key] = now
+            self.pending.append([*key, now])
+
+    def edited(self, record: Record, field: str) -> Optional[int]:
+        """Time of the latest local edit covering a field, if one was logged"""
+        subject, topic = record
+        times = [self.times.get((subject, topic, field)), self.times.get((subject, topic, WHOLE))]
+        if topic is not None:
+            times.append(self.times.get((subject, None, WHOLE)))
+        return max((when for when in times if when is not None), default=None)
+
+    def flush(self):
+        if self.pending:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n"
+                                 for entry in self.pending))
+            self.pending = []
+
+    def clear(self):
+        self.times = {}
+        self.pending = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Replica:
+    """Per-field CRDT state of one copy of the study data
+
+    Every subject and topic field is a register stamped with a hybrid
+    logical clock (wall-clock milliseconds, bumped past any clock already
+    seen, plus the replica id). Most registers keep the latest write; dates
+    in ``MAX_FIELDS`` keep the latest date, ``COUNTER_FIELDS`` add up each
+    replica's increments, and notes merge line by line (a line removed on one
+    side and kept on the other is removed, lines added on either side stay).
+    Deleted subjects and topics stay as tombstones.
+
+    ``vector`` holds the highest clock seen from each replica, so ``export``
+    sends only the fields stamped after what a peer has seen and ``merge``
+    joins them in any order with the same result.
+
+    A replica's first sync (``fresh``) records its data with ``BASE`` rank:
+    it fills in what the peer lacks but loses to any edit the peer made, and
+    nothing it lacks counts as deleted.
+    """
+
+    VERSION = 1
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self.path = replica_path(data_file)
+        self.id = uuid.uuid4().hex[:12]
+        self.clock = 0
+        self.generation = 0
+        self.vector: Dict[str, int] = {}
+        self.records: Dict[Record, Dict[str, Any]] = {}
+        self.latest: Dict[Record, Dict[str, int]] = {}  # newest clock per origin, for export
+        self.logs: Dict[str, List[Tuple[int, Record]]] = {}  # per origin, in clock order
+        self.pending: List[Record] = []  # merged into the state but maybe not yet into the data
+        self.fresh = True
+        self.dirty = False  # changed since it was opened
+
+    @classmethod
+    def open(cls, data_file: str) -> "Replica":
+        replica = cls(data_file)
+        if not os.path.exists(replica.path):
+            return replica
+        with open(replica.path, "rb") as f:
+            state = json.loads(f.read())
+        if state.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported sync state version: {state.get('version')}")
+        replica.id, replica.clock = state["replica"], state["clock"]
+        replica.generation, replica.vector = state["generation"], state["vector"]
+        replica.pending = [tuple(record) for record in state["pending"]]
+        for subject, topic, fields, latest in state["records"]:
+            record = (subject, topic)
+            replica.records[record] = fields
+            replica.latest[record] = latest
+            for origin, clock in latest.items():
+                replica.logs.setdefault(origin, []).append((clock, record))
+        for log in replica.logs.values():
+            log.sort(key=lambda entry: entry[0])
+        replica.fresh = False
+        return replica
+
+    def save(self):
+        """Write the state (with the records still to apply) and compact the export logs"""
+        self.generation += 1
+        state = {"version": self.VERSION, "replica": self.id, "clock": self.clock,
+                 "generation": self.generation, "vector": self.vector, "pending": self.pending,
+                 "records": [[record[0], record[1], fields, self.latest.get(record, {})]
+                             for record, fields in self.records.items()]}
+        replace_file(self.path, json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self.fresh = self.dirty = False
+        if sum(map(len, self.logs.values())) > 2 * sum(map(len, self.latest.values())) + 1024:
+            self.logs = {}
+            for record, latest in self.latest.items():
+                for origin, clock in latest.items():
+                    self.logs.setdefault(origin, []).append((clock, record))
+            for log in self.logs.values():
+                log.sort(key=lambda entry: entry[0])
+
+    def needs_apply(self) -> bool:
+        """Whether a previous sync may have stopped before its merge reached the data"""
+        if not self.pending:
+            return False
+        try:
+            with open(_applied_path(self.data_file)) as f:
+                return int(f.read() or -1) != self.generation
+        except (OSError, ValueError):
+            return True
+
+    def mark_applied(self):
+        with open(_applied_path(self.data_file), "w") as f:
+            f.write(str(self.generation))
+
+    def _note(self, record: Record, origin: str, clock: int, entries: Dict[str, list] = None):
+        latest = self.latest.setdefault(record, {})
+        if clock > latest.get(origin, -1):
+            latest[origin] = clock
+            (entries if entries is not None else self.logs).setdefault(origin, []).append((clock, record))
+
+    def write(self, record: Record, field: str, value, when: int = None, rank: int = EDIT):
+        """Record a local change (``when`` is its edit time in milliseconds)"""
+        clock = self.clock = max(when or 0, self.clock + 1)
+        fields = self.records.setdefault(record, {})
+        state = _write_field(field, fields.get(field), value, clock, self.id, rank)
+        if state is None:
+            return
+        fields[field] = state
+        self.vector[self.id] = clock
+        self.dirty = True
+        self._note(record, self.id, clock)
+
+    def alive(self, record: Record) -> bool:
+        state = self.records.get(record, {}).get(EXISTS)
+        return bool(state and state[0])
+
+    def value(self, record: Record, field: str):
+        state = self.records.get(record, {}).get(field)
+        if state is not None:
+            return field_value(field, state)
+        # A counter still at 0 or empty notes were never written, so they carry no state
+        if field in TEXT_FIELDS:
+            return ""
+        return 0 if field in COUNTER_FIELDS else _MISSING
+
+    def values(self, record: Record) -> Dict[str, Any]:
+        # Schema fields in their declared order, then any others sorted, so
+        # converged replicas build identical dicts (and write identical files)
+        known = self.records.get(record, {})
+        schema = TOPIC_FIELDS if record[1] is not None else SUBJECT_FIELDS
+        fields = [field for field in schema if field in known or field in COUNTER_FIELDS + TEXT_FIELDS]
+        fields += sorted(field for field in known if field not in schema and field != EXISTS)
+        return {field: self.value(record, field) for field in fields}
+
+    def reconcile(self, subjects: Dict[str, Any], edits: EditLog = None) -> Set[Record]:
+        """Record every difference between the data and the state as a local change
+
+        Changes are stamped with their logged edit time where there is one
+        (``edits``) and the current time otherwise, oldest first. Returns the
+        records whose data still differs from the state afterwards (an older
+        date than one already synced, note lines in another order), which the
+        sync then overwrites so every replica ends up with the same data.
+        """
+        rank = BASE if self.fresh else EDIT
+        now = _now_ms()
+        changes = []
+        seen: Set[Record] = set()
+
+        def compare(record: Record, values: Dict[str, Any]):
+            seen.add(record)
+            states = self.records.get(record, {})
+            for field, value in values.items():
+                state = states.get(field)
+                if (field_value(field, state) if state is not None else self.value(record, field)) != value:
+                    when = edits.edited(record, field) if edits is not None else None
+                    changes.append((when or now, record, field, value))
+
+        for subject_name, subject in subjects.items():
+            values = {key: value for key, value in subject.items() if key != "topics"}
+            values[EXISTS] = True
+            compare((subject_name, None), values)
+            for topic_name, topic in subject["topics"].items():
+                values = dict(topic)
+                values[EXISTS] = True
+                compare((subject_name, topic_name), values)
+        if rank == EDIT:
+            for record in self.records:
+                if record not in seen and self.alive(record):
+                    when = edits.edited(record, EXISTS) if edits is not None else None
+                    changes.append((when or now, record, EXISTS, False))
+        changes.sort(key=lambda change: change[0])
+        overruled = set()
+        for when, record, field, value in changes:
+            self.write(record, field, value, when, rank)
+            if self.value(record, field) != value:
+                overruled.add(record)
+        return overruled
+
+    def export(self, since: Dict[str, int]) -> Dict[str, Any]:
+        """Every field stamped after the version vector ``since`` (``{}`` for everything)"""
+        wanted: Dict[Record, None] = {}
+        for origin, log in self.logs.items():
+            # (clock + 1,) sorts before every entry stamped clock + 1 and after all earlier
+            # ones, so no key function (Python 3.10+) is needed
+            start = bisect.bisect_left(log, (since.get(origin, -1) + 1,))
+            for clock, record in log[start:]:
+                if self.latest[record].get(origin) == clock:
+                    wanted[record] = None
+        records = []
+        for record in wanted:
+            fields = {field: state for field, state in self.records[record].items()
+                      if any(clock > since.get(origin, -1) for origin, clock in field_stamps(field, state))}
+            if fields:
+                records.append([record[0], record[1], fields])
+        return {"replica": self.id, "vector": dict(self.vector), "records": records}
+
+    def merge(self, delta: Dict[str, Any]) -> Set[Record]:
+        """Join a peer's delta into the state, returning the records whose values changed"""
+        changed: Set[Record] = set()
+        entries: Dict[str, list] = {}
+        for subject, topic, fields in delta["records"]:
+            record = (subject, topic)
+            mine = self.records.setdefault(record, {})
+            for field, state in fields.items():
+                old = mine.get(field)
+                merged = state if old is None else merge_field(field, old, state)
+                mine[field] = merged
+                self.dirty = self.dirty or merged != old
+                if old is None or field_value(field, old) != field_value(field, merged):
+                    changed.add(record)
+                for origin, clock in field_stamps(field, state):
+                    if clock > self.vector.get(origin, -1):
+                        self._note(record, origin, clock, entries)
+        # Everything new from an origin is newer than what its log holds, so appending keeps it sorted
+        for origin, new in entries.items():
+            new.sort(key=lambda entry: entry[0])
+            self.logs.setdefault(origin, []).extend(new)
+        for origin, clock in delta["vector"].items():
+            if clock > self.vector.get(origin, -1):
+                self.vector[origin] = clock
+                self.dirty = True
+        self.clock = max(self.clock, max(delta["vector"].values(), default=0))
+        return changed
+
+    def changes(self, subjects: Dict[str, Any], records: Iterable[Record] = None) -> List[Dict[str, Any]]:
+        """Mutation records that bring the data in line with the state (for ``records``, or all)"""
+        by_subject: Dict[str, List[Optional[str]]] = {}
+        for subject_name, topic in (self.records if records is None else records):
+            by_subject.setdefault(subject_name, []).append(topic)
+        ops = []
+        for subject_name, topics in by_subject.items():
+            if not self.alive((subject_name, None)):
+                if subject_name in subjects:
+                    ops.append({"op": "del_subject", "subject": subject_name})
+                continue
+            if subject_name not in subjects:
+                data = self.values((subject_name, None))
+                data["topics"] = {topic: self.values((subject_name, topic)) for subject, topic in self.records
+                                  if subject == subject_name and topic is not None
+                                  and self.alive((subject_name, topic))}
+                ops.append({"op": "add_subject", "subject": subject_name, "data": data})
+                continue
+            subject = subjects[subject_name]
+            for topic in topics:
+                record = (subject_name, topic)
+                values = self.values(record)
+                current = subject if topic is None else subject["topics"].get(topic)
+                if topic is not None and not self.alive(record):
+                    if current is not None:
+                        ops.append({"op": "del_topic", "subject": subject_name, "topic": topic})
+                elif current is None:
+                    ops.append({"op": "add_topic", "subject": subject_name, "topic": topic, "data": values})
+                else:
+                    fields = {field: value for field, value in values.items() if current.get(field) != value}
+                    if fields and topic is None:
+                        ops.append({"op": "set_subject", "subject": subject_name, "fields": fields})
+                    elif fields:
+                        ops.append({"op": "set_topic", "subject": subject_name, "topic": topic, "fields": fields})
+        return ops
+
+
+def encode_delta(delta: Dict[str, Any]) -> bytes:
+    """Compact wire form of a delta (zlib-compressed JSON)"""
+    return zlib.compress(json.dumps(delta, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_delta(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+def sync_pair(local, remote) -> Dict[str, Any]:
+    """Exchange deltas between two open StudyAssistants and apply the merged changes to both
+
+    The side that has synced before goes first, so a replica joining for
+    the first time starts from its peer's full state.
+    """
+    start = time.perf_counter()
+    sides = []
+    for assistant in (local, remote):
+        replica = Replica.open(assistant.data_file)
+        if replica.needs_apply():
+            assistant.apply_sync(replica.changes(assistant.subjects, replica.pending))
+        sides.append([assistant, replica, set()])
+    first, second = sorted(sides, key=lambda side: side[1].fresh)
+    first[2] |= first[1].reconcile(first[0].subjects, first[0].edits)
+    joined = b""
+    if second[1].fresh:
+        joined = encode_delta(first[1].export({}))
+        second[2] |= second[1].merge(decode_delta(joined))
+    second[2] |= second[1].reconcile(second[0].subjects, second[0].edits)
+
+    (_, local_replica, _), (_, remote_replica, _) = sides
+    sent = encode_delta(local_replica.export(remote_replica.vector))
+    received = encode_delta(remote_replica.export(local_replica.vector))
+    report = {"sent_bytes": len(sent) + (len(joined) if first is sides[0] else 0),
+              "received_bytes": len(received) + (len(joined) if first is sides[1] else 0)}
+    for side, payload, name in ((sides[1], sent, "remote"), (sides[0], received, "local")):
+        assistant, replica, changed = side
+        delta = decode_delta(payload)
+        report[f"{name}_records"] = len(delta["records"])
+        changed |= replica.merge(delta)
+        ops = replica.changes(assistant.subjects, None if replica.fresh else changed)
+        if replica.dirty or replica.fresh:
+            # The state is saved first; if the data is not written after it, the next sync re-applies
+            replica.pending = [(op["subject"], op.get("topic")) for op in ops]
+            replica.save()
+            assistant.apply_sync(ops)
+            replica.mark_applied()
+        report[f"{name}_changes"] = len(ops)
+    report["seconds"] = time.perf_counter() - start
+    return report
@@ -0,0 +1,680 @@
+import datetime
+import itertools
+import os
+import sys
+import time
+
+from dedup import split_compound
+from metrics import MENU_ACTIONS
+
+TIP_STAGES = {
+    "starting": "🚀 Just getting started! Here are some tips to build momentum:",
+    "steady": "👍 Good progress! Here are tips to maintain consistency:",
+    "final_push": "💪 You're doing great! Tips for the final push:",
+    "exam_ready": "🌟 Excellent progress! Tips for exam preparation:",
+}
+MENU = {
+    "1": "add_subject", "2": "add_topics", "3": "view_progress", "4": "start_revision", "5": "quiz_mode",
+    "6": "study_schedule", "7": "get_study_tips", "8": "view_statistics", "9": "delete_data",
+    "10": "search_menu", "11": "clean_up_topics",
+}
+QUIZ_VERDICTS = {
+    "excellent": "🌟 Excellent! You're well-prepared!",
+    "good": "👍 Good progress! Keep studying!",
+    "practice": "📚 Need more practice! Don't give up!",
+}
+
+
+class TerminalUI:
+    """The interactive menu on top of a StudyAssistant
+
+    Every screen reads and changes data only through the assistant's
+    operations, so a ``TraceRecorder`` attached to the assistant captures a
+    menu session in full; ``recorder`` (if given) is told where each menu
+    action starts, which splits the trace into sessions.
+    """
+
+    def __init__(self, assistant, recorder=None):
+        self.assistant = assistant
+        self.recorder = recorder
+        if assistant.instrumentation is not None:
+            assistant.instrumentation.instrument(self, MENU_ACTIONS)
+
+    def clear_screen(self):
+        """Clear the terminal screen"""
+        os.system('cls' if os.name == 'nt' else 'clear')
+    
+    def display_menu(self):
+        """Display main menu"""
+        print("\n" + "="*50)
+        print("🎓 AI STUDY ASSISTANT - EXAM REVISION HELPER")
+        print("="*50)
+        print("1. 📚 Add/Edit Subject")
+        print("2. 📝 Add Topics to Subject")
+        print("3. 📊 View Study Progress")
+        print("4. 🎯 Start Revision Session")
+        print("5. ❓ Quiz Mode")
+        print("6. 📅 Set Study Schedule")
+        print("7. 💡 Get Study Tips")
+        print("8. 📈 View Statistics")
+        print("9. 🗑️  Delete Subject/Topic")
+        print("10. 🔍 Search Topics")
+        print("11. 🧹 Clean Up Topics")
+        print("12. 🚪 Exit")
+        print("="*50)
+    
+    def add_subject(self):
+        """Add or edit a subject"""
+        print("\n📚 SUBJECT MANAGEMENT")
+        print("-" * 30) 
+        
+        if self.assistant.subjects:
+            print("Existing subjects:")
+            for i, subject in enumerate(self.assistant.subjects.keys(), 1):
+                print(f"{i}. {subject}")
+            print()
+        
+        subject_name = input("Enter subject name: ").strip()
+        if not subject_name:
+            print("❌ Subject name cannot be empty!")
+            return
+        
+        if subject_name not in self.assistant.subjects:
+            self.assistant.create_subject(subject_name)
+            print(f"✅ Subject '{subject_name}' added successfully!")
+        else:
+            print(f"📝 Editing existing subject '{subject_name}'")
+        
+        # Get additional details
+        exam_date = input("Enter exam date (YYYY-MM-DD) [optional]: ").strip()
+        if exam_date:
+            try: 
+                datetime.datetime.strptime(exam_date, "%Y-%m-%d")
+                self.assistant.update_subject(subject_name, exam_date=exam_date)
+            except ValueError:
+                print("⚠️ Invalid date format, skipping...")
+        
+        priority = input("Enter priority (high/medium/low) [medium]: ").strip().lower()
+        if priority in ["high", "medium", "low"]:
+            self.assistant.update_subject(subject_name, priority=priority)
+        
+        notes = input("Enter general notes [optional]: ").strip()
+        if notes:
+            self.assistant.update_subject(subject_name, notes=notes)
+        
+        self.assistant.save_data()
+        print("💾 Data saved successfully!")
+    
+    def add_topics(self):
+        """Add topics to a subject"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found! Please add a subject first.")
+            return
+        
+        print("\n📝 ADD TOPICS")
+        print("-" * 20)
+        
+        # Display subjects
+        subjects_list = list(self.assistant.subjects.keys())
+        for i, subject in enumerate(subjects_list, 1):
+            print(f"{i}. {subject}")
+        
+        try:
+            choice = int(input("\nSelect subject number: ")) - 1
+            if 0 <= choice < len(subjects_list):
+                subject_name = subjects_list[choice]
+            else:
+                print("❌ Invalid selection!")
+                return
+        except ValueError:
+            print("❌ Please enter a valid number!")
+            return
+        
+        print(f"\nAdding topics to: {subject_name}")
+        print("Enter topics one by one (press Enter with empty line to finish):")
+        
+        while True:
+            topic = input("Topic: ").strip()
+            if not topic:
+                break
+            
+            parts = split_compound(topic)
+            if len(parts) > 1:
+                print(f"✂️ That looks like {len(parts)} topics: {' | '.join(parts)}")
+                if input("Add them as separate topics? (y/n): ").strip().lower() != "y":
+                    parts = [topic]
+            
+            for part in parts:
+                if part in self.assistant.subjects[subject_name]["topics"]:
+                    print(f"⚠️ Topic '{part}' already exists!")
+                    continue
+                similar = self.assistant.similar_topics(subject_name, part)
+                if similar:
+                    print(f"⚠️ '{part}' looks like existing topic '{similar[0][0]}' ({similar[0][1]:.0%} similar)")
+                    if input("Add it anyway? (y/n): ").strip().lower() != "y":
+                        continue
+                self.assistant.create_topic(subject_name, part)
+                print(f"✅ Added: {part}")
+        
+        self.assistant.save_data()
+        print("💾 Topics saved successfully!")
+    
+    def view_progress(self):
+        """View study progress for all subjects, a page at a time"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        print("\n📊 STUDY PROGRESS OVERVIEW")
+        print("=" * 50)
+        
+        statuses, max_confidence = None, None
+        stream = self.assistant.progress.render(self.assistant.subjects,
+                                                self.assistant.statistics_report()["per_subject"])
+        while True:
+            page = list(itertools.islice(stream, self.assistant.progress.page_size))
+            if page:
+                sys.stdout.write("\n".join(page) + "\n")
+                sys.stdout.flush()
+            if len(page) < self.assistant.progress.page_size:
+                prompt = "\n[e N] expand, [c N] collapse, [f] filter, Enter to finish: "
+            else:
+                prompt = "\n[Enter] next page, [e N] expand, [c N] collapse, [f] filter, [q] quit: "
+            command = input(prompt).strip().lower()
+            if command == "q" or (not command and len(page) < self.assistant.progress.page_size):
+                return
+            if not command:
+                continue
+            
+            start = 0
+            if command == "f":
+                print("Statuses: 1. Not started  2. In progress  3. Completed")
+                chosen = input("Show statuses (e.g. 1,2; Enter for all): ").strip()
+                names = {"1": "not_started", "2": "in_progress", "3": "completed"}
+                statuses = {names[c.strip()] for c in chosen.split(",") if c.strip() in names} or None
+                threshold = input("Only confidence below (1-11, Enter for any): ").strip()
+                max_confidence = int(threshold) if threshold.isdigit() else None
+            elif command[:1] in ("e", "c") and command[1:].strip().isdigit():
+                number = int(command[1:].strip())
+                if not 1 <= number <= len(self.assistant.subjects):
+                    print("❌ Invalid subject number!")
+                    continue
+                self.assistant.progress.set_expanded(list(self.assistant.subjects)[number - 1], command[0] == "e")
+                start = number - 1
+            else:
+                print("❌ Invalid command!")
+                continue
+            stream = self.assistant.progress.render(self.assistant.subjects,
+                                                    self.assistant.statistics_report()["per_subject"], start,
+                                                    statuses, max_confidence)
+    
+    def start_revision(self):
+        """Start interactive revision session"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        print("\n🎯 REVISION SESSION")
+        print("-" * 25)
+        
+        # Select subject
+        subjects_list = list(self.assistant.subjects.keys())
+        for i, subject in enumerate(subjects_list, 1):
+            print(f"{i}. {subject}")
+        
+        try:
+            choice = int(input("\nSelect subject: ")) - 1
+            subject_name = subjects_list[choice]
+        except (ValueError, IndexError):
+            print("❌ Invalid selection!")
+            return
+        
+        topics = self.assistant.subjects[subject_name]["topics"]
+        if not topics:
+            print("❌ No topics found for this subject!")
+            return
+        
+        # Topics due for spaced-repetition review, soonest first
+        revision_topics = self.assistant.revision_queue(subject_name)
+        
+        if not revision_topics:
+            print("🎉 No topics are due for revision today! Great job!")
+            return
+        
+        print(f"\nStarting revision for: {subject_name}")
+        print(f"Topics to review: {len(revision_topics)}")
+        
+        for topic in revision_topics:
+            shown = time.monotonic()
+            print(f"\n📖 Studying: {topic}")
+            print(f"Current status: {topics[topic]['status']}")
+            print(f"Confidence level: {topics[topic]['confidence']}/10")
+            
+            if topics[topic]['notes']:
+                print(f"Notes: {topics[topic]['notes']}")
+            
+            # Interactive session
+            print("\nWhat would you like to do?")
+            print("1. Mark as completed")
+            print("2. Update confidence level")
+            print("3. Add notes")
+            print("4. Skip to next topic")
+            print("5. End session")
+            
+            action = input("Choose action (1-5): ").strip()
+            
+            if action == "1":
+                self.assistant.review_topic(subject_name, topic, "complete", duration=time.monotonic() - shown)
+                print("✅ Topic marked as completed!")
+            
+            elif action == "2":
+                try:
+                    confidence = int(input("Enter confidence level (1-10): "))
+                    if 1 <= confidence <= 10:
+                        self.assistant.review_topic(subject_name, topic, "confidence", confidence=confidence,
+                                          duration=time.monotonic() - shown)
+                        print(f"✅ Confidence updated to {confidence}/10")
+                    else:
+                        print("❌ Please enter a number between 1-10")
+                except ValueError:
+                    print("❌ Please enter a valid number")
+            
+            elif action == "3":
+                note = input("Enter your notes: ").strip()
+                self.assistant.review_topic(subject_name, topic, "notes", notes=note)
+                print("✅ Notes added!")
+            
+            elif action == "4":
+                continue
+            
+            elif action == "5":
+                break
+            
+            # Update last studied
+            self.assistant.log_study_session(subject_name)
+        
+        self.assistant.save_data()
+        print("💾 Session saved! Great work! 🎉")
+    
+    def quiz_mode(self):
+        """Interactive quiz mode"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        print("\n❓ QUIZ MODE")
+        print("-" * 15)
+        
+        # Select subject
+        subjects_list = list(self.assistant.subjects.keys())
+        print("0. All subjects")
+        for i, subject in enumerate(subjects_list, 1):
+            print(f"{i}. {subject}")
+        
+        try:
+            choice = int(input("\nSelect subject: ")) - 1
+            subject_name = subjects_list[choice] if choice >= 0 else None
+        except (ValueError, IndexError):
+            print("❌ Invalid selection!")
+            return
+        
+        questions = self.assistant.quiz_questions(subject_name)
+        if not questions:
+            print("❌ No topics found for this subject!")
+            return
+        
+        print(f"\n🎯 Quiz on: {subject_name or 'All subjects'}")
+        print("I'll focus on your weakest and least recently reviewed topics. Rate your understanding!")
+        
+        ratings = []
+        
+        for i, (question_subject, topic) in enumerate(questions):
+            shown = time.monotonic()
+            print(f"\nQuestion {i+1}: Explain '{topic}'")
+            
+            input("Press Enter when you've thought about it...")
+            
+            understanding = input("How well do you understand this topic? (1-10): ").strip()
+            try:
+                rating = int(understanding)
+                if 1 <= rating <= 10:
+                    ratings.append(rating)
+                    # Update topic data
+                    self.assistant.record_quiz_rating(question_subject, topic, rating, time.monotonic() - shown)
+                    
+                    print(f"✅ Recorded: {rating}/10")
+                else:
+                    print("❌ Please enter 1-10")
+            except ValueError:
+                print("❌ Invalid input")
+        
+        result = self.assistant.quiz_score(ratings, len(questions))
+        print(f"\n🏆 Quiz Complete!")
+        print(f"Average Score: {result['average']:.1f}/10")
+        print(QUIZ_VERDICTS[result["verdict"]])
+        
+        self.assistant.save_data()
+    
+    def study_schedule(self):
+        """Set study schedule and reminders"""
+        print("\n📅 STUDY SCHEDULE")
+        print("-" * 20)
+        
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        plan = self.assistant.study_plan()
+        if not plan["subjects"]:
+            print("❌ No upcoming exams with open topics! Set exam dates in Add/Edit Subject.")
+            return
+        
+        print(f"Upcoming exams (daily study time: {plan['daily_minutes']} minutes):")
+        
+        for entry in plan["subjects"]:
+            print(f"\n📚 {entry['subject']} ({entry['days_left']} days left, {entry['priority']} priority)")
+            print(f"Study time still needed: {entry['remaining_minutes'] / 60:.1f} hours")
+            
+            if entry["unplanned_minutes"]:
+                print(f"⚠️ Warning: {entry['unplanned_minutes'] / 60:.1f} hours won't fit before the exam!")
+            else:
+                print(f"✅ On track to finish by {entry['finishes_on']}")
+        
+        print("\n📆 Your next 7 days:")
+        for day in plan["days"]:
+            print(f"\n{day['date']} ({day['minutes']} min)")
+            for session in day["sessions"]:
+                print(f"  • {session['subject']}: {session['topic']} ({session['minutes']} min)")
+            if not day["sessions"]:
+                print("  Free day 🎉")
+    
+    def get_study_tips(self):
+        """Provide AI-generated study tips"""
+        advice = self.assistant.study_tips()
+        
+        print("\n💡 AI STUDY TIPS")
+        print("-" * 20)
+        
+        # Show personalized tips based on user's data
+        if advice["completion_rate"] is not None:
+            print(f"📊 Your current completion rate: {advice['completion_rate']:.1f}%")
+            print(TIP_STAGES[advice["stage"]])
+        
+        for i, tip in enumerate(advice["tips"], 1):
+            print(f"{i}. {tip}")
+        
+        print("\n🎯 Remember: Consistency is key to success!")
+    
+    def view_statistics(self):
+        """View detailed statistics"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        print("\n📈 STUDY STATISTICS")
+        print("=" * 30)
+        
+        total_subjects = len(self.assistant.subjects)
+        summary = self.assistant.statistics_report()
+        total_topics = summary["topics"]
+        completed_topics = summary["completed"]
+        in_progress_topics = summary["in_progress"]
+        
+        print(f"📚 Total Subjects: {total_subjects}")
+        print(f"📝 Total Topics: {total_topics}")
+        print(f"✅ Completed Topics: {completed_topics}")
+        print(f"🟡 In Progress Topics: {in_progress_topics}")
+        print(f"🔴 Not Started Topics: {total_topics - completed_topics - in_progress_topics}")
+        
+        if total_topics > 0:
+            completion_percentage = summary["completion_rate"]
+            print(f"📊 Overall Completion: {completion_percentage:.1f}%")
+        
+        # Subject-wise breakdown
+        print("\n📊 Subject-wise Progress:")
+        for subject_name, figures in summary["per_subject"].items():
+            if figures["topics"]:
+                print(f"  {subject_name}: {figures['completed']}/{figures['topics']} "
+                      f"({figures['completion_rate']:.1f}%)")
+        
+        # Study streak
+        print(f"\n📅 Total Study Sessions: {summary['sessions']}")
+        
+        # Confidence analysis
+        avg_confidence = summary["average_confidence"]
+        if avg_confidence is not None:
+            print(f"🎯 Average Confidence: {avg_confidence:.1f}/10")
+        
+        histogram = summary["confidence_histogram"]
+        if histogram is not None:
+            print("\n📊 Confidence Distribution:")
+            for level, count in enumerate(histogram):
+                if count:
+                    print(f"  {level:>2}/10: {count}")
+        
+        # Recent activity from the study history
+        recent = [day for day in self.assistant.history_report(14) if day["events"]]
+        if recent:
+            print("\n📅 Last 14 Days:")
+            for day in recent:
+                rating = f", avg rating {day['average_rating']:.1f}" if day["average_rating"] else ""
+                print(f"  {day['start']}: {day['topics']} topics, {day['minutes']:g} min{rating}")
+    
+    def delete_data(self):
+        """Delete subjects or topics"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        print("\n🗑️ DELETE DATA")
+        print("-" * 15)
+        print("1. Delete a subject")
+        print("2. Delete a topic")
+        print("3. Cancel")
+        
+        choice = input("Choose option (1-3): ").strip()
+        
+        if choice == "1":
+            subjects_list = list(self.assistant.subjects.keys())
+            for i, subject in enumerate(subjects_list, 1):
+                print(f"{i}. {subject}")
+            
+            try:
+                selection = int(input("Select subject to delete: ")) - 1
+                subject_name = subjects_list[selection]
+                
+                confirm = input(f"Are you sure you want to delete '{subject_name}'? (yes/no): ").strip().lower()
+                if confirm == "yes":
+                    self.assistant.remove_subject(subject_name)
+                    self.assistant.save_data()
+                    print(f"✅ Subject '{subject_name}' deleted!")
+                else:
+                    print("❌ Deletion cancelled.")
+            except (ValueError, IndexError):
+                print("❌ Invalid selection!")
+        
+        elif choice == "2":
+            self.delete_topics_menu()
+        
+        elif choice == "3":
+            print("Operation cancelled.")
+    
+    def delete_topics_menu(self):
+        """Delete one topic, or every topic matching a rule"""
+        print("\n1. Delete one topic")
+        print("2. Delete all topics matching a rule")
+        mode = input("Choose option (1-2): ").strip()
+        
+        subjects_list = list(self.assistant.subjects.keys())
+        print("\n0. All subjects" if mode == "2" else "")
+        for i, subject in enumerate(subjects_list, 1):
+            print(f"{i}. {subject}")
+        try:
+            selection = int(input("Select subject: ")) - 1
+            if selection < 0 and mode != "2":
+                raise IndexError
+            subject_name = subjects_list[selection] if selection >= 0 else None
+        except (ValueError, IndexError):
+            print("❌ Invalid selection!")
+            return
+        
+        if mode == "1":
+            topic = input("Topic to delete: ").strip()
+            if topic not in self.assistant.subjects[subject_name]["topics"]:
+                print(f"❌ Topic '{topic}' not found in {subject_name}!")
+                return
+            matches = [(subject_name, topic)]
+        elif mode == "2":
+            print("Leave a question empty to ignore it.")
+            status = input("Status (1. Not started  2. In progress  3. Completed): ").strip()
+            confidence = input("Confidence at least (0-10): ").strip()
+            days = input("Not reviewed in the last N days: ").strip()
+            try:
+                matches = self.assistant.find_topics(
+                    subject_name,
+                    {"1": "not_started", "2": "in_progress", "3": "completed"}.get(status),
+                    int(confidence) if confidence else None,
+                    int(days) if days else None)
+            except ValueError as e:
+                print(f"❌ {e}")
+                return
+        else:
+            print("❌ Invalid choice!")
+            return
+        
+        if not matches:
+            print("❌ No topics match!")
+            return
+        print(f"\n{len(matches):,} topic(s) will be deleted:")
+        for match_subject, topic in matches[:10]:
+            print(f"  • {match_subject}: {topic}")
+        if len(matches) > 10:
+            print(f"  ... and {len(matches) - 10:,} more")
+        confirm = input("Are you sure? (yes/no): ").strip().lower()
+        if confirm == "yes":
+            print(f"✅ Deleted {self.assistant.delete_topics(matches):,} topic(s)!")
+        else:
+            print("❌ Deletion cancelled.")
+    
+    def clean_up_topics(self):
+        """Split compound topics, merge near-duplicates and add topics listed in the notes"""
+        if not self.assistant.subjects:
+            print("❌ No subjects found!")
+            return
+        
+        print("\n🧹 CLEAN UP TOPICS")
+        print("-" * 20)
+        subjects_list = list(self.assistant.subjects.keys())
+        for i, subject in enumerate(subjects_list, 1):
+            print(f"{i}. {subject}")
+        try:
+            subject_name = subjects_list[int(input("\nSelect subject: ")) - 1]
+        except (ValueError, IndexError):
+            print("❌ Invalid selection!")
+            return
+        
+        changed = False
+        for topic, parts in self.assistant.duplicate_report(subject_name)["compound"].items():
+            print(f"\n✂️ '{topic}' looks like {len(parts)} topics:")
+            for part in parts:
+                print(f"  • {part}")
+            if input("Split it? (y/n): ").strip().lower() == "y":
+                result = self.assistant.split_topic(subject_name, topic)
+                print(f"✅ Added {len(result['added'])} topic(s)"
+                      + (f", {len(result['existing'])} already existed" if result["existing"] else ""))
+                changed = True
+        
+        report = self.assistant.duplicate_report(subject_name)
+        for group in report["groups"]:
+            print("\n👯 These topics look like duplicates:")
+            for i, topic in enumerate(group, 1):
+                print(f"  {i}. {topic}")
+            keep = input("Number of the one to keep (Enter to leave them): ").strip()
+            if not keep:
+                continue
+            try:
+                keep_topic = group[int(keep) - 1]
+            except (ValueError, IndexError):
+                print("❌ Invalid selection!")
+                continue
+            self.assistant.merge_topics(subject_name, keep_topic, group)
+            print(f"✅ Merged into '{keep_topic}'")
+            changed = True
+        
+        if report["from_notes"]:
+            print("\n📝 Listed in the subject notes but not added as topics:")
+            for part in report["from_notes"]:
+                print(f"  • {part}")
+            if input("Add them? (y/n): ").strip().lower() == "y":
+                added = self.assistant.add_topic_list(subject_name, report["from_notes"])["added"]
+                print(f"✅ Added {len(added)} topic(s)")
+                changed = True
+        
+        if not changed and not report["groups"]:
+            print("✨ No compound or duplicate topics found!")
+    
+    def search_menu(self):
+        """Find subjects and topics by name or notes"""
+        print("\n🔍 SEARCH")
+        print("-" * 10)
+        
+        query = input("Search for (words, prefixes or a near spelling): ").strip()
+        if not query:
+            print("❌ Search text cannot be empty!")
+            return
+        
+        results = self.assistant.search_topics(query)
+        if not results:
+            print("❌ No matching subjects or topics found!")
+            return
+        
+        print(f"\nFound {len(results)} match(es):")
+        for i, result in enumerate(results, 1):
+            if result["topic"] is None:
+                notes = self.assistant.subjects[result["subject"]]["notes"]
+                print(f"{i}. 📚 {result['subject']}")
+            else:
+                topic = self.assistant.subjects[result["subject"]]["topics"][result["topic"]]
+                notes = topic["notes"]
+                print(f"{i}. 📝 {result['subject']} → {result['topic']} ({topic['status'].replace('_', ' ')})")
+            if notes:
+                print(f"   📝 {notes[:80]}")
+    
+    def close(self):
+        """Close the assistant, then finish the trace being recorded (if any)"""
+        self.assistant.close()
+        if self.recorder is not None:
+            self.recorder.close()
+    
+    def run(self):
+        """Main application loop"""
+        print("🎓 Welcome to AI Study Assistant!")
+        print("Your intelligent companion for exam preparation!")
+        
+        while True:
+            try:
+                self.display_menu()
+                choice = input("\nEnter your choice (1-12): ").strip()
+                
+                if choice == "12":
+                    self.close()
+                    print("\n🎉 Thanks for using AI Study Assistant!")
+                    print("Good luck with your exams! 📚✨")
+                    break
+                action = MENU.get(choice)
+                if action is None:
+                    print("❌ Invalid choice! Please enter 1-12.")
+                else:
+                    if self.recorder is not None:
+                        self.recorder.begin(action)
+                    getattr(self, action)()
+                
+                input("\nPress Enter to continue...")
+                
+            except KeyboardInterrupt:
+                self.close()
+                print("\n\n👋 Goodbye! Study hard and succeed!")
+                break
+            except Exception as e:
+                print(f"❌ An error occurred: {e}")
+                input("Press Enter to continue...")
@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cohort import analyze_cohort, student_files  # noqa: E402
+from storage import migrate_storage, read_subjects  # noqa: E402
+
+SUBJECTS = {
+    "Physics": {"exam_date": "2099-06-01", "priority": "high", "total_sessions": 2, "last_studied": "",
+                "notes": "", "topics": {
+                    "Optics": {"status": "completed", "confidence": 8, "study_time": 30,
+                               "last_reviewed": "2024-01-02", "notes": "", "difficulty": "medium"},
+                    "Waves": {"status": "not_started", "confidence": 0, "study_time": 0,
+                              "last_reviewed": "", "notes": "", "difficulty": "hard"}}},
+    "History": {"exam_date": "2099-07-01", "priority": "low", "total_sessions": 0, "last_studied": "",
+                "notes": "", "topics": {}},
+}
+
+
+class ShardedCohortTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for student in ("alice", "bob"):
+            os.makedirs(os.path.join(self.tmp.name, student))
+            with open(os.path.join(self.tmp.name, student, "study_data.json"), "w", encoding="utf-8") as f:
+                json.dump(SUBJECTS, f)
+        migrate_storage(os.path.join(self.tmp.name, "alice", "study_data.json"), "journal", "sharded")
+
+    def test_shard_files_are_not_students(self):
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "alice", "study_data.shards", "manifest.json")))
+        found = sorted(os.path.relpath(path, self.tmp.name) for path in student_files(self.tmp.name))
+        self.assertEqual(found, [os.path.join("alice", "study_data.json"), os.path.join("bob", "study_data.json")])
+
+    def test_sharded_cohort_has_no_failures(self):
+        report = analyze_cohort(self.tmp.name, workers=1, backend="sharded", progress_every=0)
+        self.assertEqual((report["students"], report["failed_count"]), (2, 0))
+
+    def test_analysis_writes_nothing(self):
+        carol = os.path.join(self.tmp.name, "carol", "study_data.json")
+        os.makedirs(os.path.dirname(carol))
+        with open(carol, "w", encoding="utf-8") as f:
+            json.dump(SUBJECTS, f)
+        migrate_storage(carol, "journal", "sqlite")
+        # A torn journal record, which opening the journal backend would cut off
+        with open(os.path.join(self.tmp.name, "bob", "study_data.json.journal"), "wb") as f:
+            f.write(b'0badc0de {"op":"del_subject"')
+
+        def listing():
+            return {os.path.join(root, name): os.path.getsize(os.path.join(root, name))
+                    for root, _, names in os.walk(self.tmp.name) for name in names}
+
+        before = listing()
+        for backend in ("journal", "json", "sqlite", "sharded"):
+            report = analyze_cohort(self.tmp.name, workers=1, backend=backend, progress_every=0)
+            self.assertEqual((report["students"], report["failed_count"]), (3, 0), backend)
+            self.assertEqual(listing(), before, backend)
+        self.assertEqual(read_subjects(carol, "sqlite"), SUBJECTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
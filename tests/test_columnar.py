@@ -0,0 +1,50 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import dict_summary, np  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+@unittest.skipIf(np is None, "the columnar mode needs numpy")
+class ColumnarSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def edited(self, columnar: bool) -> StudyAssistant:
+        """An assistant with the same data and the same edits applied"""
+        assistant = StudyAssistant(os.path.join(self.tmp.name, f"columnar_{columnar}.json"), columnar=columnar)
+        self.addCleanup(assistant.close)
+        assistant.today = datetime.date(2030, 3, 1)
+        for subject, exam_date in (("Physics", "2030-06-01"), ("History", "2030-04-01"), ("Art", "")):
+            assistant.save_subject(subject, exam_date, "medium")
+            assistant.add_topic_list(subject, [f"Topic {i}" for i in range(6)])
+        assistant.update_topic("Physics", "Topic 1", study_time=45)
+        assistant.update_topic("History", "Topic 2", study_time=30)
+        self.assertEqual(assistant.summary()["topics"], 18)  # cached before the edits below
+
+        assistant.remove_topic("Physics", "Topic 1")
+        assistant.record_quiz_rating("Physics", "Topic 2", 9)
+        assistant.record_quiz_rating("History", "Topic 0", 4)
+        assistant.review_topic("History", "Topic 2", "confidence", confidence=6)
+        assistant.log_study_session("History")
+        assistant.remove_subject("Art")
+        return assistant
+
+    def test_columnar_and_aggregate_summaries_are_equal(self):
+        columnar, aggregates = self.edited(True), self.edited(False)
+        summary = aggregates.summary()
+        self.assertEqual(columnar.summary(), summary)
+        self.assertEqual(summary, dict_summary(aggregates.subjects, aggregates._now()))
+        self.assertEqual(summary["confidence_histogram"][9], 1)
+        self.assertEqual(summary["per_subject"]["History"]["study_time"], 30)
+        self.assertNotIn("Art", summary["per_subject"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dedup  # noqa: E402
+from dedup import MinHasher, NearDuplicateIndex, shingles, similarity, split_compound  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+class NearDuplicateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = NearDuplicateIndex(MinHasher())
+        self.names = ["Newton's Laws of Motion", "newtons laws of motion", "Newtons Law of Motion",
+                      "Thermodynamics", "Thermodynamic", "Organic chemistry part 1", "Organic chemistry part 2",
+                      "Optics"] + [f"Unrelated topic {i}" for i in range(200)]
+        for name in self.names:
+            self.index.add(name)
+
+    def test_near_duplicates_are_grouped(self):
+        self.assertEqual(similarity("Chapter 1", "Chapter 2"), 0.0)
+        self.assertEqual(similarity("Newton's Laws of Motion", "NEWTON'S LAWS OF MOTION."), 1.0)
+        groups = self.index.groups()
+        self.assertIn(["Newton's Laws of Motion", "Newtons Law of Motion", "newtons laws of motion"], groups)
+        self.assertIn(["Thermodynamic", "Thermodynamics"], groups)
+        self.assertFalse(any("Organic chemistry part 1" in group or "Optics" in group for group in groups))
+
+    def test_lookups_compare_only_band_candidates(self):
+        self.index.comparisons = 0
+        found = self.index.similar("Thermodynamcs")
+        self.assertEqual([name for name, _ in found], ["Thermodynamics", "Thermodynamic"])
+        self.assertLess(self.index.comparisons, len(self.names) // 4)
+
+        self.index.remove("Thermodynamic")
+        self.assertEqual([name for name, _ in self.index.similar("Thermodynamcs")], ["Thermodynamics"])
+
+    @unittest.skipIf(dedup.np is None, "compares against the numpy signatures")
+    def test_pure_python_signatures_match_numpy(self):
+        hashes = shingles("Electromagnetic induction")
+        fast = MinHasher().signature(hashes)
+        with mock.patch.object(dedup, "np", None):
+            self.assertEqual(MinHasher().signature(hashes), fast)
+
+
+class DuplicateTopicsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.assistant = StudyAssistant(os.path.join(self.tmp.name, "study_data.json"))
+        self.addCleanup(self.assistant.close)
+        self.assistant.save_subject("Physics", "2030-06-01", "high", notes="Electromagnetism, Waves, Nuclear physics")
+        self.assistant.add_topic_list("Physics", ["Electromagnetism", "Electromagnetsm",
+                                                  "Kinematics, Waves; Heat", "Atoms"])
+
+    def test_report_finds_duplicates_compounds_and_missing_topics(self):
+        self.assertEqual([name for name, _ in self.assistant.similar_topics("Physics", "electromagnetism!")],
+                         ["Electromagnetism", "Electromagnetsm"])
+        report = self.assistant.duplicate_report("Physics")
+        self.assertEqual(report["groups"], [["Electromagnetism", "Electromagnetsm"]])
+        self.assertEqual(report["compound"], {"Kinematics, Waves; Heat": ["Kinematics", "Waves", "Heat"]})
+        self.assertEqual(report["from_notes"], ["Nuclear physics"])
+
+    def test_split_topic_keeps_progress_on_the_new_parts(self):
+        self.assertEqual(split_compound("Laws and motion"), ["Laws and motion"])
+        self.assistant.update_topic("Physics", "Kinematics, Waves; Heat", confidence=6, study_time=40)
+        self.assistant.add_topic_list("Physics", ["Heat"])
+        self.assertEqual(self.assistant.split_topic("Physics", "Kinematics, Waves; Heat"),
+                         {"added": ["Kinematics", "Waves"], "existing": ["Heat"]})
+        topics = self.assistant.subjects["Physics"]["topics"]
+        self.assertNotIn("Kinematics, Waves; Heat", topics)
+        self.assertEqual([(topics[t]["confidence"], topics[t]["study_time"]) for t in ("Kinematics", "Waves")],
+                         [(6, 40), (6, 0)])
+        # The index follows the split: the new parts are found, the old name is gone
+        self.assertEqual(self.assistant.similar_topics("Physics", "Kinematcs")[0][0], "Kinematics")
+        self.assertEqual(self.assistant.duplicate_report("Physics")["compound"], {})
+        with self.assertRaises(ValueError):
+            self.assistant.split_topic("Physics", "Atoms")
+
+
+if __name__ == "__main__":
+    unittest.main()
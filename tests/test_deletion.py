@@ -0,0 +1,79 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from study_assistant import StudyAssistant  # noqa: E402
+
+TODAY = datetime.date(2030, 3, 31)
+
+
+class PredicateDeleteTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def open(self, backend: str) -> StudyAssistant:
+        assistant = StudyAssistant(os.path.join(self.tmp.name, backend, "study_data.json"), backend)
+        assistant.today = TODAY
+        return assistant
+
+    def fill(self, backend: str):
+        os.makedirs(os.path.join(self.tmp.name, backend))
+        assistant = self.open(backend)
+        assistant.save_subject("Physics", "2030-06-01", "high")
+        assistant.save_subject("Archive", "", "low")
+        assistant.add_topic_list("Physics", ["Optics", "Waves", "Heat", "Atoms", "Fields"])
+        assistant.add_topic_list("Archive", ["Old notes", "Past paper"])
+        assistant.update_topic("Physics", "Optics", status="completed", confidence=9, last_reviewed="2030-01-05")
+        assistant.update_topic("Physics", "Waves", status="completed", confidence=10, last_reviewed="2030-03-29")
+        assistant.update_topic("Physics", "Heat", status="completed", confidence=8, last_reviewed="2030-01-05")
+        assistant.update_topic("Physics", "Atoms", status="in_progress", confidence=9, last_reviewed="2030-01-05")
+        assistant.update_topic("Physics", "Fields", notes="magnetic flux")
+        assistant.save_data()
+        return assistant
+
+    def test_completed_confident_stale_topics_are_deleted(self):
+        for backend in ("journal", "sqlite"):
+            with self.subTest(backend=backend):
+                assistant = self.fill(backend)
+                matches = assistant.find_topics("Physics", status="completed", min_confidence=9, stale_days=30)
+                self.assertEqual(matches, [("Physics", "Optics")])
+                self.assertEqual(assistant.find_topics(status="not_started"), [
+                    ("Physics", "Fields"), ("Archive", "Old notes"), ("Archive", "Past paper")])
+
+                self.assertEqual(assistant.delete_topics(matches + [("Physics", "Gone")]), 1)
+                self.assertEqual(assistant.find_topics("Physics", status="completed", min_confidence=9,
+                                                       stale_days=30), [])
+                self.assertEqual(assistant.stats.verify(assistant.subjects), [])
+                self.assertEqual(assistant.summary()["completed"], 2)
+                assistant.close()
+
+                assistant = self.open(backend)
+                self.assertEqual(list(assistant.subjects["Physics"]["topics"]), ["Waves", "Heat", "Atoms", "Fields"])
+                assistant.close()
+
+    def test_every_topic_of_a_subject_is_deleted(self):
+        assistant = self.fill("journal")
+        self.assertEqual(assistant.delete_topics(assistant.find_topics("Archive")), 2)
+        self.assertEqual(assistant.find_topics("Archive"), [])
+        self.assertEqual(assistant.summary()["per_subject"]["Archive"]["topics"], 0)
+        self.assertEqual([hit["topic"] for hit in assistant.search_topics("flux")], ["Fields"])
+        self.assertEqual(assistant.search_topics("paper"), [])
+        assistant.close()
+
+    def test_bad_predicates_are_rejected(self):
+        assistant = self.fill("journal")
+        self.addCleanup(assistant.close)
+        for criteria in ({"status": "done"}, {"min_confidence": 11}, {"stale_days": -1}):
+            with self.assertRaises(ValueError):
+                assistant.find_topics(**criteria)
+        with self.assertRaises(KeyError):
+            assistant.find_topics("Chemistry")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from importer import BulkImporter  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+class BatchedJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_file = os.path.join(self.tmp.name, "study_data.json")
+        self.syllabus = os.path.join(self.tmp.name, "syllabus.csv")
+        with open(self.syllabus, "w", encoding="utf-8") as f:
+            f.write("subject,topic,confidence\n")
+            for i in range(1000):
+                f.write(f"Subject {i % 5},Topic {i},{i % 11}\n")
+
+    def test_batches_reach_the_journal_before_the_final_save(self):
+        assistant = StudyAssistant(self.data_file)
+        held, journaled = [], []
+        spill_data = assistant.spill_data
+
+        def spill():
+            spill_data()
+            held.append(len(assistant.store.pending))
+            journaled.append(assistant.store.journal_bytes)
+
+        assistant.spill_data = spill
+        report = BulkImporter(assistant, batch_size=100).run(self.syllabus)
+        assistant.close()
+
+        self.assertEqual(report["imported"], 1000)
+        self.assertEqual(len(held), 10)
+        self.assertEqual(set(held), {0})
+        self.assertEqual(journaled, sorted(journaled))
+        self.assertGreater(journaled[0], 0)
+
+        reopened = StudyAssistant(self.data_file)
+        self.assertEqual(reopened.summary()["topics"], 1000)
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from storage import JournalStorage, apply_op  # noqa: E402
+
+
+def topic(confidence: int = 0) -> dict:
+    return {"status": "not_started", "confidence": confidence, "study_time": 0, "last_reviewed": "",
+            "notes": "", "difficulty": "medium"}
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_file = os.path.join(self.tmp.name, "study_data.json")
+        self.journal_file = self.data_file + ".journal"
+
+    def open(self, **options) -> JournalStorage:
+        store = JournalStorage(self.data_file, use_cache=False, **options)
+        store.load()
+        return store
+
+    def record(self, store: JournalStorage, *ops):
+        for op in ops:
+            apply_op(store.subjects, op)
+            store.record(op)
+
+    def write_topics(self, count: int):
+        """A journal (never compacted) holding one subject and count topics, one flush each"""
+        store = self.open(min_compact_bytes=1 << 30)
+        self.record(store, {"op": "add_subject", "subject": "Physics", "data": {
+            "topics": {}, "exam_date": "", "priority": "medium", "total_sessions": 0,
+            "last_studied": "", "notes": ""}})
+        for i in range(count):
+            self.record(store, {"op": "add_topic", "subject": "Physics", "topic": f"Topic {i}", "data": topic(i)})
+            store.flush()
+        self.assertFalse(os.path.exists(self.data_file))
+
+    def test_torn_last_record_is_dropped_and_truncated(self):
+        self.write_topics(3)
+        intact = os.path.getsize(self.journal_file)
+        with open(self.journal_file, "ab") as f:
+            f.write(b'0badc0de {"op":"add_topic","subject":"Phys')
+
+        store = self.open()
+        self.assertEqual(list(store.subjects["Physics"]["topics"]), ["Topic 0", "Topic 1", "Topic 2"])
+        self.assertEqual(os.path.getsize(self.journal_file), intact)
+
+        # Appends after recovery are not hidden behind the torn record
+        self.record(store, {"op": "set_topic", "subject": "Physics", "topic": "Topic 0", "fields": {"confidence": 9}})
+        store.flush()
+        self.assertEqual(self.open().subjects["Physics"]["topics"]["Topic 0"]["confidence"], 9)
+
+    def test_record_with_a_bad_checksum_ends_the_replay(self):
+        self.write_topics(3)
+        with open(self.journal_file, "rb") as f:
+            lines = f.readlines()
+        lines[2] = lines[2].replace(b'"confidence":1', b'"confidence":7')
+        with open(self.journal_file, "wb") as f:
+            f.writelines(lines)
+
+        store = self.open()
+        self.assertEqual(list(store.subjects["Physics"]["topics"]), ["Topic 0"])
+        self.assertEqual(os.path.getsize(self.journal_file), len(lines[0]) + len(lines[1]))
+
+    def test_compaction_folds_the_journal_into_the_snapshot(self):
+        self.write_topics(5)
+        store = self.open(min_compact_bytes=1)
+        self.record(store, {"op": "del_topic", "subject": "Physics", "topic": "Topic 1"},
+                    {"op": "set_topic", "subject": "Physics", "topic": "Topic 2", "fields": {"notes": "kept"}})
+        store.flush()
+        store.wait_compaction()
+
+        # The journal was rotated away and the rotated copy removed once the snapshot was written
+        self.assertFalse(os.path.exists(self.journal_file))
+        self.assertFalse(os.path.exists(store.rotated_file))
+        with open(self.data_file, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot, store.subjects)
+        self.assertNotIn("Topic 1", snapshot["Physics"]["topics"])
+        self.assertEqual(snapshot["Physics"]["topics"]["Topic 2"]["notes"], "kept")
+        self.assertEqual(self.open().subjects, snapshot)
+
+    def test_records_written_during_compaction_survive_a_reload(self):
+        self.write_topics(3)
+        store = self.open(min_compact_bytes=1)
+        started, release = threading.Event(), threading.Event()
+        save_json = storage._save_json
+
+        def slow_save(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return save_json(*args, **kwargs)
+
+        with mock.patch("storage._save_json", slow_save):
+            self.record(store, {"op": "del_topic", "subject": "Physics", "topic": "Topic 0"})
+            store.flush()
+            self.assertTrue(started.wait(5))
+            # The snapshot is still being written while these are recorded and flushed
+            self.record(store, {"op": "add_topic", "subject": "Physics", "topic": "Topic 3", "data": topic(3)},
+                        {"op": "set_topic", "subject": "Physics", "topic": "Topic 1", "fields": {"notes": "late"}})
+            store.flush()
+            self.assertTrue(store.compaction.is_alive())
+            release.set()
+            store.wait_compaction()
+
+        reloaded = self.open().subjects["Physics"]["topics"]
+        self.assertEqual(list(reloaded), ["Topic 1", "Topic 2", "Topic 3"])
+        self.assertEqual(reloaded["Topic 1"]["notes"], "late")
+
+    def test_tombstones_trigger_compaction(self):
+        self.write_topics(4)
+        store = self.open(min_compact_bytes=1 << 30, max_tombstones=2)
+        self.record(store, {"op": "del_topic", "subject": "Physics", "topic": "Topic 0"})
+        store.flush()
+        self.assertFalse(os.path.exists(self.data_file))
+        self.record(store, {"op": "del_topic", "subject": "Physics", "topic": "Topic 3"})
+        store.flush()
+        store.wait_compaction()
+        with open(self.data_file, encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)["Physics"]["topics"]), ["Topic 1", "Topic 2"])
+
+    def test_interrupted_compaction_is_finished_on_load(self):
+        self.write_topics(2)
+        # As if the process stopped after rotating the journal, before the snapshot was written
+        shutil.move(self.journal_file, self.journal_file + ".old")
+        store = self.open(min_compact_bytes=1 << 30)
+        self.record(store, {"op": "add_topic", "subject": "Physics", "topic": "Topic 2", "data": topic(2)})
+        store.flush()
+
+        self.assertFalse(os.path.exists(self.journal_file + ".old"))
+        self.assertEqual(list(self.open().subjects["Physics"]["topics"]), ["Topic 0", "Topic 1", "Topic 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Level, Status, from_json_schema, to_json_schema  # noqa: E402
+
+SUBJECTS = {
+    "Physics": {"exam_date": "2030-06-01", "priority": "high", "total_sessions": 3, "last_studied": "",
+                "notes": "lab on Fridays", "colour": "blue", "topics": {
+                    "Optics": {"status": "completed", "confidence": 8, "study_time": 30,
+                               "last_reviewed": "2030-01-02", "notes": "", "difficulty": "easy"},
+                    "Waves": {"status": "paused", "confidence": 0, "study_time": 0,
+                              "last_reviewed": "2030-1-2", "notes": "", "difficulty": "medium",
+                              "source": "chapter 4"}}},
+}
+
+
+class RoundTripTest(unittest.TestCase):
+    def test_json_schema_round_trip_is_lossless(self):
+        compact = from_json_schema(copy.deepcopy(SUBJECTS))
+        self.assertEqual(to_json_schema(compact), SUBJECTS)
+
+    def test_known_labels_are_encoded(self):
+        physics = from_json_schema(copy.deepcopy(SUBJECTS))["Physics"]
+        optics, waves = physics.topics["Optics"], physics.topics["Waves"]
+        self.assertEqual((physics.priority, optics.status, optics.difficulty),
+                         (Level.HIGH, Status.COMPLETED, Level.LOW))
+        self.assertIsInstance(optics.last_reviewed, int)
+        # Unknown labels and non-canonical dates are kept verbatim
+        self.assertEqual((waves.status, waves.last_reviewed), ("paused", "2030-1-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+class DaysLeftTest(unittest.TestCase):
+    def test_every_view_counts_the_same_days_left(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            assistant = StudyAssistant(os.path.join(tmp, "study_data.json"))
+            assistant.today = datetime.date(2030, 3, 1)
+            for name, exam_date in (("Physics", "2030-03-02"), ("History", "2030-04-15")):
+                assistant.save_subject(name, exam_date, "high")
+                assistant.add_topic_list(name, ["Intro", "Review"])
+            schedule = {entry["subject"]: entry["days_left"] for entry in assistant.schedule_report()}
+            outlook = {entry["subject"]: entry["days_left"] for entry in assistant.study_plan()["subjects"]}
+            assistant.close()
+        self.assertEqual(outlook, schedule)
+
+
+if __name__ == "__main__":
+    unittest.main()
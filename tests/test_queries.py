@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from queries import QueryCache  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+class QueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.cache = QueryCache()
+
+    def get(self, query: str, subject: str = None, **options):
+        def compute():
+            self.calls.append((query, subject))
+            return len(self.calls)
+        return self.cache.get(query, subject, compute, **options)
+
+    def test_daily_entries_expire_when_the_date_changes(self):
+        rollovers = []
+        self.cache.on_rollover(lambda: rollovers.append(True))
+        self.get("days_left", "Physics", daily=True)
+        self.get("figures", "Physics")
+        self.assertEqual(len(self.calls), 2)
+
+        self.cache.today -= 1  # as if both were computed yesterday
+        self.get("days_left", "Physics", daily=True)
+        self.get("figures", "Physics")
+        self.assertEqual(self.calls[2:], [("days_left", "Physics")])
+        self.assertEqual(rollovers, [True])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.max_entries = 2
+        self.get("a")
+        self.get("b")
+        self.get("a")
+        self.get("c")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.get("a")
+        self.get("b")
+        self.assertEqual(self.calls, [("a", None), ("b", None), ("c", None), ("b", None)])
+
+
+class InvalidationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.assistant = StudyAssistant(os.path.join(self.tmp.name, "study_data.json"))
+        self.addCleanup(self.assistant.close)
+        for subject in ("Physics", "History"):
+            self.assistant.save_subject(subject, "2030-06-01", "high")
+            self.assistant.add_topic_list(subject, ["Topic 0", "Topic 1"])
+
+    def cached(self, query: str, subject: str = None) -> bool:
+        return any(key[0] == query and key[1] == subject for key in self.assistant.queries.entries)
+
+    def test_a_topic_change_drops_only_its_subjects_entries(self):
+        physics = self.assistant.subject_figures("Physics")
+        self.assistant.subject_figures("History")
+        self.assistant.revision_queue("History")
+        self.assistant.update_topic("Physics", "Topic 0", status="completed")
+
+        self.assertFalse(self.cached("figures", "Physics"))
+        self.assertTrue(self.cached("figures", "History"))
+        self.assertTrue(self.cached("revision_queue", "History"))
+        self.assertEqual(self.assistant.subject_figures("Physics")["completed"], physics["completed"] + 1)
+
+    def test_exam_date_and_sessions_drop_the_summary(self):
+        self.assistant.summary()
+        self.assistant.update_subject("History", notes="kept")
+        self.assertTrue(self.cached("summary"))
+
+        self.assistant.update_subject("History", exam_date="2030-07-01")
+        self.assertFalse(self.cached("summary"))
+        self.assistant.summary()
+        self.assistant.log_study_session("Physics")
+        self.assertFalse(self.cached("summary"))
+        self.assertEqual(self.assistant.summary()["sessions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
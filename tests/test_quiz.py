@@ -0,0 +1,62 @@
+import collections
+import datetime
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz import QuizSampler  # noqa: E402
+from storage import apply_op  # noqa: E402
+
+TODAY = datetime.date(2030, 3, 10).toordinal()
+
+
+def topic(confidence: int) -> dict:
+    return {"status": "in_progress", "confidence": confidence, "study_time": 0, "last_reviewed": "2030-03-09",
+            "notes": "", "difficulty": "medium"}
+
+
+class QuizSamplerTest(unittest.TestCase):
+    def setUp(self):
+        self.subjects = {
+            "Physics": {"priority": "medium", "topics": {"Optics": topic(1), "Waves": topic(9), "Heat": topic(5)}},
+            "History": {"priority": "medium", "topics": {"Rome": topic(1), "Egypt": topic(10)}},
+        }
+        self.sampler = QuizSampler(seed=7)
+
+    def draws(self, rounds: int, count: int = 1, subject: str = None) -> collections.Counter:
+        counts = collections.Counter()
+        for _ in range(rounds):
+            counts.update(topic for _, topic in self.sampler.sample(self.subjects, subject, count, TODAY))
+        return counts
+
+    def test_no_topic_repeats_within_a_draw(self):
+        for _ in range(50):
+            drawn = self.sampler.sample(self.subjects, None, 4, TODAY)
+            self.assertEqual(len(drawn), 4)
+            self.assertEqual(len(set(drawn)), 4)
+        # Asking for more than there is returns every topic once
+        self.assertEqual(sorted(self.sampler.sample(self.subjects, "Physics", 10, TODAY)),
+                         [("Physics", "Heat"), ("Physics", "Optics"), ("Physics", "Waves")])
+
+    def test_weaker_topics_are_drawn_more_often(self):
+        counts = self.draws(2000)
+        self.assertGreater(counts["Optics"], counts["Heat"])
+        self.assertGreater(counts["Heat"], counts["Waves"])
+        self.assertGreater(counts["Rome"], 4 * counts["Egypt"])
+        # The same seed gives the same draws
+        self.sampler = QuizSampler(seed=7)
+        self.assertEqual(self.draws(2000), counts)
+
+    def test_answers_shift_the_weights(self):
+        self.draws(1, subject="Physics")  # builds the pool
+        op = {"op": "set_topic", "subject": "Physics", "topic": "Optics", "fields": {"confidence": 10}}
+        self.sampler.on_change(self.subjects, op, apply_op(self.subjects, op))
+        counts = self.draws(2000, subject="Physics")
+        self.assertGreater(counts["Heat"], counts["Optics"])
+        self.assertGreater(counts["Waves"], counts["Optics"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import TraceRecorder, replay_trace  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name in ("source", "recorded", "replayed"):
+            os.makedirs(os.path.join(self.tmp.name, name))
+        source = os.path.join(self.tmp.name, "source", "study_data.json")
+        assistant = StudyAssistant(source)
+        assistant.save_subject("Physics", "2030-06-01", "high")
+        assistant.add_topic_list("Physics", [f"Topic {i}" for i in range(8)])
+        assistant.close()
+        for name in ("recorded", "replayed"):
+            shutil.copyfile(source, os.path.join(self.tmp.name, name, "study_data.json"))
+
+    def test_replay_matches_including_history_on_the_pinned_date(self):
+        trace = os.path.join(self.tmp.name, "trace.jsonl")
+        assistant = StudyAssistant(os.path.join(self.tmp.name, "recorded", "study_data.json"))
+        assistant.today = datetime.date(2030, 3, 1)
+        recorder = TraceRecorder(assistant, trace, seed=1)
+        recorder.begin("revision")
+        for i, topic in enumerate(assistant.revision_queue("Physics")[:5]):
+            assistant.review_topic("Physics", topic, "confidence", confidence=i + 3, duration=60)
+        assistant.log_study_session("Physics")
+        assistant.save_data()
+        recorder.begin("quiz")
+        for subject, topic in assistant.quiz_questions("Physics"):
+            assistant.record_quiz_rating(subject, topic, 7, 30)
+        history = assistant.history_report(7)
+        recorder.close()
+        assistant.close()
+        # Events are stamped on the pinned date, not the day the test runs
+        self.assertEqual(history[-1]["start"], "2030-03-01")
+        self.assertGreater(history[-1]["events"], 5)
+
+        assistant = StudyAssistant(os.path.join(self.tmp.name, "replayed", "study_data.json"))
+        report = replay_trace(assistant, trace)
+        assistant.close()
+        self.assertEqual(report["mismatches"], 0, report["examples"])
+        self.assertEqual(report["sessions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
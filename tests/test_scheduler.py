@@ -0,0 +1,73 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import RevisionScheduler  # noqa: E402
+from storage import apply_op  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+TODAY = datetime.date(2030, 3, 10)
+
+
+def topic(confidence: int, last_reviewed: str) -> dict:
+    return {"status": "in_progress", "confidence": confidence, "study_time": 0, "last_reviewed": last_reviewed,
+            "notes": "", "difficulty": "medium"}
+
+
+class RevisionSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.subjects = {"Physics": {"topics": {
+            "Optics": topic(6, "2030-03-01"),   # due 2030-03-06
+            "Waves": topic(3, "2030-03-08"),    # due 2030-03-09
+            "Heat": topic(9, "2030-03-09"),     # due in May
+            "Atoms": topic(0, ""),              # never reviewed: due now
+            "Fields": topic(2, ""),
+        }}}
+        self.scheduler = RevisionScheduler()
+        self.scheduler.rebuild(self.subjects)
+
+    def due(self, limit: int = None):
+        return [name for _, name in self.scheduler.next_due(limit, "Physics", TODAY.toordinal())]
+
+    def review(self, name: str, **fields):
+        op = {"op": "set_topic", "subject": "Physics", "topic": name, "fields": fields}
+        old = apply_op(self.subjects, op)
+        self.scheduler.on_change(self.subjects, op, old)
+
+    def test_due_topics_soonest_first_and_limit_takes_a_prefix(self):
+        self.assertEqual(self.due(), ["Atoms", "Fields", "Optics", "Waves"])
+        self.assertEqual(self.due(2), ["Atoms", "Fields"])
+        # Taking a prefix leaves the queue as it was
+        self.assertEqual(self.due(), ["Atoms", "Fields", "Optics", "Waves"])
+
+    def test_reviews_reorder_the_queue(self):
+        self.review("Atoms", confidence=8, last_reviewed="2030-03-10")
+        self.review("Waves", confidence=1, last_reviewed="2030-03-02")
+        self.review("Heat", last_reviewed="2029-01-01")
+        self.assertEqual(self.due(), ["Fields", "Heat", "Waves", "Optics"])
+        self.assertEqual(self.due(1), ["Fields"])
+
+
+class RevisionQueueTest(unittest.TestCase):
+    def test_limited_queue_follows_reviews(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            assistant = StudyAssistant(os.path.join(tmp, "study_data.json"))
+            assistant.today = TODAY
+            assistant.save_subject("Physics", "2030-06-01", "high")
+            assistant.add_topic_list("Physics", [f"Topic {i}" for i in range(5)])
+            assistant.scheduler.topics_scanned = 0
+            self.assertEqual(assistant.revision_queue("Physics", 2), ["Topic 0", "Topic 1"])
+            # Only the two topics returned came off the heap
+            self.assertEqual(assistant.scheduler.topics_scanned, 2)
+            assistant.review_topic("Physics", "Topic 0", "confidence", confidence=9)
+            self.assertEqual(assistant.revision_queue("Physics", 2), ["Topic 1", "Topic 2"])
+            self.assertEqual(assistant.revision_queue("Physics"), ["Topic 1", "Topic 2", "Topic 3", "Topic 4"])
+            assistant.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import SearchIndex, content_digest  # noqa: E402
+
+
+def subjects() -> dict:
+    return {
+        "Physics": {"notes": "", "topics": {
+            "Optics": {"notes": "lenses and mirrors"},
+            "Waves": {"notes": "interference"},
+            "Magnetism": {"notes": "magnetic flux"},
+        }},
+        "History": {"notes": "essay practice", "topics": {"Rome": {"notes": "republic"}}},
+    }
+
+
+def found(index: SearchIndex, query: str, subject_name: str = None) -> list:
+    return [(hit["subject"], hit["topic"]) for hit in index.search(query, subject_name=subject_name)]
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.subjects = subjects()
+        self.index = SearchIndex()
+        self.index.rebuild(self.subjects)
+
+    def test_one_typo_matches_through_deletion_variants(self):
+        for query in ("optcs", "opitcs", "obtics", "opticks"):
+            with self.subTest(query=query):
+                self.assertEqual(found(self.index, query), [("Physics", "Optics")])
+        self.assertEqual(found(self.index, "interferense"), [("Physics", "Waves")])
+        # Two edits away, or too short to risk a typo match
+        self.assertEqual(found(self.index, "optx"), [])
+        self.assertEqual(found(self.index, "rme"), [])
+
+    def test_exact_matches_outrank_prefixes_and_every_term_must_match(self):
+        self.assertEqual(found(self.index, "magnet"), [("Physics", "Magnetism")])
+        hits = self.index.search("magnetic")
+        self.assertEqual([hit["score"] for hit in hits], [1.0])
+        self.assertEqual(found(self.index, "physics flux"), [("Physics", "Magnetism")])
+        self.assertEqual(found(self.index, "essay"), [("History", None)])
+        self.assertEqual(found(self.index, "mirrors", "History"), [])
+
+    def test_changes_reindex_the_topic(self):
+        op = {"op": "set_topic", "subject": "History", "topic": "Rome", "fields": {"notes": "empire"}}
+        old = dict(self.subjects["History"]["topics"]["Rome"])
+        self.subjects["History"]["topics"]["Rome"]["notes"] = "empire"
+        self.index.on_change(self.subjects, op, old)
+        self.assertEqual(found(self.index, "empire"), [("History", "Rome")])
+        self.assertEqual(found(self.index, "republic"), [])
+
+
+class SidecarTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "study_data.json.search")
+        self.subjects = subjects()
+        index = SearchIndex()
+        index.rebuild(self.subjects)
+        index.save(self.path, self.subjects)
+
+    def test_a_current_sidecar_is_loaded(self):
+        index = SearchIndex.load(self.path, self.subjects, content_digest(self.subjects))
+        self.assertEqual(found(index, "mirrors"), [("Physics", "Optics")])
+        self.assertEqual(found(index, "magnetc"), [("Physics", "Magnetism")])
+
+    def test_index_is_rebuilt_after_a_digest_mismatch(self):
+        # The data changed after the sidecar was written
+        self.subjects["Physics"]["topics"]["Heat"] = {"notes": "entropy"}
+        self.subjects["History"]["topics"]["Rome"]["notes"] = "empire"
+        index = SearchIndex.load(self.path, self.subjects)
+        self.assertEqual(found(index, "entropy"), [("Physics", "Heat")])
+        self.assertEqual(found(index, "empire"), [("History", "Rome")])
+        self.assertEqual(found(index, "republic"), [])
+
+    def test_a_corrupt_sidecar_is_rebuilt(self):
+        with open(self.path, "r+b") as f:
+            f.seek(-4, os.SEEK_END)
+            f.write(b"\x00\x00\x00\x00")
+        index = SearchIndex.load(self.path, self.subjects)
+        self.assertEqual(found(index, "mirrors"), [("Physics", "Optics")])
+
+
+if __name__ == "__main__":
+    unittest.main()
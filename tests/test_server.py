@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import StudyService, UserStores  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+
+def subjects_on_disk(data_dir: str, user_id: str):
+    assistant = StudyAssistant(os.path.join(data_dir, user_id, "study_data.json"))
+    try:
+        return sorted(assistant.subjects)
+    finally:
+        assistant.close()
+
+
+class EvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_write_queued_behind_an_eviction_is_kept(self):
+        async def scenario():
+            users = UserStores(self.tmp.name, max_users=1)
+            await users.run("u1", lambda assistant: assistant.save_subject("t1"))
+            # While a slow u1 request runs and a u1 write waits behind it, opening u2 evicts u1
+            await asyncio.gather(users.run("u1", lambda assistant: time.sleep(0.2)),
+                                 users.run("u1", lambda assistant: assistant.save_subject("t2")),
+                                 users.run("u2", lambda assistant: assistant.save_subject("other")))
+            await asyncio.gather(*users.evictions)
+            # Acknowledged writes must already be on disk, not only after a clean shutdown
+            on_disk = subjects_on_disk(self.tmp.name, "u1")
+            await users.close()
+            return on_disk
+
+        self.assertEqual(asyncio.run(scenario()), ["t1", "t2"])
+        self.assertEqual(subjects_on_disk(self.tmp.name, "u1"), ["t1", "t2"])
+        self.assertEqual(subjects_on_disk(self.tmp.name, "u2"), ["other"])
+
+    def test_user_with_a_queued_request_is_not_evicted(self):
+        async def scenario():
+            users = UserStores(self.tmp.name, max_users=1)
+            await users.run("u1", lambda assistant: assistant.save_subject("t1"))
+            first = users.cache["u1"]
+            results = await asyncio.gather(
+                users.run("u1", lambda assistant: time.sleep(0.2) or assistant),
+                users.run("u2", lambda assistant: assistant.save_subject("other")),
+                users.run("u1", lambda assistant: assistant))
+            await users.close()
+            return first, results
+
+        first, results = asyncio.run(scenario())
+        self.assertIs(results[0], first)
+        self.assertIs(results[2], first)
+        self.assertEqual(subjects_on_disk(self.tmp.name, "u1"), ["t1"])
+
+    def test_evicted_user_reopens_with_its_data(self):
+        async def scenario():
+            users = UserStores(self.tmp.name, max_users=1)
+            for i in range(5):
+                await users.run("u1", lambda assistant, i=i: assistant.save_subject(f"a{i}"))
+                await users.run("u2", lambda assistant, i=i: assistant.save_subject(f"b{i}"))
+            await users.close()
+
+        asyncio.run(scenario())
+        self.assertEqual(subjects_on_disk(self.tmp.name, "u1"), [f"a{i}" for i in range(5)])
+        self.assertEqual(subjects_on_disk(self.tmp.name, "u2"), [f"b{i}" for i in range(5)])
+
+
+class QuizAnswerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def answer(self, answers):
+        async def scenario():
+            service = StudyService(self.tmp.name)
+            await service.dispatch("POST", "/users/u1/subjects", json.dumps({"name": "Physics"}).encode())
+            await service.dispatch("POST", "/users/u1/subjects/Physics/topics",
+                                   json.dumps({"topics": ["A", "B"]}).encode())
+            status, _ = await service.dispatch("POST", "/users/u1/subjects/Physics/quiz",
+                                               json.dumps({"answers": answers}).encode())
+            topics = dict(service.users.cache["u1"].subjects["Physics"]["topics"])
+            await service.users.close()
+            return status, topics
+
+        status, topics = asyncio.run(scenario())
+        with open(os.path.join(self.tmp.name, "u1", "study_data.json"), encoding="utf-8") as f:
+            return status, topics, json.load(f)["Physics"]["topics"]
+
+    def test_a_bad_answer_changes_nothing(self):
+        for bad in ({"topic": "B", "rating": "x"}, {"topic": "B", "rating": True}, {"topic": "B", "rating": 11},
+                    {"topic": "missing", "rating": 5}):
+            status, in_memory, on_disk = self.answer([{"topic": "A", "rating": 9}, bad])
+            self.assertIn(status, (400, 404), bad)
+            for topics in (in_memory, on_disk):
+                self.assertEqual((topics["A"]["confidence"], topics["A"]["status"]), (0, "not_started"), bad)
+
+    def test_valid_answers_are_all_recorded(self):
+        status, _, on_disk = self.answer([{"topic": "A", "rating": 9}, {"topic": "B", "rating": 4}])
+        self.assertEqual(status, 200)
+        self.assertEqual((on_disk["A"]["confidence"], on_disk["B"]["confidence"]), (9, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import migrate_storage  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+
+TODAY = datetime.date(2030, 3, 10)
+
+
+class SQLiteQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        journal = os.path.join(self.tmp.name, "journal", "study_data.json")
+        os.makedirs(os.path.dirname(journal))
+        assistant = StudyAssistant(journal)
+        assistant.today = datetime.date(2030, 3, 1)
+        for subject, exam_date in (("Physics", "2030-06-01"), ("History", "2030-04-01"), ("Art", "")):
+            assistant.save_subject(subject, exam_date, "high")
+            assistant.add_topic_list(subject, [f"Topic {i}" for i in range(12)])
+        for i in range(8):
+            assistant.review_topic("Physics", f"Topic {i}", "confidence", confidence=i + 2)
+            assistant.update_topic("History", f"Topic {i}", difficulty="hard")
+            assistant.record_quiz_rating("History", f"Topic {i}", 10 - i)
+        assistant.review_topic("Art", "Topic 3", "complete")
+        assistant.close()
+        self.sqlite = os.path.join(self.tmp.name, "sqlite", "study_data.json")
+        os.makedirs(os.path.dirname(self.sqlite))
+        shutil.copyfile(journal, self.sqlite)
+        migrate_storage(self.sqlite, "journal", "sqlite")
+        self.journal = journal
+
+    def open(self, data_file: str, backend: str) -> StudyAssistant:
+        assistant = StudyAssistant(data_file, backend)
+        assistant.today = TODAY
+        return assistant
+
+    def test_queries_match_the_journal_backend(self):
+        journal, sqlite = self.open(self.journal, "journal"), self.open(self.sqlite, "sqlite")
+        self.addCleanup(journal.close)
+        self.addCleanup(sqlite.close)
+        for assistant in (journal, sqlite):
+            assistant.review_topic("Physics", "Topic 9", "confidence", confidence=4)
+            assistant.remove_topic("History", "Topic 11")
+        for subject in ("Physics", "History", "Art"):
+            self.assertEqual(sqlite.revision_queue(subject), journal.revision_queue(subject), subject)
+            self.assertEqual(sqlite.store.incomplete_topics(subject), journal.store.incomplete_topics(subject))
+            self.assertEqual(sqlite.store.status_counts(subject), journal.store.status_counts(subject))
+        self.assertEqual(sqlite.store.status_counts(), journal.store.status_counts())
+        self.assertEqual(sqlite.schedule_report(), journal.schedule_report())
+        self.assertEqual(sqlite.summary(), journal.summary())
+
+    def test_startup_and_queries_read_no_topics(self):
+        self.open(self.sqlite, "sqlite").close()  # saves the search index
+        assistant = self.open(self.sqlite, "sqlite")
+        due = assistant.revision_queue("Physics")
+        schedule = assistant.schedule_report()
+        figures = assistant.summary()["per_subject"]["History"]
+        self.assertEqual(assistant.store.shards_loaded, 0)
+        self.assertIn("Topic 8", due)
+        self.assertEqual([row["subject"] for row in schedule], ["History", "Physics"])
+        self.assertEqual(figures["topics"], 12)
+
+        assistant.review_topic("Physics", "Topic 8", "confidence", confidence=9)
+        self.assertNotIn("Topic 8", assistant.revision_queue("Physics"))
+        self.assertEqual(assistant.store.shards_loaded, 1)
+        assistant.close()
+        assistant = self.open(self.sqlite, "sqlite")
+        self.addCleanup(assistant.close)
+        self.assertNotIn("Topic 8", assistant.revision_queue("Physics"))
+        self.assertEqual(assistant.store.shards_loaded, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
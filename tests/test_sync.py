@@ -0,0 +1,185 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import TOPIC_FIELDS  # noqa: E402
+from study_assistant import StudyAssistant  # noqa: E402
+from sync import Replica  # noqa: E402
+
+
+def plain(data_file: str):
+    assistant = StudyAssistant(data_file)
+    try:
+        return {name: dict(subject, topics={topic: dict(fields) for topic, fields in subject["topics"].items()})
+                for name, subject in assistant.subjects.items()}
+    finally:
+        assistant.close()
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.laptop, self.phone = self.copy("laptop"), self.copy("phone")
+        for data_file in (self.laptop, self.phone):
+            assistant = StudyAssistant(data_file)
+            for subject in ("Physics", "History"):
+                assistant.save_subject(subject, "2030-06-01", "high")
+                assistant.add_topic_list(subject, [f"Topic {i}" for i in range(6)])
+            assistant.close()
+        self.sync(self.laptop, self.phone)
+
+    def copy(self, name: str) -> str:
+        os.makedirs(os.path.join(self.tmp.name, name))
+        return os.path.join(self.tmp.name, name, "study_data.json")
+
+    @staticmethod
+    def sync(data_file: str, other: str):
+        assistant = StudyAssistant(data_file)
+        try:
+            return assistant.sync_with(other)
+        finally:
+            assistant.close()
+
+    def test_diverged_copies_converge(self):
+        laptop, phone = StudyAssistant(self.laptop), StudyAssistant(self.phone)
+        laptop.log_study_session("Physics")
+        laptop.log_study_session("Physics")
+        phone.log_study_session("Physics")
+        laptop.update_topic("Physics", "Topic 0", notes="from the laptop\nshared")
+        time.sleep(0.01)
+        phone.update_topic("Physics", "Topic 0", notes="shared\nfrom the phone")
+        laptop.update_topic("Physics", "Topic 1", last_reviewed="2030-03-01")
+        phone.update_topic("Physics", "Topic 1", last_reviewed="2030-01-01")
+        laptop.remove_topic("Physics", "Topic 2")
+        phone.update_topic("Physics", "Topic 3", confidence=9)
+        phone.create_topic("History", "Only on the phone")
+        for assistant in (laptop, phone):
+            assistant.save_data()
+            assistant.close()
+
+        self.sync(self.laptop, self.phone)
+        merged = plain(self.laptop)
+        self.assertEqual(merged, plain(self.phone))
+        physics = merged["Physics"]
+        self.assertEqual(physics["total_sessions"], 3)
+        self.assertEqual(set(physics["topics"]["Topic 0"]["notes"].splitlines()),
+                         {"from the laptop", "shared", "from the phone"})
+        self.assertEqual(physics["topics"]["Topic 1"]["last_reviewed"], "2030-03-01")
+        self.assertNotIn("Topic 2", physics["topics"])
+        self.assertEqual(physics["topics"]["Topic 3"]["confidence"], 9)
+        self.assertIn("Only on the phone", merged["History"]["topics"])
+
+        report = self.sync(self.laptop, self.phone)
+        self.assertEqual((report["local_changes"], report["remote_changes"]), (0, 0))
+
+    def test_synced_records_keep_the_schema_field_order(self):
+        phone = StudyAssistant(self.phone)
+        phone.create_topic("History", "New", notes="read chapter 2", source="library")
+        phone.update_topic("Physics", "Topic 4", confidence=6, notes="again")
+        phone.close()
+        self.sync(self.laptop, self.phone)
+
+        with open(self.laptop, encoding="utf-8") as f:
+            laptop = json.load(f)
+        with open(self.phone, encoding="utf-8") as f:
+            phone = json.load(f)
+        for subject in ("History", "Physics"):
+            for topic, fields in laptop[subject]["topics"].items():
+                self.assertEqual(list(fields), list(phone[subject]["topics"][topic]), topic)
+        self.assertEqual(list(laptop["History"]["topics"]["New"]), list(TOPIC_FIELDS) + ["source"])
+
+    def test_three_copies_converge_under_random_edits(self):
+        tablet = self.copy("tablet")
+        copies = [self.laptop, self.phone, tablet]
+        rng = random.Random(3)
+        for step in range(20):
+            data_file = rng.choice(copies)
+            assistant = StudyAssistant(data_file)
+            for _ in range(rng.randint(1, 6)):
+                if not assistant.subjects:
+                    assistant.save_subject("Fresh", "2031-01-01", "low")
+                    continue
+                subject = rng.choice(list(assistant.subjects))
+                topics = list(assistant.subjects[subject]["topics"])
+                choice = rng.random()
+                if choice < 0.3 and topics:
+                    assistant.update_topic(subject, rng.choice(topics), confidence=rng.randint(1, 10))
+                elif choice < 0.5 and topics:
+                    assistant.update_topic(subject, rng.choice(topics), notes=rng.choice(["a", "b\na", "", "c"]))
+                elif choice < 0.65:
+                    assistant.log_study_session(subject)
+                elif choice < 0.8:
+                    topic = f"Topic {rng.randint(0, 20)}"
+                    if topic not in topics:
+                        assistant.create_topic(subject, topic)
+                elif choice < 0.9 and topics:
+                    assistant.remove_topic(subject, rng.choice(topics))
+                else:
+                    assistant.update_subject(subject, notes=rng.choice(["n1", "n2\nn1", ""]))
+            assistant.save_data()
+            if rng.random() < 0.5:
+                assistant.sync_with(rng.choice([other for other in copies if other != data_file]))
+            assistant.close()
+        for _ in range(2):
+            for data_file, other in zip(copies, copies[1:] + copies[:1]):
+                self.sync(data_file, other)
+
+        states = [plain(data_file) for data_file in copies]
+        self.assertEqual(states[0], states[1])
+        self.assertEqual(states[0], states[2])
+        for data_file in copies:
+            assistant = StudyAssistant(data_file)
+            self.assertEqual(assistant.stats.verify(assistant.subjects), [])
+            assistant.close()
+
+    def test_interrupted_sync_is_finished_by_the_next_one(self):
+        phone = StudyAssistant(self.phone)
+        phone.update_topic("Physics", "Topic 0", confidence=7, notes="from the phone")
+        phone.create_topic("Physics", "New on the phone")
+        phone.close()
+
+        laptop = StudyAssistant(self.laptop)
+
+        def crash(ops):
+            raise SystemExit("interrupted")
+
+        laptop.apply_sync = crash
+        with self.assertRaises(SystemExit):
+            laptop.sync_with(self.phone)
+        laptop.close()
+        self.assertNotIn("New on the phone", plain(self.laptop)["Physics"]["topics"])
+
+        self.sync(self.laptop, self.phone)
+        merged = plain(self.laptop)
+        self.assertEqual(merged, plain(self.phone))
+        self.assertEqual(merged["Physics"]["topics"]["Topic 0"]["confidence"], 7)
+        self.assertIn("New on the phone", merged["Physics"]["topics"])
+
+
+
+class ExportTest(unittest.TestCase):
+    def test_export_sends_only_fields_stamped_after_the_vector(self):
+        replica = Replica(os.path.join(tempfile.gettempdir(), "study_data.json"))
+        for i, when in enumerate((5, 6, 9, 12)):
+            replica.write(("Physics", f"Topic {i}"), "confidence", i, when=when)
+        replica.write(("Physics", "Topic 0"), "notes", "again", when=20)
+
+        def exported(since):
+            return [(topic, sorted(fields)) for _, topic, fields in replica.export(since)["records"]]
+
+        self.assertEqual(exported({replica.id: 9}), [("Topic 3", ["confidence"]), ("Topic 0", ["notes"])])
+        self.assertEqual(exported({replica.id: 8}), [("Topic 2", ["confidence"]), ("Topic 3", ["confidence"]),
+                                                    ("Topic 0", ["notes"])])
+        self.assertEqual(exported({replica.id: 20}), [])
+        self.assertEqual(len(exported({})), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
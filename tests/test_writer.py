@@ -0,0 +1,122 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import Storage  # noqa: E402
+from writer import WriteBehind  # noqa: E402
+
+
+class BatchStorage(Storage):
+    """Keeps recorded ops in memory; each flush moves them into ``batches``
+
+    While ``gate`` is cleared, the write half of a flush waits for it.
+    """
+
+    def __init__(self):
+        super().__init__("unused.json")
+        self.pending = []
+        self.batches = []
+        self.closed = False
+        self.writing = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def record(self, op):
+        self.pending.append(op)
+
+    def prepare_flush(self):
+        batch, self.pending = self.pending, []
+
+        def write():
+            self.writing.set()
+            self.gate.wait(5)
+            if batch:
+                self.batches.append(batch)
+        return write
+
+    def flush(self):
+        self.prepare_flush()()
+
+    def close(self):
+        self.flush()
+        self.closed = True
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class WriteBehindTest(unittest.TestCase):
+    def start(self, **options) -> WriteBehind:
+        self.store = BatchStorage()
+        self.lock = threading.Lock()
+        writer = WriteBehind(self.store, self.lock, **options)
+        self.addCleanup(writer.close)
+        return writer
+
+    def save(self, writer: WriteBehind, *ops):
+        """What StudyAssistant does for a change followed by save_data"""
+        for op in ops:
+            with self.lock:
+                self.store.record(op)
+                writer.note(op)
+        writer.mark_dirty()
+
+    @staticmethod
+    def op(i: int) -> dict:
+        return {"op": "set_topic", "subject": "Physics", "topic": f"Topic {i}", "fields": {"confidence": 5}}
+
+    def test_saves_coalesce_into_one_flush_at_the_byte_threshold(self):
+        size = len(repr(self.op(0)))
+        writer = self.start(interval=60, max_pending_bytes=5 * size)
+        for i in range(4):
+            self.save(writer, self.op(i))
+        time.sleep(0.1)
+        self.assertEqual((writer.flushes, self.store.batches), (0, []))
+
+        self.save(writer, self.op(4))
+        self.assertTrue(wait_for(lambda: writer.flushes == 1))
+        self.assertEqual(self.store.batches, [[self.op(i) for i in range(5)]])
+        self.assertEqual(writer.pending_bytes, 0)
+
+    def test_flushes_once_saves_pause_for_the_interval(self):
+        writer = self.start(interval=0.25, max_pending_bytes=1 << 30)
+        started = time.monotonic()
+        self.save(writer, self.op(0))
+        time.sleep(0.05)
+        self.save(writer, self.op(1))  # pushes the deadline back
+        self.assertTrue(wait_for(lambda: writer.flushes == 1))
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        self.assertEqual(self.store.batches, [[self.op(0), self.op(1)]])
+
+    def test_close_flushes_pending_changes(self):
+        writer = self.start(interval=60, max_pending_bytes=1 << 30)
+        self.save(writer, self.op(0), self.op(1))
+        writer.close()
+        self.assertEqual(self.store.batches, [[self.op(0), self.op(1)]])
+        self.assertTrue(self.store.closed)
+        self.assertFalse(writer.thread.is_alive())
+
+    def test_changes_made_during_a_flush_are_not_lost(self):
+        writer = self.start(interval=0.01, max_pending_bytes=1 << 30)
+        self.store.gate.clear()
+        self.save(writer, self.op(0))
+        self.assertTrue(self.store.writing.wait(5))
+        # The flush is writing outside the lock; changes and saves go on meanwhile
+        self.save(writer, self.op(1), self.op(2))
+        self.store.gate.set()
+        self.assertTrue(wait_for(lambda: writer.flushes == 2))
+        self.assertEqual(self.store.batches, [[self.op(0)], [self.op(1), self.op(2)]])
+
+
+if __name__ == "__main__":
+    unittest.main()
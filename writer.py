@@ -0,0 +1,109 @@
+import atexit
+import threading
+import time
+from typing import Dict, Any
+
+from storage import Storage
+
+
+class WriteBehind:
+    """Background thread that makes a storage backend's saves durable
+
+    ``save_data`` only marks the state dirty; the thread flushes once no
+    save has arrived for ``interval`` seconds (but at most ``max_delay``
+    seconds after the first unflushed save), or straight away once roughly
+    ``max_pending_bytes`` of changes are waiting. Saves in between coalesce
+    into one flush.
+
+    Mutations and the capture half of a flush both hold ``lock``, so the
+    backend never sees a half-applied change. The capture is cheap (pending
+    records, or a marshal copy when a snapshot is due) and the encoding,
+    writing and fsync happen after the lock is released, so the interactive
+    thread does not wait on disk I/O however large the data grows.
+
+    ``close`` stops the thread and flushes whatever is left; it is also
+    registered with atexit so a pending flush survives an unexpected exit.
+    """
+
+    def __init__(self, store: Storage, lock, interval: float = 1.0, max_delay: float = None,
+                 max_pending_bytes: int = 256 * 1024):
+        self.store = store
+        self.lock = lock
+        self.interval = interval
+        self.max_delay = max_delay if max_delay is not None else 5 * interval
+        self.max_pending_bytes = max_pending_bytes
+        self.pending_bytes = 0
+        self.first_dirty = None
+        self.last_dirty = None
+        self.flushes = 0
+        self.error = None
+        self.closed = False
+        self.wakeup = threading.Condition()
+        self.io_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def note(self, op: Dict[str, Any]):
+        """Count a recorded mutation towards the byte threshold (call under ``lock``)"""
+        self.pending_bytes += len(repr(op))
+
+    def mark_dirty(self):
+        """Ask for a flush after the debounce interval, or now if enough has piled up"""
+        with self.wakeup:
+            now = time.monotonic()
+            if self.first_dirty is None:
+                self.first_dirty = now
+            self.last_dirty = now
+            self.wakeup.notify()
+
+    def _due(self) -> float:
+        """Seconds until the next flush is due (0 = now, None = nothing to flush)"""
+        if self.first_dirty is None:
+            return None
+        if self.pending_bytes >= self.max_pending_bytes:
+            return 0.0
+        deadline = min(self.last_dirty + self.interval, self.first_dirty + self.max_delay)
+        return max(0.0, deadline - time.monotonic())
+
+    def _run(self):
+        while True:
+            with self.wakeup:
+                while not self.closed:
+                    due = self._due()
+                    if due == 0.0:
+                        break
+                    self.wakeup.wait(due)
+                if self.closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the changes dirty and retry after another interval
+                self.error = e
+                self.mark_dirty()
+
+    def flush(self):
+        """Flush now on the calling thread, waiting for any flush in progress"""
+        with self.io_lock:
+            with self.lock:
+                with self.wakeup:
+                    self.first_dirty = self.last_dirty = None
+                self.pending_bytes = 0
+                write = self.store.prepare_flush()
+            if write is not None:
+                write()
+            self.flushes += 1
+            self.error = None
+
+    def close(self):
+        """Stop the thread, then flush and close the backend"""
+        with self.wakeup:
+            if self.closed:
+                return
+            self.closed = True
+            self.wakeup.notify()
+        self.thread.join()
+        atexit.unregister(self.close)
+        with self.io_lock, self.lock:
+            self.store.close()